@@ -0,0 +1,64 @@
+import argparse
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.feature_extraction import (  # noqa: E402
+    _decode_webm_to_wav,
+    _decode_webm_with_pyav,
+    _load_waveform_16k,
+    _require_av,
+    _resample_to_16k,
+    _wav_bytes_to_mono_float32,
+)
+
+SAMPLES = Path(__file__).resolve().parents[1] / "samples"
+
+
+def _ffmpeg_webm_to_float32(audio_bytes: bytes):
+    # 従来の ffmpeg プロセス経由のデコード
+    samples, sample_rate = _wav_bytes_to_mono_float32(_decode_webm_to_wav(audio_bytes))
+    return _resample_to_16k(samples, sample_rate)
+
+
+def _measure(name: str, action: Callable[[], object], iterations: int) -> None:
+    action()
+    timings: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        action()
+        timings.append((time.perf_counter() - started) * 1000.0)
+    timings.sort()
+    print(
+        f"{name:<14} median {statistics.median(timings):7.2f} ms"
+        f"  p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms"
+    )
+
+
+def main() -> None:
+    # サンプル WebM / WAV のデコード時間を PyAV と ffmpeg プロセスで比較
+    parser = argparse.ArgumentParser(description="Benchmark WebM/WAV decoding paths")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    webm = (SAMPLES / "sample_audio_1_2s.webm").read_bytes()
+    wav = (SAMPLES / "sample_audio_1_2s.wav").read_bytes()
+
+    _measure("wav", lambda: _load_waveform_16k(wav, "wav"), args.iterations)
+    if _require_av() is not None:
+        _measure("webm pyav", lambda: _decode_webm_with_pyav(webm), args.iterations)
+    else:
+        print("webm pyav      skipped (PyAV is not installed)")
+    if shutil.which("ffmpeg"):
+        _measure("webm ffmpeg", lambda: _ffmpeg_webm_to_float32(webm), args.iterations)
+    else:
+        print("webm ffmpeg    skipped (ffmpeg is not installed)")
+
+
+if __name__ == "__main__":
+    main()
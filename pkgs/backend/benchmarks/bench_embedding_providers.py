@@ -0,0 +1,53 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.feature_extraction import _run_embedding_batch  # noqa: E402
+
+# プロバイダーごとに推論ランタイムの import に必要なモジュール
+RUNTIME_IMPORTS = {"pyannote": "import torch, pyannote.audio", "onnx": "import onnxruntime"}
+
+
+def _import_seconds(statement: str) -> float:
+    # 新しいプロセスでランタイムの import 時間を計測
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", statement], capture_output=True)
+    if result.returncode != 0:
+        return float("nan")
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    # 利用可能なプロバイダーについて import 時間と1件あたりの推論時間を比較
+    parser = argparse.ArgumentParser(description="Benchmark embedding providers")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--providers", default="pyannote,onnx")
+    args = parser.parse_args()
+
+    model_name = os.getenv("BACKEND_EMBEDDING_MODEL", "pyannote/embedding")
+    generator = np.random.default_rng(0)
+    waveform = (0.1 * generator.standard_normal(int(16000 * args.seconds))).astype(np.float32)
+    for provider in args.providers.split(","):
+        import_seconds = _import_seconds(RUNTIME_IMPORTS[provider])
+        try:
+            _run_embedding_batch(provider, model_name, [waveform])
+        except Exception as error:
+            print(f"{provider:<9} unavailable: {error}")
+            continue
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            _run_embedding_batch(provider, model_name, [waveform])
+        elapsed = (time.perf_counter() - started) / args.iterations * 1000.0
+        print(f"{provider:<9} import {import_seconds:6.2f} s  inference {elapsed:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
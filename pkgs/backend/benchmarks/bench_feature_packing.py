@@ -0,0 +1,52 @@
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.feature_extraction import binarize_embedding, pack_binary_features  # noqa: E402
+
+
+def legacy_binarize_and_pack(embedding: List[float]) -> List[int]:
+    # 従来のリスト + ビットループによる実装
+    bits = [1 if value >= 0.0 else 0 for value in embedding]
+    packed: List[int] = []
+    for block_start in range(0, 512, 64):
+        value = 0
+        for bit_index, bit in enumerate(bits[block_start : block_start + 64]):
+            value |= (bit & 1) << bit_index
+        packed.append(value)
+    return packed
+
+
+def vectorized_binarize_and_pack(embedding) -> List[int]:
+    # NumPy 配列のまま二値化・パックし、最後にリストへ変換
+    return pack_binary_features(binarize_embedding(embedding)).tolist()
+
+
+def main() -> None:
+    # 従来実装とベクトル化実装の1件あたりの処理時間を比較
+    parser = argparse.ArgumentParser(description="Benchmark binarize + pack of 512-dim embeddings")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    embedding = np.random.default_rng(0).standard_normal(512).astype(np.float32)
+    embedding_list = embedding.tolist()
+    if legacy_binarize_and_pack(embedding_list) != vectorized_binarize_and_pack(embedding):
+        raise SystemExit("vectorized packing differs from the legacy implementation")
+
+    legacy = timeit.timeit(lambda: legacy_binarize_and_pack(embedding_list), number=args.iterations)
+    vectorized = timeit.timeit(
+        lambda: vectorized_binarize_and_pack(embedding), number=args.iterations
+    )
+    print(f"legacy:     {legacy / args.iterations * 1e6:8.1f} us/embedding")
+    print(f"vectorized: {vectorized / args.iterations * 1e6:8.1f} us/embedding")
+    print(f"speedup:    {legacy / vectorized:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
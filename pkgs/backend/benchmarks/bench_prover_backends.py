@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.proof_generation import compute_commitment  # noqa: E402
+from src.prover_backends import get_prover_backend  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _ownership_input(circuit_root: Path) -> dict:
+    # VoiceOwnership 回路の入力 (参照と現在の特徴量のハミング距離は 64)
+    reference = [0x0123456789ABCDEF] * 8
+    current = [reference[0] ^ ((1 << 64) - 1)] + reference[1:]
+    commitment = compute_commitment(reference, "42", circuit_root, engine="native")["commitment"]
+    return {
+        "referenceFeatures": [str(value) for value in reference],
+        "currentFeatures": [str(value) for value in current],
+        "salt": "42",
+        "publicCommitment": commitment,
+    }
+
+
+def _run_child(backend_name: str, circuit_root: Path, iterations: int) -> None:
+    # 子プロセス側: 1バックエンドで証明を繰り返し、時間・CPU・最大 RSS を JSON で出力
+    os.environ["BACKEND_PROVER"] = backend_name
+    backend = get_prover_backend(circuit_root, "VoiceOwnership")
+    input_payload = _ownership_input(circuit_root)
+    backend.warm(["VoiceOwnership"])
+    backend.prove(input_payload, "VoiceOwnership")
+
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    started = time.perf_counter()
+    for _ in range(iterations):
+        backend.prove(input_payload, "VoiceOwnership")
+    elapsed = time.perf_counter() - started
+    after = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+
+    cpu = sum(
+        (end.ru_utime + end.ru_stime) - (begin.ru_utime + begin.ru_stime)
+        for begin, end in zip(usage, after)
+    )
+    print(
+        json.dumps(
+            {
+                "backend": backend.name,
+                "proofMs": elapsed / iterations * 1000.0,
+                "cpuMs": cpu / iterations * 1000.0,
+                # ru_maxrss は KiB 単位 (Linux)。子プロセスは最大のもの1つ分
+                "rssMiB": after[0].ru_maxrss / 1024.0,
+                "childRssMiB": after[1].ru_maxrss / 1024.0,
+            }
+        )
+    )
+
+
+def main() -> None:
+    # バックエンドごとに新しいプロセスで VoiceOwnership の証明時間・CPU 時間・RSS を比較
+    parser = argparse.ArgumentParser(description="Benchmark prover backends")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--backends", default="snarkjs-cli,snarkjs-worker,rapidsnark")
+    parser.add_argument("--circuit-root", type=Path, default=ROOT / "zk")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run_child(args.child, args.circuit_root, args.iterations)
+        return
+
+    for backend_name in args.backends.split(","):
+        command = [sys.executable, __file__, "--child", backend_name]
+        command += ["--iterations", str(args.iterations), "--circuit-root", str(args.circuit_root)]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            error = (result.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"{backend_name:<15} unavailable: {error}")
+            continue
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(
+            f"{backend_name:<15} proof {stats['proofMs']:8.1f} ms  cpu {stats['cpuMs']:8.1f} ms  "
+            f"rss {stats['rssMiB']:7.1f} MiB  child rss {stats['childRssMiB']:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.resampler import COMMON_SOURCE_RATES, resample_polyphase  # noqa: E402
+
+
+def legacy_interp(samples: np.ndarray, source_rate: int) -> np.ndarray:
+    # 従来の np.linspace + np.interp による線形補間
+    source_index = np.linspace(0.0, 1.0, num=samples.shape[0], endpoint=False)
+    target_length = max(int(samples.shape[0] * 16000 / source_rate), 1)
+    target_index = np.linspace(0.0, 1.0, num=target_length, endpoint=False)
+    return np.interp(target_index, source_index, samples).astype(np.float32)
+
+
+def _measure(action: Callable[[], np.ndarray], iterations: int):
+    action()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        action()
+    elapsed = (time.perf_counter() - started) / iterations * 1000.0
+    tracemalloc.start()
+    action()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def _alias_rms(resample: Callable[[np.ndarray, int], np.ndarray], source_rate: int) -> float:
+    # 16kHz のナイキスト周波数を超える 10kHz 正弦波がどれだけ折り返すか
+    seconds = np.arange(source_rate * 2) / source_rate
+    tone = np.sin(2 * np.pi * 10000 * seconds).astype(np.float32)
+    return float(np.sqrt(np.mean(resample(tone, source_rate)[1000:-1000] ** 2)))
+
+
+def main() -> None:
+    # 30秒クリップの処理時間・ピークメモリ・折り返し量を比較
+    parser = argparse.ArgumentParser(description="Benchmark resampling to 16 kHz")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    generator = np.random.default_rng(0)
+    for source_rate in COMMON_SOURCE_RATES:
+        samples = generator.standard_normal(int(source_rate * args.seconds)).astype(np.float32)
+        for name, resample in (("interp", legacy_interp), ("polyphase", resample_polyphase)):
+            elapsed, peak = _measure(lambda: resample(samples, source_rate), args.iterations)
+            alias = _alias_rms(resample, source_rate) if source_rate > 20000 else float("nan")
+            print(
+                f"{source_rate:>6} Hz {name:<10} {elapsed:8.1f} ms"
+                f"  peak {peak:6.1f} MB  10kHz alias rms {alias:.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
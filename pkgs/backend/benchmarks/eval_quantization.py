@@ -0,0 +1,93 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.feature_extraction import (  # noqa: E402
+    _load_waveform_16k,
+    _normalize_embedding_dims,
+    _run_embedding_batch,
+    binarize_embedding,
+    detect_audio_format,
+    validate_audio_quality,
+)
+
+SAMPLES = Path(__file__).resolve().parents[1] / "samples"
+
+
+def load_fixtures(directory: Path) -> List[Tuple[str, np.ndarray]]:
+    # WAV / WebM を 16kHz 波形へ変換し、音量違い・雑音付きの派生クリップも加える
+    generator = np.random.default_rng(0)
+    fixtures = []
+    for path in sorted(directory.iterdir()):
+        if path.suffix not in (".wav", ".webm"):
+            continue
+        audio = path.read_bytes()
+        audio_format = detect_audio_format(audio)
+        waveform = _load_waveform_16k(
+            audio, audio_format, validate_audio_quality(audio, audio_format)
+        )
+        noise = generator.standard_normal(waveform.shape[0]).astype(np.float32)
+        noise *= np.sqrt(np.mean(waveform**2)) / 30.0
+        fixtures.append((path.name, waveform))
+        fixtures.append((f"{path.name}@gain0.5", waveform * np.float32(0.5)))
+        fixtures.append((f"{path.name}@snr30", waveform + noise))
+    return fixtures
+
+
+def embed_all(provider: str, model_name: str, quantization: str, fixtures) -> Tuple[list, float]:
+    # 指定した量子化モードで全クリップを1件ずつ推論し、(埋め込み, 平均時間[ms]) を返す
+    os.environ["BACKEND_EMBEDDING_QUANTIZE"] = quantization
+    _run_embedding_batch(provider, model_name, [fixtures[0][1]])
+    embeddings = []
+    started = time.perf_counter()
+    for _, waveform in fixtures:
+        embedding = _run_embedding_batch(provider, model_name, [waveform])[0]
+        embeddings.append(_normalize_embedding_dims(embedding, dims=512))
+    return embeddings, (time.perf_counter() - started) / len(fixtures) * 1000.0
+
+
+def main() -> None:
+    # fp32 と int8 の埋め込みを比較し、コサイン距離のずれと二値化ビットの反転数を報告する
+    # 同一話者の判定は VoiceOwnership 回路のハミング距離しきい値 (既定 128) で行うため、
+    # 量子化による反転ビット数がその予算をどれだけ消費するかを確認する
+    parser = argparse.ArgumentParser(description="Evaluate int8 embedding drift against fp32")
+    parser.add_argument("--provider", default=os.getenv("BACKEND_EMBEDDING_PROVIDER", "pyannote"))
+    parser.add_argument("--fixtures", type=Path, default=SAMPLES)
+    parser.add_argument("--threshold", type=int, default=128)
+    parser.add_argument("--max-flips", type=int, default=16)
+    args = parser.parse_args()
+
+    model_name = os.getenv("BACKEND_EMBEDDING_MODEL", "pyannote/embedding")
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        raise SystemExit(f"no .wav / .webm fixtures in {args.fixtures}")
+    reference, fp32_ms = embed_all(args.provider, model_name, "none", fixtures)
+    quantized, int8_ms = embed_all(args.provider, model_name, "int8", fixtures)
+
+    drifts, flips = [], []
+    print(f"{'fixture':<36} {'cos drift':>10} {'bit flips':>10}")
+    for (name, _), fp32, int8 in zip(fixtures, reference, quantized):
+        cosine = float(np.dot(fp32, int8) / (np.linalg.norm(fp32) * np.linalg.norm(int8) + 1e-12))
+        flipped = int(np.count_nonzero(binarize_embedding(fp32) != binarize_embedding(int8)))
+        drifts.append(1.0 - cosine)
+        flips.append(flipped)
+        print(f"{name:<36} {1.0 - cosine:10.6f} {flipped:10d}")
+
+    worst = max(flips)
+    print(f"cosine drift   mean {np.mean(drifts):.6f}  max {max(drifts):.6f}")
+    print(f"bit flip rate  mean {np.mean(flips) / 512:.4%}  max {worst / 512:.4%}")
+    print(f"worst-case flips use {worst}/{args.threshold} of the Hamming threshold budget")
+    print(f"latency        fp32 {fp32_ms:.1f} ms  int8 {int8_ms:.1f} ms  x{fp32_ms / int8_ms:.2f}")
+    if worst > args.max_flips:
+        raise SystemExit(f"int8 model flips {worst} bits (> --max-flips {args.max_flips})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# rapidsnark をソースからビルドし、BACKEND_PROVER=rapidsnark 用の共有ライブラリを配置する
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+BACKEND_DIR="$(cd "${SCRIPT_DIR}/.." && pwd)"
+
+RAPIDSNARK_REPO="${RAPIDSNARK_REPO:-https://github.com/iden3/rapidsnark.git}"
+RAPIDSNARK_REF="${RAPIDSNARK_REF:-v0.0.7}"
+TARGET_LIB_DIR="${TARGET_LIB_DIR:-${BACKEND_DIR}/vendor/rapidsnark/lib}"
+
+for command in git cmake make g++ m4; do
+  if ! command -v "${command}" >/dev/null 2>&1; then
+    echo "Missing required command: ${command}" >&2
+    exit 1
+  fi
+done
+
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "${WORK_DIR}"' EXIT
+
+echo "Building rapidsnark ${RAPIDSNARK_REF}"
+git clone --depth 1 --branch "${RAPIDSNARK_REF}" --recurse-submodules --shallow-submodules \
+  "${RAPIDSNARK_REPO}" "${WORK_DIR}/rapidsnark"
+cd "${WORK_DIR}/rapidsnark"
+./build_gmp.sh host
+make host
+
+mkdir -p "${TARGET_LIB_DIR}"
+cp package/lib/librapidsnark.* "${TARGET_LIB_DIR}/"
+
+echo "Installed: ${TARGET_LIB_DIR}"
+echo "Set BACKEND_PROVER=rapidsnark and BACKEND_RAPIDSNARK_LIB=${TARGET_LIB_DIR}/librapidsnark.so"
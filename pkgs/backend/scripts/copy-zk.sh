@@ -20,6 +20,12 @@ echo "Target zk dir:      ${TARGET_ZK_DIR}"
 
 mkdir -p "${TARGET_ZK_DIR}/zkey"
 
+# 稼働中のサーバーは成果物を mmap しているため、上書きではなく rename で置き換える
+copy_atomic() {
+  cp "$1" "$2.tmp"
+  mv -f "$2.tmp" "$2"
+}
+
 for CIRCUIT in "${CIRCUITS[@]}"; do
   SRC_WASM="${SOURCE_CIRCUIT_DIR}/${CIRCUIT}_js/${CIRCUIT}.wasm"
   SRC_ZKEY="${SOURCE_CIRCUIT_DIR}/zkey/${CIRCUIT}_final.zkey"
@@ -35,14 +41,20 @@ for CIRCUIT in "${CIRCUITS[@]}"; do
   fi
 
   mkdir -p "${TARGET_ZK_DIR}/${CIRCUIT}_js"
-  cp "${SRC_WASM}" "${TARGET_ZK_DIR}/${CIRCUIT}_js/${CIRCUIT}.wasm"
-  cp "${SRC_ZKEY}" "${TARGET_ZK_DIR}/zkey/${CIRCUIT}_final.zkey"
+  copy_atomic "${SRC_WASM}" "${TARGET_ZK_DIR}/${CIRCUIT}_js/${CIRCUIT}.wasm"
+  copy_atomic "${SRC_ZKEY}" "${TARGET_ZK_DIR}/zkey/${CIRCUIT}_final.zkey"
 
   if [[ -f "${SRC_VKEY}" ]]; then
-    cp "${SRC_VKEY}" "${TARGET_ZK_DIR}/zkey/${CIRCUIT}_verification_key.json"
+    copy_atomic "${SRC_VKEY}" "${TARGET_ZK_DIR}/zkey/${CIRCUIT}_verification_key.json"
   fi
 
   echo "Copied artifacts for ${CIRCUIT}"
 done
 
+# 回路定義 (バージョン・しきい値・公開シグナル) はリポジトリのマニフェストを起点にする
+if [[ ! -f "${TARGET_ZK_DIR}/manifest.json" && -f "${BACKEND_DIR}/zk/manifest.json" ]]; then
+  cp "${BACKEND_DIR}/zk/manifest.json" "${TARGET_ZK_DIR}/manifest.json"
+fi
+python3 "${SCRIPT_DIR}/write_zk_manifest.py" --circuit-root "${TARGET_ZK_DIR}" "${CIRCUITS[@]}"
+
 echo "Done."
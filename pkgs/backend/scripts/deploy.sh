@@ -25,11 +25,30 @@ RUNTIME_SA="${RUNTIME_SA_NAME}@${PROJECT_ID}.iam.gserviceaccount.com"
 ALLOW_UNAUTHENTICATED="${ALLOW_UNAUTHENTICATED:-true}"
 BACKEND_MEMORY="${BACKEND_MEMORY:-2Gi}"
 BACKEND_CPU="${BACKEND_CPU:-1}"
-BACKEND_CONCURRENCY="${BACKEND_CONCURRENCY:-1}"
 BACKEND_MIN_INSTANCES="${BACKEND_MIN_INSTANCES:-0}"
 BACKEND_MAX_INSTANCES="${BACKEND_MAX_INSTANCES:-3}"
+BACKEND_ROLE="${BACKEND_ROLE:-all}"
+# 非同期証明ジョブ向けのインスタンス設定 (prover ロールでは既定で有効、それ以外は明示的に 1 を指定)
+if [[ "${BACKEND_ROLE}" == "prover" ]]; then
+  BACKEND_ASYNC_PROOF_TUNING="${BACKEND_ASYNC_PROOF_TUNING:-1}"
+else
+  BACKEND_ASYNC_PROOF_TUNING="${BACKEND_ASYNC_PROOF_TUNING:-0}"
+fi
+if [[ "${BACKEND_ASYNC_PROOF_TUNING}" == "1" ]]; then
+  BACKEND_CONCURRENCY="${BACKEND_CONCURRENCY:-8}"
+else
+  BACKEND_CONCURRENCY="${BACKEND_CONCURRENCY:-1}"
+fi
 BACKEND_EMBEDDING_PROVIDER="${BACKEND_EMBEDDING_PROVIDER:-pyannote}"
 BACKEND_EMBEDDING_MODEL="${BACKEND_EMBEDDING_MODEL:-pyannote/embedding}"
+BACKEND_EMBEDDING_ONNX_PATH="${BACKEND_EMBEDDING_ONNX_PATH:-}"
+BACKEND_EMBEDDING_QUANTIZE="${BACKEND_EMBEDDING_QUANTIZE:-none}"
+BACKEND_PROVER="${BACKEND_PROVER:-auto}"
+BACKEND_PROVER_POOL_SIZE="${BACKEND_PROVER_POOL_SIZE:-1}"
+BACKEND_COMMITMENT_ENGINE="${BACKEND_COMMITMENT_ENGINE:-native}"
+BACKEND_WITNESS_ENGINE="${BACKEND_WITNESS_ENGINE:-wasm}"
+BACKEND_PROOF_JOB_WORKERS="${BACKEND_PROOF_JOB_WORKERS:-1}"
+BACKEND_WARMUP="${BACKEND_WARMUP:-0}"
 HF_TOKEN="${HF_TOKEN:-${HUGGINGFACE_HUB_TOKEN:-}}"
 
 if [[ -z "${PROJECT_ID}" ]]; then
@@ -70,13 +89,27 @@ DEPLOY_ARGS=(
   --concurrency "${BACKEND_CONCURRENCY}"
   --min-instances "${BACKEND_MIN_INSTANCES}"
   --max-instances "${BACKEND_MAX_INSTANCES}"
-  --set-env-vars "GOOGLE_CLOUD_PROJECT=${PROJECT_ID},GOOGLE_CLOUD_LOCATION=${REGION},ZK_CIRCUIT_ROOT=/app/zk,BACKEND_EMBEDDING_PROVIDER=${BACKEND_EMBEDDING_PROVIDER},BACKEND_EMBEDDING_MODEL=${BACKEND_EMBEDDING_MODEL}"
+  --set-env-vars "GOOGLE_CLOUD_PROJECT=${PROJECT_ID},GOOGLE_CLOUD_LOCATION=${REGION},ZK_CIRCUIT_ROOT=/app/zk,BACKEND_ROLE=${BACKEND_ROLE},BACKEND_EMBEDDING_PROVIDER=${BACKEND_EMBEDDING_PROVIDER},BACKEND_EMBEDDING_MODEL=${BACKEND_EMBEDDING_MODEL},BACKEND_EMBEDDING_QUANTIZE=${BACKEND_EMBEDDING_QUANTIZE},BACKEND_PROVER=${BACKEND_PROVER},BACKEND_PROVER_POOL_SIZE=${BACKEND_PROVER_POOL_SIZE},BACKEND_COMMITMENT_ENGINE=${BACKEND_COMMITMENT_ENGINE},BACKEND_WITNESS_ENGINE=${BACKEND_WITNESS_ENGINE},BACKEND_PROOF_JOB_WORKERS=${BACKEND_PROOF_JOB_WORKERS},BACKEND_WARMUP=${BACKEND_WARMUP}"
 )
 
 if [[ -n "${HF_TOKEN}" ]]; then
   DEPLOY_ARGS+=(--set-env-vars "HF_TOKEN=${HF_TOKEN},HUGGINGFACE_HUB_TOKEN=${HF_TOKEN}")
 fi
 
+if [[ -n "${BACKEND_EMBEDDING_ONNX_PATH}" ]]; then
+  DEPLOY_ARGS+=(--set-env-vars "BACKEND_EMBEDDING_ONNX_PATH=${BACKEND_EMBEDDING_ONNX_PATH}")
+fi
+
+if [[ "${BACKEND_ASYNC_PROOF_TUNING}" == "1" ]]; then
+  # 非同期証明ジョブはインスタンス内で保持・実行するため、CPU を常時割り当てて同じインスタンスへ誘導する
+  DEPLOY_ARGS+=(--no-cpu-throttling --session-affinity)
+fi
+
+if [[ "${BACKEND_WARMUP}" == "1" ]]; then
+  # ウォームアップ完了 (/ready が 200) までトラフィックを流さない
+  DEPLOY_ARGS+=(--startup-probe "httpGet.path=/ready,periodSeconds=5,timeoutSeconds=5,failureThreshold=60")
+fi
+
 if [[ "${ALLOW_UNAUTHENTICATED}" == "true" ]]; then
   DEPLOY_ARGS+=(--allow-unauthenticated)
 else
@@ -0,0 +1,45 @@
+import argparse
+from pathlib import Path
+
+
+def main() -> None:
+    # pyannote の話者埋め込みモデルを ONNX へエクスポート (BACKEND_EMBEDDING_PROVIDER=onnx 用)
+    # 入力は waveform (batch, 1, samples) の float32、出力は (batch, dims) の埋め込み
+    parser = argparse.ArgumentParser(description="Export a pyannote embedding model to ONNX")
+    parser.add_argument("--model", default="pyannote/embedding")
+    parser.add_argument("--output", type=Path, default=Path("models/embedding.onnx"))
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument(
+        "--int8", action="store_true", help="also write <output>.int8.onnx (dynamic quantization)"
+    )
+    args = parser.parse_args()
+
+    import torch
+    from pyannote.audio import Model
+
+    model = Model.from_pretrained(args.model)
+    model.eval()
+    example = torch.zeros(1, 1, 16000, dtype=torch.float32)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    torch.onnx.export(
+        model,
+        (example,),
+        str(args.output),
+        input_names=["waveform"],
+        output_names=["embedding"],
+        dynamic_axes={"waveform": {0: "batch", 2: "samples"}, "embedding": {0: "batch"}},
+        opset_version=args.opset,
+    )
+    print(f"exported {args.model} -> {args.output}")
+
+    if args.int8:
+        # BACKEND_EMBEDDING_QUANTIZE=int8 はこのファイルがあれば実行時の量子化を省略して読み込む
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized = args.output.with_suffix(".int8.onnx")
+        quantize_dynamic(str(args.output), str(quantized), weight_type=QuantType.QInt8)
+        print(f"quantized {args.output} -> {quantized}")
+
+
+if __name__ == "__main__":
+    main()
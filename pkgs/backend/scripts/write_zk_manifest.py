@@ -0,0 +1,26 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.artifacts import write_manifest  # noqa: E402
+
+
+def main() -> None:
+    # 回路成果物 (wasm / zkey / 検証鍵) の SHA-256 を zk/manifest.json へ書き出す
+    parser = argparse.ArgumentParser(description="Write the zk artifact manifest")
+    parser.add_argument(
+        "--circuit-root", type=Path, default=Path(__file__).resolve().parents[1] / "zk"
+    )
+    parser.add_argument(
+        "circuits", nargs="*", help="circuit names or name@version (default: all circuits)"
+    )
+    args = parser.parse_args()
+
+    path = write_manifest(args.circuit_root, args.circuits or None)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
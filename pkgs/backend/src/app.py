@@ -1,19 +1,10 @@
 import os
 from pathlib import Path
+from typing import Callable, Dict
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-from src.feature_extraction import (
-    AudioDecodeError,
-    AudioFormatError,
-    AudioQualityError,
-    EmbeddingModelUnavailableError,
-    extract_voice_features,
-)
-from src.proof_generation import (
-    ProofGenerationError,
-    build_generate_proof_response,
-    compute_poseidon_commitment,
-)
+from src.roles import backend_role, serves_embedder, serves_prover
+from src.warmup import start_warmup
 
 
 def create_app() -> Flask:
@@ -27,152 +18,32 @@ def create_app() -> Flask:
             os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "circuit")),
         )
     )
+    # BACKEND_ROLE に応じて必要なルートだけを登録する (他方の依存モジュールは import しない)
+    role = backend_role()
+    stats: Dict[str, Callable[[], object]] = {}
+    if serves_embedder(role):
+        from src.embedder_routes import register_embedder_routes
+
+        stats.update(register_embedder_routes(app))
+    if serves_prover(role):
+        from src.prover_routes import register_prover_routes
+
+        stats.update(register_prover_routes(app, circuit_root))
+    # BACKEND_WARMUP=1 のとき担当ロールのモデル・zkey・証明ワーカーをバックグラウンドで事前ロード
+    warmup_state = start_warmup(circuit_root, role=role)
 
     @app.get("/health")
     def health():
         # ヘルスチェックエンドポイント
         return jsonify({"status": "ok"}), 200
 
-    @app.post("/extract-features")
-    def extract_features():
-        # 音声特徴量抽出エンドポイント
-        payload = request.get_json(silent=True) or {}
-        audio = payload.get("audio")
-        mime_type = payload.get("mimeType", "")
-        if not audio:
-            return (
-                jsonify(
-                    {
-                        "error": {
-                            "code": "BAD_REQUEST",
-                            "message": "audio field is required",
-                        }
-                    }
-                ),
-                400,
-            )
-
-        try:
-            # 音声特徴量を抽出
-            result = extract_voice_features(audio, mime_type)
-            return jsonify(result), 200
-        except (AudioFormatError, AudioQualityError, AudioDecodeError) as error:
-            return (
-                jsonify(
-                    {
-                        "error": {
-                            "code": "INVALID_AUDIO",
-                            "message": str(error),
-                        }
-                    }
-                ),
-                400,
-            )
-        except EmbeddingModelUnavailableError as error:
-            return (
-                jsonify(
-                    {
-                        "error": {
-                            "code": "MODEL_UNAVAILABLE",
-                            "message": str(error),
-                        }
-                    }
-                ),
-                503,
-            )
-
-    @app.post("/generate-proof")
-    def generate_proof():
-        # 証明生成エンドポイント
-        payload = request.get_json(silent=True) or {}
-        reference_features = payload.get("referenceFeatures")
-        current_features = payload.get("currentFeatures")
-        salt = str(payload.get("salt", ""))
-        if reference_features is None or current_features is None or salt == "":
-            return (
-                jsonify(
-                    {
-                        "error": {
-                            "code": "BAD_REQUEST",
-                            "message": "referenceFeatures, currentFeatures, salt are required",
-                        }
-                    }
-                ),
-                400,
-            )
-
-        try:
-            # 証明を生成
-            response = build_generate_proof_response(
-                reference_features=[int(value) for value in reference_features],
-                current_features=[int(value) for value in current_features],
-                salt=salt,
-                circuit_name="VoiceOwnership",
-                circuit_root=circuit_root,
-                hamming_threshold=128,
-            )
-            return jsonify(response), 200
-        except (ValueError, ProofGenerationError) as error:
-            return (
-                jsonify(
-                    {
-                        "error": {
-                            "code": "PROOF_GENERATION_ERROR",
-                            "message": str(error),
-                        }
-                    }
-                ),
-                400,
-            )
-
-    @app.post("/generate-commitment")
-    def generate_commitment():
-        # コミットメント生成エンドポイント
-        payload = request.get_json(silent=True) or {}
-        features = payload.get("features")
-        salt = str(payload.get("salt", ""))
-        if features is None or salt == "":
-            return (
-                jsonify(
-                    {
-                        "error": {
-                            "code": "BAD_REQUEST",
-                            "message": "features and salt are required",
-                        }
-                    }
-                ),
-                400,
-            )
-
-        try:
-            # コミットメントを計算
-            packed_features = [int(value) for value in features]
-            commitment = compute_poseidon_commitment(
-                packed_features,
-                salt,
-                circuit_root,
-            )
-            return (
-                jsonify(
-                    {
-                        "commitment": commitment,
-                        "packedFeatures": [str(value) for value in packed_features],
-                    }
-                ),
-                200,
-            )
-        except (ValueError, ProofGenerationError) as error:
-            return (
-                jsonify(
-                    {
-                        "error": {
-                            "code": "COMMITMENT_GENERATION_ERROR",
-                            "message": str(error),
-                        }
-                    }
-                ),
-                400,
-            )
+    @app.get("/ready")
+    def ready():
+        # レディネスチェックエンドポイント (ウォームアップ完了まで 503)
+        snapshot = warmup_state.snapshot()
+        snapshot["role"] = role
+        snapshot["stats"] = {name: collect() for name, collect in stats.items()}
+        return jsonify(snapshot), 200 if snapshot["ready"] else 503
 
     @app.errorhandler(400)
     def bad_request(error):
@@ -0,0 +1,411 @@
+import ctypes
+import hashlib
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+MANIFEST_NAME = "manifest.json"
+# バージョン指定の無いマニフェストエントリのバージョン
+DEFAULT_CIRCUIT_VERSION = "1"
+# マニフェストの artifacts に書ける成果物の種類
+ARTIFACT_KINDS = ("wasm", "zkey", "verificationKey")
+# マニフェストが無い場合に使う回路定義 (pkgs/circuit の circom ソースに埋め込まれた値と一致させる)
+BUILTIN_CIRCUIT_DEFINITIONS: Dict[str, Dict[str, object]] = {
+    "VoiceOwnership": {"threshold": 128, "publicSignals": ["publicCommitment"]},
+    "VoiceCommitment": {"publicSignals": ["commitment"]},
+}
+
+
+class ArtifactError(ValueError):
+    # 回路成果物の読み込み・検証エラー
+    pass
+
+
+def circuit_id(circuit_name: str, version: str) -> str:
+    # 回路のバージョンを含む識別子 (例: VoiceOwnership@1)
+    return f"{circuit_name}@{version}"
+
+
+def default_artifact_paths(circuit_name: str) -> Dict[str, str]:
+    # マニフェストが無い場合の成果物の配置 (回路ルートからの相対パス)
+    return {
+        "wasm": f"{circuit_name}_js/{circuit_name}.wasm",
+        "zkey": f"zkey/{circuit_name}_final.zkey",
+        "verificationKey": f"zkey/{circuit_name}_verification_key.json",
+    }
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int, int, int]]:
+    # 変更検知用の (デバイス, inode, サイズ, 更新時刻)。存在しなければ None
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class Artifact:
+    # mmap した回路成果物。内容は読み込み時に SHA-256 で検証し、以降はディスクを読まない
+    # ファイルはアトミックに置き換える前提 (置換後も旧 inode の mmap は有効なまま残る)
+
+    def __init__(self, path: Path, expected_sha256: Optional[str] = None):
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as handle:
+                self.signature = _file_signature(self.path)
+                if os.fstat(handle.fileno()).st_size == 0:
+                    raise ArtifactError(f"empty zk artifact: {self.path}")
+                # ACCESS_COPY (MAP_PRIVATE) は書き込み可能なバッファとして ctypes に渡せる
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
+        except FileNotFoundError as error:
+            raise ArtifactError(f"missing zk artifact: {self.path}") from error
+        self.size = len(self._map)
+        self.sha256 = hashlib.sha256(self._map).hexdigest()
+        self.verified = expected_sha256 is not None
+        if expected_sha256 is not None and self.sha256 != expected_sha256.lower():
+            raise ArtifactError(f"sha256 mismatch for {self.path}")
+        self._c_buffer = None
+
+    @property
+    def buffer(self) -> memoryview:
+        # ゼロコピーの読み取り用ビュー
+        return memoryview(self._map)
+
+    def c_buffer(self):
+        # ネイティブ証明器へ渡す ctypes 配列 (mmap を直接参照し、コピーしない)
+        if self._c_buffer is None:
+            self._c_buffer = (ctypes.c_char * self.size).from_buffer(self._map)
+        return self._c_buffer
+
+    def changed(self) -> bool:
+        return _file_signature(self.path) != self.signature
+
+
+class CircuitArtifacts(NamedTuple):
+    # 1回路 (1バージョン) 分の成果物 (マニフェストに無い成果物は None)
+    name: str
+    version: str
+    wasm: Optional[Artifact]
+    zkey: Optional[Artifact]
+    verification_key: Optional[Artifact]
+    # マニフェストの回路エントリ (成果物以外の項目を含む)
+    entry: Dict[str, object]
+
+    @property
+    def id(self) -> str:
+        return circuit_id(self.name, self.version)
+
+    def require(self, kind: str) -> Artifact:
+        artifacts = {
+            "wasm": self.wasm,
+            "zkey": self.zkey,
+            "verificationKey": self.verification_key,
+        }
+        artifact = artifacts[kind]
+        if artifact is None:
+            raise ArtifactError(f"missing zk artifact: {kind} for {self.name}")
+        return artifact
+
+
+def _manifest_entries(circuit_root: Path) -> Tuple[List[Dict[str, object]], bool]:
+    # マニフェストの回路エントリを読み込む (無ければ配置規約から探索し、ハッシュ検証なし)
+    # 探索した回路のうち既知のものには組み込みの回路定義 (しきい値・公開シグナル) を付ける
+    manifest_path = circuit_root / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_bytes())
+    except FileNotFoundError:
+        entries = []
+        for wasm_path in sorted(circuit_root.glob("*_js/*.wasm")):
+            name = wasm_path.stem
+            paths = default_artifact_paths(name)
+            entries.append(
+                {
+                    "name": name,
+                    **BUILTIN_CIRCUIT_DEFINITIONS.get(name, {}),
+                    "artifacts": {
+                        kind: {"path": path}
+                        for kind, path in paths.items()
+                        if (circuit_root / path).exists()
+                    },
+                }
+            )
+        return entries, False
+    except ValueError as error:
+        raise ArtifactError(f"invalid zk manifest: {manifest_path}") from error
+
+    circuits = manifest.get("circuits") if isinstance(manifest, dict) else None
+    if not isinstance(circuits, list):
+        raise ArtifactError("zk manifest must contain a circuits list")
+    for entry in circuits:
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+            raise ArtifactError("each zk manifest circuit must have a name")
+        if not isinstance(entry.get("artifacts"), dict):
+            raise ArtifactError(f"zk manifest circuit {entry['name']} has no artifacts")
+    return circuits, True
+
+
+def _entry_id(entry: Dict[str, object]) -> str:
+    return circuit_id(str(entry["name"]), str(entry.get("version", DEFAULT_CIRCUIT_VERSION)))
+
+
+def load_circuit_artifacts(circuit_root: Path) -> Dict[str, CircuitArtifacts]:
+    # マニフェストの全成果物を mmap してハッシュを検証する (キーは name@version)
+    circuit_root = Path(circuit_root)
+    entries, has_manifest = _manifest_entries(circuit_root)
+    circuits: Dict[str, CircuitArtifacts] = {}
+    for entry in entries:
+        loaded: Dict[str, Optional[Artifact]] = {kind: None for kind in ARTIFACT_KINDS}
+        for kind, spec in entry["artifacts"].items():
+            if kind not in loaded:
+                raise ArtifactError(f"unknown zk artifact kind: {kind}")
+            if not isinstance(spec, dict) or not isinstance(spec.get("path"), str):
+                raise ArtifactError(f"zk artifact {kind} of {entry['name']} has no path")
+            expected = spec.get("sha256")
+            if has_manifest and not isinstance(expected, str):
+                raise ArtifactError(f"zk artifact {kind} of {entry['name']} has no sha256")
+            loaded[kind] = Artifact(circuit_root / spec["path"], expected)
+        name = str(entry["name"])
+        key = _entry_id(entry)
+        if key in circuits:
+            raise ArtifactError(f"duplicate circuit in zk manifest: {key}")
+        circuits[key] = CircuitArtifacts(
+            name,
+            str(entry.get("version", DEFAULT_CIRCUIT_VERSION)),
+            loaded["wasm"],
+            loaded["zkey"],
+            loaded["verificationKey"],
+            entry,
+        )
+    return circuits
+
+
+def default_versions(circuits: Dict[str, CircuitArtifacts]) -> Dict[str, str]:
+    # 回路名ごとの既定バージョンの識別子 ("default": true のエントリ、無ければ最初に記載されたもの)
+    # 新しいバージョンを追記しても、明示しない限り既定のトラフィックは切り替わらない
+    defaults: Dict[str, str] = {}
+    marked = set()
+    for key, circuit in circuits.items():
+        if circuit.entry.get("default") is True:
+            if circuit.name in marked:
+                raise ArtifactError(f"multiple default versions for circuit {circuit.name}")
+            marked.add(circuit.name)
+            defaults[circuit.name] = key
+        else:
+            defaults.setdefault(circuit.name, key)
+    return defaults
+
+
+class ArtifactRegistry:
+    # 回路成果物のレジストリ。初回アクセス時に全成果物を mmap してハッシュを検証し、成果物の解決は stat なしで行う
+    # 内容をコピーせずに使うのは rapidsnark のみ (wasmtime はコンパイル時に1回コピーし、snarkjs の CLI / ワーカーはパスから読む)
+    # 変更はバックグラウンドのポーリングで検知し、検証に成功した場合のみ差し替える
+
+    def __init__(self, circuit_root: Path, poll_seconds: float = 0.0):
+        self.circuit_root = Path(circuit_root)
+        self.poll_seconds = poll_seconds
+        self._circuits: Optional[Dict[str, CircuitArtifacts]] = None
+        self._defaults: Dict[str, str] = {}
+        self._manifest_signature: Optional[Tuple[int, int, int, int]] = None
+        self._generation = 0
+        self._last_error: Optional[str] = None
+        self._listeners: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._load_lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+
+    def load(self) -> Dict[str, CircuitArtifacts]:
+        # 成果物を読み込み直して差し替える (検証に失敗した場合は例外を送出し、現在の内容を維持)
+        with self._load_lock:
+            manifest_signature = _file_signature(self.circuit_root / MANIFEST_NAME)
+            try:
+                circuits = load_circuit_artifacts(self.circuit_root)
+                defaults = default_versions(circuits)
+            except ArtifactError as error:
+                with self._lock:
+                    self._last_error = str(error)
+                raise
+            with self._lock:
+                # 初回読み込みでは通知しない (差し替え時のみ)
+                listeners = list(self._listeners) if self._circuits is not None else []
+                self._circuits = circuits
+                self._defaults = defaults
+                self._manifest_signature = manifest_signature
+                self._generation += 1
+                self._last_error = None
+        for listener in listeners:
+            listener()
+        return circuits
+
+    def circuits(self) -> Dict[str, CircuitArtifacts]:
+        with self._lock:
+            circuits = self._circuits
+        if circuits is None:
+            with self._load_lock:
+                with self._lock:
+                    circuits = self._circuits
+                if circuits is None:
+                    circuits = self.load()
+            self.start_polling()
+        return circuits
+
+    def resolve(self, circuit_name: str, version: Optional[str] = None) -> str:
+        # 回路名 (または name@version) とバージョンから識別子を解決 (バージョン省略時は既定バージョン)
+        circuits = self.circuits()
+        if version is None and "@" in circuit_name:
+            circuit_name, version = circuit_name.split("@", 1)
+        if version is None:
+            with self._lock:
+                key = self._defaults.get(circuit_name)
+        else:
+            key = circuit_id(circuit_name, version)
+        if key is None or key not in circuits:
+            label = circuit_name if version is None else circuit_id(circuit_name, version)
+            raise ArtifactError(f"unknown circuit: {label}")
+        return key
+
+    def circuit(self, circuit_name: str, version: Optional[str] = None) -> CircuitArtifacts:
+        # 回路の成果物を取得 (ファイルシステムには触れない)
+        return self.circuits()[self.resolve(circuit_name, version)]
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        # 成果物の差し替え時に呼ばれるコールバックを登録
+        with self._lock:
+            self._listeners.append(listener)
+
+    def changed(self) -> bool:
+        with self._lock:
+            circuits = self._circuits
+            manifest_signature = self._manifest_signature
+        if circuits is None:
+            return False
+        if _file_signature(self.circuit_root / MANIFEST_NAME) != manifest_signature:
+            return True
+        return any(
+            artifact is not None and artifact.changed()
+            for circuit in circuits.values()
+            for artifact in (circuit.wasm, circuit.zkey, circuit.verification_key)
+        )
+
+    def reload_if_changed(self) -> bool:
+        # 変更があれば読み込み直す (失敗時は直前の内容で動作を続け、エラーを stats に残す)
+        if not self.changed():
+            return False
+        try:
+            self.load()
+        except ArtifactError:
+            return False
+        return True
+
+    def start_polling(self) -> None:
+        if self.poll_seconds <= 0:
+            return
+        with self._lock:
+            if self._poller is not None:
+                return
+            self._poller = threading.Thread(
+                target=self._poll_loop, name="zk-artifacts", daemon=True
+            )
+            self._poller.start()
+
+    def _poll_loop(self) -> None:
+        while not self._stopped.wait(self.poll_seconds):
+            self.reload_if_changed()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            circuits = self._circuits or {}
+            return {
+                "generation": self._generation,
+                "lastError": self._last_error,
+                "circuits": {
+                    name: {
+                        kind: {"sha256": artifact.sha256[:12], "verified": artifact.verified}
+                        for kind, artifact in (
+                            ("wasm", circuit.wasm),
+                            ("zkey", circuit.zkey),
+                            ("verificationKey", circuit.verification_key),
+                        )
+                        if artifact is not None
+                    }
+                    for name, circuit in circuits.items()
+                },
+            }
+
+    def close(self) -> None:
+        self._stopped.set()
+
+
+_REGISTRIES: Dict[str, ArtifactRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_artifact_registry(circuit_root: Path) -> ArtifactRegistry:
+    # 回路ルートごとに共有レジストリを取得 (BACKEND_ARTIFACT_POLL_SECONDS ごとに変更を確認、0 で無効)
+    key = str(Path(circuit_root).resolve())
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(key)
+        if registry is None:
+            try:
+                poll_seconds = float(os.getenv("BACKEND_ARTIFACT_POLL_SECONDS", "5"))
+            except ValueError:
+                poll_seconds = 5.0
+            registry = ArtifactRegistry(Path(circuit_root), poll_seconds)
+            _REGISTRIES[key] = registry
+        return registry
+
+
+def write_manifest(circuit_root: Path, circuit_names: Optional[List[str]] = None) -> Path:
+    # 成果物の SHA-256 を計算してマニフェストを書き出す (指定外の回路・成果物以外の項目は維持)
+    circuit_root = Path(circuit_root)
+    manifest_path = circuit_root / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_bytes())
+    except FileNotFoundError:
+        manifest = {"circuits": []}
+    entries: List[Dict[str, object]] = manifest.get("circuits", [])
+    if circuit_names is None:
+        # 既存エントリが参照していない wasm だけを新しい回路として追加する
+        referenced = {
+            ((entry.get("artifacts") or {}).get("wasm") or {}).get("path") for entry in entries
+        }
+        known = list(dict.fromkeys(str(entry["name"]) for entry in entries))
+        circuit_names = known + sorted(
+            path.stem
+            for path in circuit_root.glob("*_js/*.wasm")
+            if path.relative_to(circuit_root).as_posix() not in referenced
+            and path.stem not in known
+        )
+
+    targets: List[Dict[str, object]] = []
+    for name in circuit_names:
+        # 回路名なら全バージョン、name@version ならそのバージョンのみを更新する
+        matched = [entry for entry in entries if name in (entry["name"], _entry_id(entry))]
+        if not matched:
+            base_name, _, version = name.partition("@")
+            matched = [{"name": base_name, "version": version or DEFAULT_CIRCUIT_VERSION}]
+            entries.extend(matched)
+        targets.extend(matched)
+
+    for entry in targets:
+        name = str(entry["name"])
+        previous = entry.get("artifacts") or {}
+        artifacts = {}
+        for kind in ARTIFACT_KINDS:
+            path = (previous.get(kind) or {}).get("path") or default_artifact_paths(name)[kind]
+            if not (circuit_root / path).exists():
+                continue
+            digest = hashlib.sha256((circuit_root / path).read_bytes()).hexdigest()
+            artifacts[kind] = {"path": path, "sha256": digest}
+        if "wasm" not in artifacts or "zkey" not in artifacts:
+            raise ArtifactError(f"missing wasm or zkey for circuit {_entry_id(entry)}")
+        entry["artifacts"] = artifacts
+    manifest["circuits"] = entries
+
+    temp_path = manifest_path.with_suffix(".json.tmp")
+    temp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    os.replace(temp_path, manifest_path)
+    return manifest_path
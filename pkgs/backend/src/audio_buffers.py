@@ -0,0 +1,140 @@
+import ctypes
+import os
+import threading
+from typing import Dict, List, Optional
+
+_POOL: Optional["AudioBufferPool"] = None
+_POOL_LOCK = threading.Lock()
+
+
+class AudioPayloadTooLargeError(ValueError):
+    # 音声ペイロードサイズ超過エラー
+    pass
+
+
+def _zero(data: bytearray, length: int) -> None:
+    # バッファ先頭 length バイトをコピーなしでゼロ埋めする
+    if length > 0:
+        ctypes.memset((ctypes.c_char * length).from_buffer(data), 0, length)
+
+
+class PooledAudioBuffer:
+    # プールから借りた音声バッファ (data[:length] が有効な音声データ)
+
+    def __init__(self, pool: "AudioBufferPool", data: bytearray):
+        self._pool = pool
+        self.data = data
+        self.length = 0
+
+    def view(self) -> memoryview:
+        # 有効部分のビューを返す (コピーしない)
+        return memoryview(self.data)[: self.length]
+
+    def reserve(self, size: int) -> None:
+        # size バイトを格納できるよう容量を確保する (上限を超えたらエラー)
+        if size <= len(self.data):
+            return
+        if size > self._pool.max_bytes:
+            raise AudioPayloadTooLargeError(f"audio payload exceeds {self._pool.max_bytes} bytes")
+        grown = bytearray(min(max(size, len(self.data) * 2), self._pool.max_bytes))
+        grown[: self.length] = memoryview(self.data)[: self.length]
+        _zero(self.data, self.length)
+        self.data = grown
+
+    def write(self, chunk) -> None:
+        # 末尾へデータを追記する
+        size = len(chunk)
+        self.reserve(self.length + size)
+        self.data[self.length : self.length + size] = chunk
+        self.length += size
+
+    def fill_from(self, stream, chunk_size: int = 64 * 1024) -> int:
+        # ストリームを終端まで読み、バッファへ直接書き込む (readinto が無ければ read で代用)
+        readinto = getattr(stream, "readinto", None)
+        while True:
+            room = min(chunk_size, self._pool.max_bytes - self.length)
+            if room <= 0:
+                if stream.read(1):
+                    raise AudioPayloadTooLargeError(
+                        f"audio payload exceeds {self._pool.max_bytes} bytes"
+                    )
+                return self.length
+            self.reserve(self.length + room)
+            if readinto is not None:
+                count = readinto(memoryview(self.data)[self.length : self.length + room])
+            else:
+                chunk = stream.read(room)
+                count = len(chunk)
+                self.data[self.length : self.length + count] = chunk
+            if not count:
+                return self.length
+            self.length += count
+
+    def release(self) -> None:
+        # 使用部分をゼロ埋めしてプールへ返却する
+        self._pool._release(self)
+
+    def __enter__(self) -> "PooledAudioBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class AudioBufferPool:
+    # 音声受信用バッファを再利用し、返却時にゼロ埋めして機微データを残さない
+
+    def __init__(
+        self,
+        initial_bytes: int = 1 << 20,
+        max_bytes: int = 25 << 20,
+        max_pooled: int = 4,
+        max_retained_bytes: int = 8 << 20,
+    ):
+        self.initial_bytes = initial_bytes
+        self.max_bytes = max_bytes
+        self.max_pooled = max_pooled
+        self.max_retained_bytes = max_retained_bytes
+        self._free: List[bytearray] = []
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "reused": 0}
+
+    def acquire(self) -> PooledAudioBuffer:
+        # 空きバッファを借りる (無ければ新規確保)
+        with self._lock:
+            self._stats["acquired"] += 1
+            if self._free:
+                self._stats["reused"] += 1
+                return PooledAudioBuffer(self, self._free.pop())
+        return PooledAudioBuffer(self, bytearray(self.initial_bytes))
+
+    def _release(self, buffer: PooledAudioBuffer) -> None:
+        data, length = buffer.data, buffer.length
+        buffer.data, buffer.length = bytearray(), 0
+        _zero(data, length)
+        with self._lock:
+            # 大きく伸びたバッファは保持せず解放する
+            if len(self._free) < self.max_pooled and len(data) <= self.max_retained_bytes:
+                self._free.append(data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "pooled": len(self._free)}
+
+
+def get_audio_buffer_pool() -> AudioBufferPool:
+    # 共有バッファプールを取得 (BACKEND_AUDIO_MAX_BYTES / BACKEND_AUDIO_BUFFER_POOL_SIZE)
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = AudioBufferPool(
+                max_bytes=int(os.getenv("BACKEND_AUDIO_MAX_BYTES", str(25 << 20))),
+                max_pooled=int(os.getenv("BACKEND_AUDIO_BUFFER_POOL_SIZE", "4")),
+            )
+        return _POOL
+
+
+def audio_buffer_pool_stats() -> Optional[Dict[str, int]]:
+    # 生成済みプールの統計を取得
+    with _POOL_LOCK:
+        return _POOL.stats() if _POOL is not None else None
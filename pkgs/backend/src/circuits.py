@@ -0,0 +1,93 @@
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from src.artifacts import ArtifactError, CircuitArtifacts, circuit_id, get_artifact_registry
+
+# リクエストで回路を指定しない場合の証明回路
+DEFAULT_PROOF_CIRCUIT = "VoiceOwnership"
+# 証明回路の公開シグナルのうち、参照特徴量へのコミットメント
+COMMITMENT_SIGNAL = "publicCommitment"
+
+
+class CircuitError(ValueError):
+    # 回路の指定・マニフェストの回路定義のエラー
+    pass
+
+
+class CircuitSpec(NamedTuple):
+    # マニフェストに記載された回路 (1バージョン) の定義
+    name: str
+    version: str
+    # ハミング距離のしきい値 (回路に埋め込まれた値と一致させる。証明回路以外は None)
+    threshold: Optional[int]
+    # 公開シグナルの並び (snarkjs の publicSignals の順)
+    public_signals: List[str]
+    default: bool
+
+    @property
+    def id(self) -> str:
+        return circuit_id(self.name, self.version)
+
+    def public_signal_index(self, signal: str) -> int:
+        try:
+            return self.public_signals.index(signal)
+        except ValueError as error:
+            raise CircuitError(f"circuit {self.id} has no public signal {signal}") from error
+
+
+def circuit_spec(circuit: CircuitArtifacts, default: bool = False) -> CircuitSpec:
+    # マニフェストの回路エントリから回路定義を構築
+    threshold = circuit.entry.get("threshold")
+    if threshold is not None and (
+        isinstance(threshold, bool) or not isinstance(threshold, int) or threshold < 0
+    ):
+        raise CircuitError(f"threshold of circuit {circuit.id} must be a non-negative integer")
+    public_signals = circuit.entry.get("publicSignals", [])
+    if not isinstance(public_signals, list) or not all(
+        isinstance(signal, str) for signal in public_signals
+    ):
+        raise CircuitError(f"publicSignals of circuit {circuit.id} must be a list of names")
+    return CircuitSpec(circuit.name, circuit.version, threshold, list(public_signals), default)
+
+
+def list_circuits(circuit_root: Path) -> List[CircuitSpec]:
+    # 登録されている全回路の定義 (マニフェストの記載順)
+    registry = get_artifact_registry(circuit_root)
+    specs = []
+    for key, circuit in registry.circuits().items():
+        try:
+            default = registry.resolve(circuit.name) == key
+        except ArtifactError:
+            default = False
+        specs.append(circuit_spec(circuit, default))
+    return specs
+
+
+def proof_circuits(circuit_root: Path) -> List[CircuitSpec]:
+    # しきい値を持つ (声の所有権を証明する) 回路の定義
+    return [spec for spec in list_circuits(circuit_root) if spec.threshold is not None]
+
+
+def resolve_circuit(
+    circuit_root: Path, circuit_name: str, version: Optional[str] = None
+) -> CircuitSpec:
+    # 回路名とバージョン (省略時は既定バージョン) から回路定義を取得
+    registry = get_artifact_registry(circuit_root)
+    try:
+        key = registry.resolve(circuit_name, version)
+        circuit = registry.circuits()[key]
+        default = registry.resolve(circuit.name) == key
+    except ArtifactError as error:
+        raise CircuitError(str(error)) from error
+    return circuit_spec(circuit, default)
+
+
+def resolve_proof_circuit(
+    circuit_root: Path, circuit_name: Optional[str] = None, version: Optional[str] = None
+) -> CircuitSpec:
+    # 証明生成リクエストの回路を解決 (しきい値と公開コミットメントを持つ回路のみ)
+    spec = resolve_circuit(circuit_root, circuit_name or DEFAULT_PROOF_CIRCUIT, version)
+    if spec.threshold is None:
+        raise CircuitError(f"circuit {spec.id} has no hamming threshold")
+    spec.public_signal_index(COMMITMENT_SIGNAL)
+    return spec
@@ -0,0 +1,160 @@
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import Flask, jsonify, request
+
+from src.audio_buffers import (
+    AudioPayloadTooLargeError,
+    audio_buffer_pool_stats,
+    get_audio_buffer_pool,
+)
+from src.feature_extraction import (
+    AudioDecodeError,
+    AudioFormatError,
+    AudioQualityError,
+    EmbeddingModelUnavailableError,
+    embedding_batcher_stats,
+    extract_voice_features,
+    extract_voice_features_batch,
+    extract_voice_features_from_audio,
+)
+from src.ffmpeg_pool import ffmpeg_pool_stats
+
+# 生の音声ボディとして受け付ける Content-Type
+RAW_AUDIO_MIME_TYPES = ("audio/wav", "audio/x-wav", "audio/webm")
+
+
+def _audio_upload() -> Optional[Tuple[object, str]]:
+    # 生ボディまたは multipart の audio ファイルなら (ストリーム, MIME タイプ) を返す
+    if request.mimetype in RAW_AUDIO_MIME_TYPES:
+        return request.stream, request.mimetype
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("audio")
+        if upload is not None:
+            return upload.stream, request.form.get("mimeType") or upload.mimetype or ""
+    return None
+
+
+def register_embedder_routes(app: Flask) -> Dict[str, Callable[[], object]]:
+    # 音声特徴量抽出のルートを登録し、/ready に載せる統計の取得関数を返す
+    @app.post("/extract-features")
+    def extract_features():
+        # 音声特徴量抽出エンドポイント
+        # JSON (Base64) に加え、生の audio/wav・audio/webm ボディと multipart の audio ファイルを受け付ける
+        upload = _audio_upload()
+        payload = (request.get_json(silent=True) or {}) if upload is None else {}
+        audio = payload.get("audio")
+        mime_type = payload.get("mimeType", "")
+        if upload is None and not audio:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": "audio field is required",
+                        }
+                    }
+                ),
+                400,
+            )
+
+        try:
+            # 音声特徴量を抽出 (アップロードはプールバッファへ直接読み込む)
+            if upload is not None:
+                stream, mime_type = upload
+                with get_audio_buffer_pool().acquire() as buffer:
+                    buffer.fill_from(stream)
+                    result = extract_voice_features_from_audio(buffer.view(), mime_type)
+            else:
+                result = extract_voice_features(audio, mime_type)
+            return jsonify(result), 200
+        except AudioPayloadTooLargeError as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "PAYLOAD_TOO_LARGE",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                413,
+            )
+        except (AudioFormatError, AudioQualityError, AudioDecodeError) as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "INVALID_AUDIO",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                400,
+            )
+        except EmbeddingModelUnavailableError as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "MODEL_UNAVAILABLE",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                503,
+            )
+
+    @app.post("/extract-features-batch")
+    def extract_features_batch():
+        # 複数音声の特徴量一括抽出エンドポイント (同時リクエストとまとめて推論)
+        payload = request.get_json(silent=True)
+        items = payload if isinstance(payload, list) else (payload or {}).get("items")
+        max_batch = int(os.getenv("BACKEND_MAX_EXTRACT_BATCH", "16"))
+        if not isinstance(items, list) or not items:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": "items must be a non-empty array",
+                        }
+                    }
+                ),
+                400,
+            )
+        if len(items) > max_batch:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": f"at most {max_batch} items are allowed per request",
+                        }
+                    }
+                ),
+                400,
+            )
+
+        try:
+            # 項目ごとの結果 (成功時は特徴量、失敗時は error) を入力順に返す
+            results = extract_voice_features_batch(items)
+            return jsonify({"results": results}), 200
+        except EmbeddingModelUnavailableError as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "MODEL_UNAVAILABLE",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                503,
+            )
+
+    return {
+        "embeddingBatcher": embedding_batcher_stats,
+        "ffmpegPool": ffmpeg_pool_stats,
+        "audioBuffers": audio_buffer_pool_stats,
+    }
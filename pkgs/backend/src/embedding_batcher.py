@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class _PendingEmbedding:
+    # バッチ待ちの波形1件分
+
+    def __init__(self, samples):
+        self.samples = samples
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[Exception] = None
+
+
+class EmbeddingBatcher:
+    # 同時に届いた波形を短時間だけ溜め、長さの近いもの同士で1回の推論にまとめる
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[object]], List[object]],
+        max_batch: int = 8,
+        max_wait_seconds: float = 0.005,
+        bucket_ratio: float = 1.1,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait_seconds = max(max_wait_seconds, 0.0)
+        self.bucket_ratio = max(bucket_ratio, 1.0)
+        self._queue: "queue.Queue[_PendingEmbedding]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"batches": 0, "items": 0, "largestBatch": 0}
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="embedding-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def embed(self, samples):
+        # 波形1件の埋め込みを取得 (他リクエストとまとめて推論される)
+        result = self.embed_many([samples])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def embed_many(self, samples_list: Sequence[object]) -> List[object]:
+        # 複数波形をまとめて投入し、入力順に埋め込みまたは例外を返す
+        self._ensure_thread()
+        pending = [_PendingEmbedding(samples) for samples in samples_list]
+        for item in pending:
+            self._queue.put(item)
+        results: List[object] = []
+        for item in pending:
+            item.done.wait()
+            results.append(item.error if item.error is not None else item.result)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _collect(self) -> List[_PendingEmbedding]:
+        # 最初の1件を待ち、その後 max_wait_seconds の間だけ追加の波形を集める
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _buckets(self, batch: List[_PendingEmbedding]) -> List[List[_PendingEmbedding]]:
+        # 長さ順に並べ、最短との比が bucket_ratio 以内のものを同じバケットにする
+        ordered = sorted(batch, key=lambda item: len(item.samples))
+        buckets: List[List[_PendingEmbedding]] = []
+        for item in ordered:
+            if buckets and len(item.samples) <= len(buckets[-1][0].samples) * self.bucket_ratio:
+                buckets[-1].append(item)
+            else:
+                buckets.append([item])
+        return buckets
+
+    def _run(self, bucket: List[_PendingEmbedding]) -> None:
+        try:
+            outputs = self.run_batch([item.samples for item in bucket])
+            if len(outputs) != len(bucket):
+                raise RuntimeError("embedding batch returned an unexpected number of results")
+            for item, output in zip(bucket, outputs):
+                item.result = output
+        except Exception as error:
+            for item in bucket:
+                item.error = error
+        finally:
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(bucket)
+                self._stats["largestBatch"] = max(self._stats["largestBatch"], len(bucket))
+            for item in bucket:
+                item.done.set()
+
+    def _loop(self) -> None:
+        while True:
+            for bucket in self._buckets(self._collect()):
+                self._run(bucket)
@@ -1,11 +1,17 @@
 import base64
-import gc
+import binascii
 import hashlib
 import io
 import os
+import struct
 import subprocess
-import wave
-from typing import Dict, List, Tuple
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.audio_buffers import AudioPayloadTooLargeError, PooledAudioBuffer, get_audio_buffer_pool
+from src.embedding_batcher import EmbeddingBatcher
+from src.ffmpeg_pool import FFMPEG_WAV_COMMAND, get_ffmpeg_pool
+from src.matroska import MatroskaParseError, parse_webm_info
 
 
 class AudioFormatError(ValueError):
@@ -30,6 +36,13 @@ class EmbeddingModelUnavailableError(RuntimeError):
 
 _INFERENCE = None
 _INFERENCE_MODEL_NAME = ""
+_ONNX_SESSION = None
+_ONNX_SESSION_PATH = ""
+_BATCHER: Optional[EmbeddingBatcher] = None
+_BATCHER_MODEL_NAME = ""
+_BATCHER_LOCK = threading.Lock()
+# Base64 を分割デコードする単位 (4文字の倍数)
+_BASE64_CHUNK_CHARS = 64 * 1024
 
 
 def _error_detail(error: Exception) -> str:
@@ -48,6 +61,23 @@ def decode_audio_base64(audio_base64: str) -> bytes:
         raise AudioFormatError("audio must be valid base64") from error
 
 
+def decode_audio_base64_into(audio_base64: str, buffer: PooledAudioBuffer) -> memoryview:
+    # Base64 文字列をチャンクごとにデコードし、借りたバッファへ直接書き込む
+    if not isinstance(audio_base64, str):
+        raise AudioFormatError("audio must be valid base64")
+    buffer.reserve(buffer.length + len(audio_base64) // 4 * 3)
+    try:
+        for start in range(0, len(audio_base64), _BASE64_CHUNK_CHARS):
+            chunk = audio_base64[start : start + _BASE64_CHUNK_CHARS]
+            # validate=True は base64 の文字以外を拒否する (strict_mode は Python 3.11 以降のため使わない)
+            buffer.write(base64.b64decode(chunk, validate=True))
+    except (binascii.Error, ValueError) as error:
+        if isinstance(error, AudioPayloadTooLargeError):
+            raise
+        raise AudioFormatError("audio must be valid base64") from error
+    return buffer.view()
+
+
 def detect_audio_format(audio_bytes: bytes, mime_type: str = "") -> str:
     # 音声データのフォーマットを検出
     lower_mime = mime_type.lower().strip()
@@ -65,76 +95,169 @@ def detect_audio_format(audio_bytes: bytes, mime_type: str = "") -> str:
     raise AudioFormatError("unsupported audio format (expected WAV or WebM)")
 
 
-def validate_audio_quality(audio_bytes: bytes, audio_format: str, min_seconds: float = 1.0) -> None:
-    # 音声データの品質を検証
+class WavHeader(NamedTuple):
+    # RIFF/WAVE ヘッダーの解析結果 (data はバッファ内のオフセットと長さで保持する)
+    sample_rate: int
+    channels: int
+    sample_width: int
+    data_offset: int
+    data_length: int
+
+    @property
+    def frame_count(self) -> int:
+        return self.data_length // (self.channels * self.sample_width)
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.sample_rate
+
+
+def parse_wav_header(audio_bytes: bytes) -> WavHeader:
+    # RIFF チャンクを1回だけ走査し、fmt と data の位置を取得する (サンプルはコピーしない)
+    if len(audio_bytes) < 12 or audio_bytes[:4] != b"RIFF" or audio_bytes[8:12] != b"WAVE":
+        raise AudioDecodeError("invalid WAV payload")
+
+    offset = 12
+    fmt: Optional[Tuple[int, int, int]] = None
+    while offset + 8 <= len(audio_bytes):
+        chunk_id = audio_bytes[offset : offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", audio_bytes, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if chunk_size < 16 or body + 16 > len(audio_bytes):
+                raise AudioDecodeError("invalid WAV fmt chunk")
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from(
+                "<HHIIHH", audio_bytes, body
+            )
+            if format_tag == 0xFFFE and chunk_size >= 26 and body + 26 <= len(audio_bytes):
+                # WAVE_FORMAT_EXTENSIBLE はサブフォーマット GUID の先頭2バイトが実際の形式
+                (format_tag,) = struct.unpack_from("<H", audio_bytes, body + 24)
+            if format_tag != 1:
+                raise AudioDecodeError(f"unsupported WAV format tag: {format_tag}")
+            fmt = (sample_rate, channels, (bits + 7) // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise AudioDecodeError("WAV data chunk precedes fmt chunk")
+            sample_rate, channels, sample_width = fmt
+            if sample_rate <= 0:
+                raise AudioDecodeError("invalid WAV sample rate")
+            if channels <= 0:
+                raise AudioDecodeError("invalid WAV channels")
+            if sample_width not in (1, 2, 4):
+                raise AudioDecodeError(f"unsupported WAV sample width: {sample_width}")
+            # ストリーム出力 (サイズ 0xFFFFFFFF 等) はバッファ末尾までを data とみなし、端数フレームは捨てる
+            available = min(chunk_size, len(audio_bytes) - body)
+            frame_size = channels * sample_width
+            return WavHeader(
+                sample_rate, channels, sample_width, body, available - available % frame_size
+            )
+        offset = body + chunk_size + (chunk_size & 1)
+    raise AudioDecodeError("WAV payload has no data chunk")
+
+
+def validate_audio_quality(
+    audio_bytes: bytes, audio_format: str, min_seconds: float = 1.0
+) -> Optional[WavHeader]:
+    # 音声データの品質を検証 (WAV は解析済みヘッダーを返し、デコード時に再利用する)
+    # ここでは録音長で安価に足切りし、発話区間の長さはデコード後に VAD で検証する (_trim_to_speech)
     if audio_format == "wav":
-        with wave.open(io.BytesIO(audio_bytes), "rb") as wav_file:
-            frame_rate = wav_file.getframerate()
-            frame_count = wav_file.getnframes()
-            duration = frame_count / frame_rate if frame_rate else 0
-            if duration < min_seconds:
-                raise AudioQualityError("audio is too short; minimum 1 second is required")
-        return
+        header = parse_wav_header(audio_bytes)
+        if header.duration < min_seconds:
+            raise AudioQualityError("audio is too short; minimum 1 second is required")
+        return header
 
     if audio_format == "webm":
-        # WebM duration parsing requires external decoders in this phase.
-        # Use a conservative size heuristic as quality gate fallback.
-        if len(audio_bytes) < 12_000:
+        # EBML ヘッダーの Duration (無ければ Block のタイムスタンプ) から再生時間を求め、デコード前に足切りする
+        try:
+            info = parse_webm_info(audio_bytes)
+        except MatroskaParseError as error:
+            raise AudioFormatError(f"invalid WebM container: {error}") from error
+        if info.duration < min_seconds:
             raise AudioQualityError("audio is too short; minimum 1 second is required")
-        return
+        return None
 
     raise AudioFormatError("unsupported audio format")
 
 
-def _deterministic_embedding(audio_bytes: bytes, dims: int = 512) -> List[float]:
-    # 音声データから決定論的な埋め込みベクトルを生成
-    values: List[float] = []
-    seed = audio_bytes
+def _deterministic_embedding(audio_bytes: bytes, dims: int = 512):
+    # 音声データから決定論的な埋め込みベクトルを生成 (float64 配列。レスポンスの features の値を変えないため)
+    np = _require_numpy()
+    digests = bytearray()
     counter = 0
-    while len(values) < dims:
-        digest = hashlib.sha256(seed + counter.to_bytes(4, "big")).digest()
-        for index in range(0, len(digest), 4):
-            if len(values) >= dims:
-                break
-            chunk = digest[index : index + 4]
-            number = int.from_bytes(chunk, "big", signed=False)
-            values.append((number / 0xFFFFFFFF) * 2.0 - 1.0)
+    # 音声部分のハッシュ状態を使い回し、カウンタだけを追記する (sha256(audio + counter) と同値)
+    prefix = hashlib.sha256(audio_bytes)
+    while len(digests) < dims * 4:
+        digest = prefix.copy()
+        digest.update(counter.to_bytes(4, "big"))
+        digests += digest.digest()
         counter += 1
-    return values
+    numbers = np.frombuffer(bytes(digests[: dims * 4]), dtype=">u4").astype(np.float64)
+    return (numbers / 0xFFFFFFFF) * 2.0 - 1.0
 
 
 def _decode_webm_to_wav(audio_bytes: bytes) -> bytes:
-    # ffmpeg を使って WebM を WAV(PCM16) に変換
-    command = [
-        "ffmpeg",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-i",
-        "pipe:0",
-        "-f",
-        "wav",
-        "-ac",
-        "1",
-        "-ar",
-        "16000",
-        "pipe:1",
-    ]
+    # ffmpeg を使って WebM を WAV(PCM16) に変換 (待機プロセスのプールがあれば再利用)
+    pool = get_ffmpeg_pool()
     try:
-        result = subprocess.run(
-            command,
-            input=audio_bytes,
-            capture_output=True,
-            check=True,
-        )
-        if not result.stdout:
+        if pool is not None:
+            output = pool.decode(audio_bytes)
+        else:
+            output = subprocess.run(
+                FFMPEG_WAV_COMMAND,
+                input=audio_bytes,
+                capture_output=True,
+                check=True,
+            ).stdout
+        if not output:
             raise AudioDecodeError("webm decode produced empty output")
-        return result.stdout
+        return output
     except FileNotFoundError as error:
         raise EmbeddingModelUnavailableError("ffmpeg is not installed") from error
-    except subprocess.CalledProcessError as error:
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as error:
+        raise AudioDecodeError("failed to decode WebM audio") from error
+
+
+def _require_av():
+    # PyAV を遅延ロード (未インストールなら None)
+    try:
+        import av
+    except Exception:
+        return None
+    return av
+
+
+def audio_decoder() -> str:
+    # BACKEND_AUDIO_DECODER から WebM デコーダーを取得 (auto / pyav / ffmpeg)
+    decoder = os.getenv("BACKEND_AUDIO_DECODER", "auto").strip().lower()
+    if decoder not in ("auto", "pyav", "ffmpeg"):
+        raise EmbeddingModelUnavailableError(f"unsupported audio decoder: {decoder}")
+    return decoder
+
+
+def _decode_webm_with_pyav(audio_bytes: bytes):
+    # PyAV でプロセス内デコードし、16kHz モノラル float32 配列へ直接リサンプリング
+    av = _require_av()
+    if av is None:
+        raise EmbeddingModelUnavailableError("PyAV is not available")
+    np = _require_numpy()
+    chunks = []
+    try:
+        with av.open(io.BytesIO(audio_bytes), mode="r") as container:
+            if not container.streams.audio:
+                raise AudioDecodeError("WebM payload has no audio stream")
+            resampler = av.AudioResampler(format="flt", layout="mono", rate=16000)
+            for frame in container.decode(container.streams.audio[0]):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+    except av.FFmpegError as error:
         raise AudioDecodeError("failed to decode WebM audio") from error
 
+    if not chunks:
+        raise AudioDecodeError("webm decode produced empty output")
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
 
 def _require_numpy():
     # numpy を遅延ロード
@@ -145,60 +268,47 @@ def _require_numpy():
     return np
 
 
-def _wav_bytes_to_mono_float32(wav_bytes: bytes):
+def _wav_bytes_to_mono_float32(wav_bytes: bytes, header: Optional[WavHeader] = None):
     # WAVバイト列をモノラルfloat32(-1.0..1.0)へ変換
+    # data チャンクはバッファのビューとして読み、スケーリングとダウンミックスは出力配列1つの上で行う
     np = _require_numpy()
-    try:
-        with wave.open(io.BytesIO(wav_bytes), "rb") as wav_file:
-            sample_rate = wav_file.getframerate()
-            channels = wav_file.getnchannels()
-            sample_width = wav_file.getsampwidth()
-            frame_count = wav_file.getnframes()
-            frames = wav_file.readframes(frame_count)
-    except wave.Error as error:
-        raise AudioDecodeError("invalid WAV payload") from error
-
-    if sample_rate <= 0:
-        raise AudioDecodeError("invalid WAV sample rate")
-    if channels <= 0:
-        raise AudioDecodeError("invalid WAV channels")
-
-    if sample_width == 1:
-        raw = np.frombuffer(frames, dtype=np.uint8).astype(np.float32)
-        raw = (raw - 128.0) / 128.0
-    elif sample_width == 2:
-        raw = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
-    elif sample_width == 4:
-        raw = np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 2147483648.0
-    else:
-        raise AudioDecodeError(f"unsupported WAV sample width: {sample_width}")
+    if header is None:
+        header = parse_wav_header(wav_bytes)
 
-    if channels > 1:
-        raw = raw.reshape(-1, channels).mean(axis=1)
+    dtype = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}[header.sample_width]
+    view = memoryview(wav_bytes)[header.data_offset : header.data_offset + header.data_length]
+    raw = np.frombuffer(view, dtype=dtype).reshape(-1, header.channels)
+    samples = np.empty(raw.shape[0], dtype=np.float32)
 
-    return raw.astype(np.float32), sample_rate
+    full_scale = {1: 128.0, 2: 32768.0, 4: 2147483648.0}[header.sample_width]
+    if header.channels == 1:
+        np.copyto(samples, raw[:, 0], casting="unsafe")
+    else:
+        np.sum(raw, axis=1, dtype=np.float32, out=samples)
+    if header.sample_width == 1:
+        samples -= 128.0 * header.channels
+    samples *= np.float32(1.0 / (full_scale * header.channels))
+    return samples, header.sample_rate
 
 
 def _resample_to_16k(samples, source_rate: int):
-    # 16kHzへ線形補間リサンプリング
-    np = _require_numpy()
-    target_rate = 16000
-    if source_rate == target_rate:
+    # 16kHzへ帯域制限付きポリフェーズ FIR でリサンプリング
+    _require_numpy()
+    from src.resampler import resample_polyphase
+
+    if source_rate == 16000:
         return samples
     if samples.size == 0:
         raise AudioDecodeError("empty audio samples")
-
-    source_index = np.linspace(0.0, 1.0, num=samples.shape[0], endpoint=False)
-    target_length = max(int(samples.shape[0] * target_rate / source_rate), 1)
-    target_index = np.linspace(0.0, 1.0, num=target_length, endpoint=False)
-    resampled = np.interp(target_index, source_index, samples).astype(np.float32)
-    return resampled.astype(np.float32)
+    return resample_polyphase(samples, source_rate, 16000)
 
 
 def _load_inference(model_name: str):
     # pyannote Inference を遅延ロード
     global _INFERENCE, _INFERENCE_MODEL_NAME
-    if _INFERENCE is not None and _INFERENCE_MODEL_NAME == model_name:
+    quantization = embedding_quantization()
+    key = f"{model_name}:{quantization}"
+    if _INFERENCE is not None and _INFERENCE_MODEL_NAME == key:
         return _INFERENCE
 
     try:
@@ -213,8 +323,10 @@ def _load_inference(model_name: str):
             os.environ["HF_TOKEN"] = hf_token
             os.environ["HUGGINGFACE_HUB_TOKEN"] = hf_token
         model = Model.from_pretrained(model_name)
+        if quantization == "int8":
+            model = _quantize_torch_model(model)
         _INFERENCE = Inference(model, window="whole")
-        _INFERENCE_MODEL_NAME = model_name
+        _INFERENCE_MODEL_NAME = key
         return _INFERENCE
     except Exception as error:
         raise EmbeddingModelUnavailableError(
@@ -222,105 +334,438 @@ def _load_inference(model_name: str):
         ) from error
 
 
-def _normalize_embedding_dims(embedding, dims: int = 512) -> List[float]:
-    # ベクトル次元を固定長へ正規化
+def _quantize_torch_model(model):
+    # Linear / LSTM の重みを int8 へ動的量子化する (活性は推論時に量子化)
+    # torch の動的量子化は Conv を対象外とするため、SincNet / TDNN の畳み込みは fp32 のまま残る
+    torch = _require_torch()
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8
+    )
+
+
+def _normalize_embedding_dims(embedding, dims: int = 512):
+    # ベクトル次元を固定長の配列へ正規化 (モデル出力は float32、決定論的な埋め込みは float64 のまま)
     np = _require_numpy()
-    flat = embedding.astype(np.float32).reshape(-1)
+    flat = np.asarray(embedding)
+    if flat.dtype != np.float64:
+        flat = flat.astype(np.float32)
+    flat = flat.reshape(-1)
     if flat.shape[0] >= dims:
-        out = flat[:dims]
-    else:
-        out = np.zeros(dims, dtype=np.float32)
-        out[: flat.shape[0]] = flat
-    return out.tolist()
+        return flat[:dims]
+    out = np.zeros(dims, dtype=flat.dtype)
+    out[: flat.shape[0]] = flat
+    return out
 
 
-def _extract_embedding_with_model(audio_bytes: bytes, audio_format: str) -> Tuple[List[float], str]:
-    # 音声データから埋め込みベクトルを抽出
+def _embedding_provider() -> Tuple[str, str]:
+    # 環境変数から埋め込みプロバイダーとモデル名を取得
     provider = os.getenv("BACKEND_EMBEDDING_PROVIDER", "pyannote").strip().lower()
     model_name = os.getenv("BACKEND_EMBEDDING_MODEL", "pyannote/embedding").strip()
+    if provider not in ("pyannote", "onnx", "deterministic"):
+        raise EmbeddingModelUnavailableError(f"unsupported embedding provider: {provider}")
+    return provider, model_name
+
+
+def embedding_quantization() -> str:
+    # BACKEND_EMBEDDING_QUANTIZE から推論時の量子化モードを取得 (none / int8)
+    mode = os.getenv("BACKEND_EMBEDDING_QUANTIZE", "none").strip().lower() or "none"
+    if mode not in ("none", "int8"):
+        raise EmbeddingModelUnavailableError(f"unsupported embedding quantization: {mode}")
+    return mode
+
+
+def _model_label(provider: str, model_name: str) -> str:
+    # レスポンスの modelUsed (量子化モデルは ":int8" を付けて区別する)
+    if provider != "deterministic" and embedding_quantization() == "int8":
+        return f"{provider}:{model_name}:int8"
+    return f"{provider}:{model_name}"
+
+
+def _load_waveform_16k(
+    audio_bytes: bytes,
+    audio_format: str,
+    wav_header: Optional[WavHeader] = None,
+    min_speech_seconds: Optional[float] = None,
+):
+    # 音声データを 16kHz モノラル float32 波形へ変換 (検証時に解析した WAV ヘッダーを再利用)
+    # min_speech_seconds を指定すると VAD で無音を除き、発話区間の長さを検証してからリサンプリングする
+    if audio_format != "wav":
+        # WebM は PyAV でプロセス内デコードし、利用できない場合のみ ffmpeg プロセスを使う
+        decoder = audio_decoder()
+        if decoder == "pyav" or (decoder == "auto" and _require_av() is not None):
+            samples, sample_rate = _decode_webm_with_pyav(audio_bytes), 16000
+        else:
+            samples, sample_rate = _wav_bytes_to_mono_float32(_decode_webm_to_wav(audio_bytes))
+    else:
+        samples, sample_rate = _wav_bytes_to_mono_float32(audio_bytes, wav_header)
 
-    if provider == "deterministic":
-        embedding = _deterministic_embedding(audio_bytes, dims=512)
-        return embedding, f"{provider}:{model_name}"
+    speech = samples
+    if min_speech_seconds is not None and vad_enabled():
+        speech = _trim_to_speech(samples, sample_rate, min_speech_seconds)
+    waveform = _resample_to_16k(speech, sample_rate)
+    # 返却しない中間配列はゼロ埋めする
+    np = _require_numpy()
+    for intermediate in (samples, speech):
+        if not np.shares_memory(intermediate, waveform):
+            _zero_array(intermediate)
+    return waveform
 
-    if provider != "pyannote":
-        raise EmbeddingModelUnavailableError(f"unsupported embedding provider: {provider}")
 
-    wav_bytes = audio_bytes if audio_format == "wav" else _decode_webm_to_wav(audio_bytes)
-    samples, sample_rate = _wav_bytes_to_mono_float32(wav_bytes)
-    samples = _resample_to_16k(samples, sample_rate)
+def vad_enabled() -> bool:
+    # BACKEND_VAD=0 で発話区間検出を無効化 (既定は有効)
+    return os.getenv("BACKEND_VAD", "1").strip() != "0"
+
 
+def _trim_to_speech(samples, sample_rate: int, min_seconds: float):
+    # 前後の無音と長い途中の無音を除き、残った発話区間が min_seconds 未満なら拒否する
+    from src.vad import trim_silence
+
+    max_pause = _env_number("BACKEND_VAD_MAX_PAUSE_MS", 300) / 1000.0
+    speech, speech_seconds = trim_silence(samples, sample_rate, max_pause_seconds=max_pause)
+    if speech_seconds < min_seconds:
+        raise AudioQualityError(
+            f"audio contains too little speech ({speech_seconds:.2f}s); "
+            "minimum 1 second is required"
+        )
+    return speech
+
+
+def _require_torch():
+    # torch を遅延ロード
     try:
         import torch
     except Exception as error:
         raise EmbeddingModelUnavailableError("torch is not available") from error
+    return torch
+
 
+def _run_pyannote_batch(model_name: str, waveforms: List[object]) -> List[object]:
+    # 波形をゼロ埋めで揃え、パディング部分を weights で無視して1回の順伝播で埋め込みを計算
+    torch = _require_torch()
+    np = _require_numpy()
     inference = _load_inference(model_name)
-    waveform = torch.from_numpy(samples).unsqueeze(0)
 
     try:
-        embedding = inference({"waveform": waveform, "sample_rate": 16000})
+        if len(waveforms) == 1:
+            waveform = torch.from_numpy(waveforms[0]).unsqueeze(0)
+            embedding = inference({"waveform": waveform, "sample_rate": 16000})
+            return [np.asarray(embedding, dtype=np.float32)]
+
+        length = max(waveform.shape[0] for waveform in waveforms)
+        batch = np.zeros((len(waveforms), 1, length), dtype=np.float32)
+        weights = np.zeros((len(waveforms), length), dtype=np.float32)
+        for index, waveform in enumerate(waveforms):
+            batch[index, 0, : waveform.shape[0]] = waveform
+            weights[index, : waveform.shape[0]] = 1.0
+
+        model = inference.model
+        with torch.inference_mode():
+            try:
+                outputs = model(
+                    torch.from_numpy(batch).to(model.device),
+                    weights=torch.from_numpy(weights).to(model.device),
+                )
+            except TypeError:
+                # weights を受け付けないモデルは1件ずつ推論する
+                return [_run_pyannote_batch(model_name, [waveform])[0] for waveform in waveforms]
+        return list(outputs.detach().cpu().numpy().astype(np.float32))
+    except EmbeddingModelUnavailableError:
+        raise
     except Exception as error:
         raise EmbeddingModelUnavailableError(
             f"embedding inference failed ({_error_detail(error)})"
         ) from error
 
+
+def _onnx_model_path() -> str:
+    # BACKEND_EMBEDDING_ONNX_PATH からエクスポート済みモデルのパスを取得
+    path = os.getenv("BACKEND_EMBEDDING_ONNX_PATH", "").strip()
+    if not path:
+        raise EmbeddingModelUnavailableError("BACKEND_EMBEDDING_ONNX_PATH is not set")
+    return path
+
+
+def _quantized_onnx_path(path: str) -> str:
+    # int8 モデルのパス (<name>.int8.onnx)。事前量子化済みが無ければ初回ロード時に生成する
+    root, _ = os.path.splitext(path)
+    target = f"{root}.int8.onnx"
+    if os.path.exists(target):
+        return target
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(path, target, weight_type=QuantType.QInt8)
+    except Exception as error:
+        raise EmbeddingModelUnavailableError(
+            f"failed to quantize ONNX embedding model: {path} ({_error_detail(error)})"
+        ) from error
+    return target
+
+
+def _load_onnx_session(path: str):
+    # ONNX Runtime の CPU セッションを遅延ロード (スレッド数は環境変数で調整)
+    global _ONNX_SESSION, _ONNX_SESSION_PATH
+    if _ONNX_SESSION is not None and _ONNX_SESSION_PATH == path:
+        return _ONNX_SESSION
+
+    try:
+        import onnxruntime
+    except Exception as error:
+        raise EmbeddingModelUnavailableError("onnxruntime is not available") from error
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    # 既定は割り当て CPU 数。Cloud Run の CPU 制限下で待機スレッドが CPU を消費しないようスピンを止める
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    options.intra_op_num_threads = int(_env_number("BACKEND_ONNX_INTRA_OP_THREADS", cpus or 1))
+    options.inter_op_num_threads = int(_env_number("BACKEND_ONNX_INTER_OP_THREADS", 1))
+    options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+    try:
+        _ONNX_SESSION = onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        _ONNX_SESSION_PATH = path
+        return _ONNX_SESSION
+    except Exception as error:
+        raise EmbeddingModelUnavailableError(
+            f"failed to load ONNX embedding model: {path} ({_error_detail(error)})"
+        ) from error
+
+
+def _run_onnx_batch(waveforms: List[object]) -> List[object]:
+    # 波形 (batch, 1, samples) を入力とするグラフで埋め込みを計算
+    # 2つ目の入力 (weights) があればゼロ埋めした一括推論、無ければ長さの異なる波形を1件ずつ推論する
     np = _require_numpy()
-    embedding_array = np.asarray(embedding, dtype=np.float32)
-    normalized = _normalize_embedding_dims(embedding_array, dims=512)
-    return normalized, f"{provider}:{model_name}"
+    path = _onnx_model_path()
+    if embedding_quantization() == "int8":
+        path = _quantized_onnx_path(path)
+    session = _load_onnx_session(path)
+    inputs = session.get_inputs()
+    rank = len(inputs[0].shape)
+
+    def run(batch, weights=None):
+        feeds = {inputs[0].name: batch if rank == 3 else batch[:, 0, :]}
+        if weights is not None:
+            feeds[inputs[1].name] = weights
+        return session.run(None, feeds)[0]
+
+    try:
+        lengths = {waveform.shape[0] for waveform in waveforms}
+        if len(inputs) < 2 and len(lengths) > 1:
+            return [run(waveform[None, None, :])[0] for waveform in waveforms]
+
+        length = max(lengths)
+        batch = np.zeros((len(waveforms), 1, length), dtype=np.float32)
+        weights = np.zeros((len(waveforms), length), dtype=np.float32)
+        for index, waveform in enumerate(waveforms):
+            batch[index, 0, : waveform.shape[0]] = waveform
+            weights[index, : waveform.shape[0]] = 1.0
+        outputs = run(batch, weights if len(inputs) >= 2 else None)
+        return list(np.asarray(outputs, dtype=np.float32).reshape(len(waveforms), -1))
+    except Exception as error:
+        raise EmbeddingModelUnavailableError(
+            f"embedding inference failed ({_error_detail(error)})"
+        ) from error
+
+
+def _run_embedding_batch(provider: str, model_name: str, waveforms: List[object]) -> List[object]:
+    # プロバイダーごとのバッチ推論へ振り分ける
+    if provider == "onnx":
+        return _run_onnx_batch(waveforms)
+    return _run_pyannote_batch(model_name, waveforms)
 
 
-def binarize_embedding(embedding: List[float], threshold: float = 0.0) -> List[int]:
-    # 埋め込みベクトルを二値化
-    return [1 if value >= threshold else 0 for value in embedding]
+def _env_number(name: str, default: float) -> float:
+    # 数値の環境変数を読み込む
+    try:
+        return float(os.getenv(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+def get_embedding_batcher(
+    model_name: str, provider: str = "pyannote"
+) -> Optional[EmbeddingBatcher]:
+    # モデルごとのマイクロバッチャーを取得 (BACKEND_EMBEDDING_BATCH_SIZE<=1 なら無効)
+    global _BATCHER, _BATCHER_MODEL_NAME
+    max_batch = int(_env_number("BACKEND_EMBEDDING_BATCH_SIZE", 8))
+    if max_batch <= 1:
+        return None
+    key = _model_label(provider, model_name)
+    with _BATCHER_LOCK:
+        if _BATCHER is None or _BATCHER_MODEL_NAME != key:
+            _BATCHER = EmbeddingBatcher(
+                lambda waveforms: _run_embedding_batch(provider, model_name, waveforms),
+                max_batch=max_batch,
+                max_wait_seconds=_env_number("BACKEND_EMBEDDING_BATCH_WAIT_MS", 5) / 1000.0,
+                bucket_ratio=_env_number("BACKEND_EMBEDDING_BUCKET_RATIO", 1.1),
+            )
+            _BATCHER_MODEL_NAME = key
+        return _BATCHER
+
+
+def embedding_batcher_stats() -> Optional[Dict[str, int]]:
+    # 生成済みマイクロバッチャーの統計を取得
+    with _BATCHER_LOCK:
+        return _BATCHER.stats() if _BATCHER is not None else None
+
+
+def _embed_waveforms(
+    model_name: str, waveforms: List[object], provider: str = "pyannote"
+) -> List[object]:
+    # 波形ごとの埋め込み (失敗時は例外) を入力順に返す
+    batcher = get_embedding_batcher(model_name, provider)
+    if batcher is not None:
+        return batcher.embed_many(waveforms)
+    results: List[object] = []
+    for waveform in waveforms:
+        try:
+            results.append(_run_embedding_batch(provider, model_name, [waveform])[0])
+        except EmbeddingModelUnavailableError as error:
+            results.append(error)
+    return results
+
+
+def warm_embedding_model() -> str:
+    # 埋め込みモデルを読み込み、1秒の合成波形でダミー推論を実行する
+    provider, model_name = _embedding_provider()
+    if provider in ("pyannote", "onnx"):
+        np = _require_numpy()
+        seconds = np.arange(16000, dtype=np.float32) / 16000.0
+        waveform = (0.1 * np.sin(2.0 * np.pi * 220.0 * seconds)).astype(np.float32)
+        _run_embedding_batch(provider, model_name, [waveform])
+    return _model_label(provider, model_name)
+
+
+def _extract_embedding_with_model(
+    audio_bytes: bytes, audio_format: str, wav_header: Optional[WavHeader] = None
+) -> Tuple[object, str]:
+    # 音声データから埋め込みベクトルを抽出
+    provider, model_name = _embedding_provider()
+    if provider == "deterministic":
+        embedding = _deterministic_embedding(audio_bytes, dims=512)
+        return embedding, _model_label(provider, model_name)
+
+    samples = _load_waveform_16k(audio_bytes, audio_format, wav_header, min_speech_seconds=1.0)
+    try:
+        embedding = _embed_waveforms(model_name, [samples], provider)[0]
+    finally:
+        _zero_array(samples)
+    if isinstance(embedding, Exception):
+        raise embedding
+    normalized = _normalize_embedding_dims(embedding, dims=512)
+    return normalized, _model_label(provider, model_name)
+
+
+def binarize_embedding(embedding, threshold: float = 0.0):
+    # 埋め込みベクトルを uint8 の 0/1 配列へ二値化
+    np = _require_numpy()
+    values = np.asarray(embedding)
+    if values.dtype.kind != "f":
+        values = values.astype(np.float32)
+    return (values >= threshold).astype(np.uint8)
 
 
-def pack_binary_features(binary_features: List[int]) -> List[int]:
-    # 二値化された特徴量をパック
-    if len(binary_features) != 512:
+def pack_binary_features(binary_features):
+    # 二値化された特徴量を 64bit リム 8 個へパック (リム内はビット0から順に下位ビット)
+    np = _require_numpy()
+    bits = np.asarray(binary_features)
+    if bits.shape != (512,):
         raise ValueError("binary feature length must be 512")
-    if any(bit not in (0, 1) for bit in binary_features):
+    if ((bits != 0) & (bits != 1)).any():
         raise ValueError("binary features must contain only 0 or 1")
 
-    packed: List[int] = []
-    for block_start in range(0, 512, 64):
-        block = binary_features[block_start : block_start + 64]
-        value = 0
-        for bit_index, bit in enumerate(block):
-            value |= (bit & 1) << bit_index
-        packed.append(value)
-    return packed
+    packed = np.packbits(bits.astype(np.uint8), bitorder="little")
+    return packed.view("<u8").astype(np.uint64)
 
 
-def extract_voice_features(audio_base64: str, mime_type: str = "") -> Dict[str, object]:
-    # 音声データから特徴量を抽出
-    audio_bytes = b""
-    embedding: List[float] = []
-    binary_features: List[int] = []
-    packed_features: List[int] = []
-    audio_format = ""
-    model_used = ""
+def _zero_array(values) -> None:
+    # 書き込み可能な numpy 配列をその場でゼロ埋めする
+    if values is not None and getattr(values, "flags", None) is not None and values.flags.writeable:
+        values.fill(0)
 
+
+def _build_features_response(embedding, audio_format: str, model_used: str) -> Dict[str, object]:
+    # 埋め込みを二値化・パックし、JSON 境界でのみ Python のリストへ変換する
+    embedding = _normalize_embedding_dims(embedding, dims=512)
+    binary_features = binarize_embedding(embedding)
+    packed_features = pack_binary_features(binary_features)
+    return {
+        "features": embedding.tolist(),
+        "binaryFeatures": binary_features.tolist(),
+        "packedFeatures": packed_features.tolist(),
+        "format": audio_format,
+        "modelUsed": model_used,
+    }
+
+
+def extract_voice_features_from_audio(audio_bytes, mime_type: str = "") -> Dict[str, object]:
+    # 音声バイト列 (bytes / memoryview) から特徴量を抽出
+    embedding = None
     try:
-        audio_bytes = decode_audio_base64(audio_base64)
         audio_format = detect_audio_format(audio_bytes, mime_type)
-        validate_audio_quality(audio_bytes, audio_format, min_seconds=1.0)
-        embedding, model_used = _extract_embedding_with_model(audio_bytes, audio_format)
-        binary_features = binarize_embedding(embedding)
-        packed_features = pack_binary_features(binary_features)
-
-        return {
-            "features": embedding,
-            "binaryFeatures": binary_features,
-            "packedFeatures": packed_features,
-            "format": audio_format,
-            "modelUsed": model_used,
-        }
+        wav_header = validate_audio_quality(audio_bytes, audio_format, min_seconds=1.0)
+        embedding, model_used = _extract_embedding_with_model(audio_bytes, audio_format, wav_header)
+        return _build_features_response(embedding, audio_format, model_used)
+    finally:
+        # 埋め込みベクトルをゼロ埋めして機微データを残さない
+        _zero_array(embedding)
+
+
+def extract_voice_features(audio_base64: str, mime_type: str = "") -> Dict[str, object]:
+    # Base64 音声データから特徴量を抽出 (デコード先は返却時にゼロ埋めされるプールバッファ)
+    with get_audio_buffer_pool().acquire() as buffer:
+        audio_bytes = decode_audio_base64_into(audio_base64, buffer)
+        return extract_voice_features_from_audio(audio_bytes, mime_type)
+
+
+def extract_voice_features_batch(items: List[object]) -> List[Dict[str, object]]:
+    # 複数音声の特徴量を抽出し、項目ごとの結果またはエラーを入力順に返す
+    provider, model_name = _embedding_provider()
+    model_used = _model_label(provider, model_name)
+    results: List[Dict[str, object]] = [{} for _ in items]
+    pending: List[Tuple[int, str, object]] = []
+    pool = get_audio_buffer_pool()
+
+    try:
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict) or not item.get("audio"):
+                    raise AudioFormatError("audio field is required")
+                with pool.acquire() as buffer:
+                    audio_bytes = decode_audio_base64_into(item["audio"], buffer)
+                    audio_format = detect_audio_format(audio_bytes, str(item.get("mimeType", "")))
+                    wav_header = validate_audio_quality(audio_bytes, audio_format, min_seconds=1.0)
+                    if provider == "deterministic":
+                        embedding = _deterministic_embedding(audio_bytes, dims=512)
+                        results[index] = _build_features_response(
+                            embedding, audio_format, model_used
+                        )
+                        _zero_array(embedding)
+                        continue
+                    samples = _load_waveform_16k(
+                        audio_bytes, audio_format, wav_header, min_speech_seconds=1.0
+                    )
+                    pending.append((index, audio_format, samples))
+            except AudioPayloadTooLargeError as error:
+                results[index] = {"error": {"code": "PAYLOAD_TOO_LARGE", "message": str(error)}}
+            except (AudioFormatError, AudioQualityError, AudioDecodeError) as error:
+                results[index] = {"error": {"code": "INVALID_AUDIO", "message": str(error)}}
+            except EmbeddingModelUnavailableError as error:
+                results[index] = {"error": {"code": "MODEL_UNAVAILABLE", "message": str(error)}}
+
+        # デコード済みの波形をまとめて推論
+        embeddings = _embed_waveforms(model_name, [entry[2] for entry in pending], provider)
+        for (index, audio_format, _), embedding in zip(pending, embeddings):
+            if isinstance(embedding, Exception):
+                results[index] = {"error": {"code": "MODEL_UNAVAILABLE", "message": str(embedding)}}
+                continue
+            results[index] = _build_features_response(embedding, audio_format, model_used)
+            _zero_array(embedding)
+        return results
     finally:
-        # メモリ上の敏感なデータを明示的にクリア
-        audio_bytes = b""
-        embedding = []
-        binary_features = []
-        packed_features = []
-        gc.collect()
+        # 波形をゼロ埋めして機微データを残さない
+        for _, _, samples in pending:
+            _zero_array(samples)
@@ -0,0 +1,169 @@
+import os
+import queue
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional
+
+# WebM を 16kHz モノラル WAV(PCM16) へ変換する ffmpeg コマンド
+FFMPEG_WAV_COMMAND = [
+    "ffmpeg",
+    "-hide_banner",
+    "-loglevel",
+    "error",
+    "-i",
+    "pipe:0",
+    "-f",
+    "wav",
+    "-ac",
+    "1",
+    "-ar",
+    "16000",
+    "pipe:1",
+]
+
+# デコード時間ヒストグラムのバケット上限 (ミリ秒)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_POOL: Optional["FfmpegDecodePool"] = None
+_POOL_LOCK = threading.Lock()
+
+
+class FfmpegDecodePool:
+    # 起動済みで stdin 待ちの ffmpeg プロセスを常に用意しておき、起動コストをリクエスト外へ追い出す
+    # ffmpeg は1プロセス1入力しか扱えないため、各プロセスは1ジョブで使い捨て、裏で補充する
+
+    def __init__(self, size: int = 2, command: Optional[List[str]] = None, timeout: float = 30.0):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self.command = list(command or FFMPEG_WAV_COMMAND)
+        self.timeout = timeout
+        self._standby: "queue.Queue[subprocess.Popen]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._stats = {"jobs": 0, "failures": 0, "spawned": 0, "stale": 0}
+        self._started = False
+
+    def _spawn(self) -> subprocess.Popen:
+        process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        with self._lock:
+            self._stats["spawned"] += 1
+        return process
+
+    def _replenish(self) -> None:
+        # 待機プロセスを1つ補充する (起動失敗時は次回のジョブで同期起動する)
+        try:
+            self._standby.put(self._spawn())
+        except OSError:
+            pass
+
+    def start(self) -> None:
+        # 待機プロセスを size 個起動する (ffmpeg が無ければ FileNotFoundError)
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.size):
+            self._standby.put(self._spawn())
+
+    def _take(self) -> subprocess.Popen:
+        # 生きている待機プロセスを取り出す (無ければその場で起動)
+        while True:
+            try:
+                process = self._standby.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if process.poll() is None:
+                return process
+            with self._lock:
+                self._stats["stale"] += 1
+            process.communicate()
+
+    def decode(self, audio_bytes: bytes) -> bytes:
+        # 待機プロセスへ入力を流し込み、WAV 出力を返す
+        # 失敗時は subprocess.run(check=True) と同じ例外を送出する
+        self.start()
+        with self._slots:
+            started = time.perf_counter()
+            process = self._take()
+            threading.Thread(target=self._replenish, daemon=True).start()
+            try:
+                stdout, stderr = process.communicate(audio_bytes, timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                self._record(started, failed=True)
+                raise
+            if process.returncode != 0:
+                self._record(started, failed=True)
+                raise subprocess.CalledProcessError(
+                    process.returncode, self.command, output=stdout, stderr=stderr
+                )
+            self._record(started, failed=False)
+            return stdout
+
+    def _record(self, started: float, failed: bool) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        bucket = next(
+            (index for index, limit in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= limit),
+            len(LATENCY_BUCKETS_MS),
+        )
+        with self._lock:
+            self._stats["jobs"] += 1
+            if failed:
+                self._stats["failures"] += 1
+            self._histogram[bucket] += 1
+
+    def stats(self) -> Dict[str, object]:
+        # ジョブ数と累積でないバケット別のデコード時間ヒストグラムを返す
+        with self._lock:
+            histogram = {
+                f"le{limit}ms": count for limit, count in zip(LATENCY_BUCKETS_MS, self._histogram)
+            }
+            histogram["inf"] = self._histogram[-1]
+            return {
+                **self._stats,
+                "size": self.size,
+                "standby": self._standby.qsize(),
+                "latencyHistogram": histogram,
+            }
+
+    def close(self) -> None:
+        # 待機中のプロセスを停止
+        while True:
+            try:
+                process = self._standby.get_nowait()
+            except queue.Empty:
+                return
+            process.kill()
+            process.communicate()
+
+
+def get_ffmpeg_pool() -> Optional[FfmpegDecodePool]:
+    # 共有 ffmpeg プールを取得 (BACKEND_FFMPEG_POOL_SIZE=0 なら None)
+    global _POOL
+    try:
+        size = int(os.getenv("BACKEND_FFMPEG_POOL_SIZE", "2").strip() or "2")
+    except ValueError:
+        size = 2
+    if size <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = FfmpegDecodePool(
+                size=size, timeout=float(os.getenv("BACKEND_FFMPEG_TIMEOUT_SECONDS", "30"))
+            )
+        return _POOL
+
+
+def ffmpeg_pool_stats() -> Optional[Dict[str, object]]:
+    # 生成済みプールの統計を取得
+    with _POOL_LOCK:
+        return _POOL.stats() if _POOL is not None else None
@@ -0,0 +1,268 @@
+import json
+import secrets
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from src.artifacts import ArtifactError, get_artifact_registry
+
+
+class ProofVerificationError(ValueError):
+    # 証明検証エラー (入力形式の不正など)
+    pass
+
+
+class VerifierUnavailableError(RuntimeError):
+    # ペアリングライブラリ利用不可エラー
+    pass
+
+
+_PREPARED_KEYS: Dict[str, Tuple[str, "PreparedVerificationKey"]] = {}
+_PREPARED_KEYS_LOCK = threading.Lock()
+
+
+def _require_bn128():
+    # py_ecc の BN254 実装を遅延ロード
+    try:
+        from py_ecc.optimized_bn128 import optimized_curve, optimized_pairing
+    except Exception as error:
+        raise VerifierUnavailableError("py_ecc is not available") from error
+    return optimized_curve, optimized_pairing
+
+
+def _parse_int(value: object, modulus: int, name: str) -> int:
+    try:
+        parsed = int(str(value))
+    except ValueError as error:
+        raise ProofVerificationError(f"{name} must be an integer string") from error
+    if parsed < 0 or parsed >= modulus:
+        raise ProofVerificationError(f"{name} is out of range")
+    return parsed
+
+
+def _parse_g1(value: object, name: str):
+    # snarkjs 形式の射影座標 [x, y, z] を G1 点へ変換
+    curve, _ = _require_bn128()
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ProofVerificationError(f"{name} must be a G1 point")
+    x, y, z = (_parse_int(item, curve.field_modulus, name) for item in value)
+    point = (curve.FQ(x), curve.FQ(y), curve.FQ(z))
+    if curve.is_inf(point) or not curve.is_on_curve(point, curve.b):
+        raise ProofVerificationError(f"{name} is not a valid G1 point")
+    return point
+
+
+def _parse_g2(value: object, name: str):
+    # snarkjs 形式の射影座標 [[x0, x1], [y0, y1], [z0, z1]] を G2 点へ変換
+    curve, _ = _require_bn128()
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ProofVerificationError(f"{name} must be a G2 point")
+    coordinates = []
+    for item in value:
+        if not isinstance(item, (list, tuple)) or len(item) != 2:
+            raise ProofVerificationError(f"{name} must be a G2 point")
+        coordinates.append(
+            curve.FQ2([_parse_int(part, curve.field_modulus, name) for part in item])
+        )
+    point = tuple(coordinates)
+    if curve.is_inf(point) or not curve.is_on_curve(point, curve.b2):
+        raise ProofVerificationError(f"{name} is not a valid G2 point")
+    if not curve.is_inf(curve.multiply(point, curve.curve_order)):
+        raise ProofVerificationError(f"{name} is not in the G2 subgroup")
+    return point
+
+
+class _PreparedG2:
+    # 固定 G2 点のミラーループ直線係数を事前計算したもの
+    # アフィン座標の P に対して分母は P に依存しないため、その積の逆元もまとめて保持する
+
+    def __init__(self, point):
+        _, pairing = _require_bn128()
+        fq12 = pairing.FQ12
+        q = pairing.twist(point)
+        self.steps: List[Tuple[bool, Tuple[object, object, object]]] = []
+        denominator = fq12.one()
+
+        r = q
+        for bit in pairing.pseudo_binary_encoding[63::-1]:
+            coefficients, line_denominator = self._line(r, r)
+            self.steps.append((True, coefficients))
+            denominator = denominator * denominator * line_denominator
+            r = pairing.double(r)
+            if bit:
+                other = q if bit == 1 else pairing.neg(q)
+                coefficients, line_denominator = self._line(r, other)
+                self.steps.append((False, coefficients))
+                denominator = denominator * line_denominator
+                r = pairing.add(r, other)
+
+        field_modulus = pairing.field_modulus
+        q1 = (q[0] ** field_modulus, q[1] ** field_modulus, q[2] ** field_modulus)
+        nq2 = (q1[0] ** field_modulus, -q1[1] ** field_modulus, q1[2] ** field_modulus)
+        for other in (q1, nq2):
+            coefficients, line_denominator = self._line(r, other)
+            self.steps.append((False, coefficients))
+            denominator = denominator * line_denominator
+            r = pairing.add(r, other)
+        self.denominator_inverse = fq12.one() / denominator
+
+    @staticmethod
+    def _line(p1, p2):
+        # py_ecc の linefunc を a*x + b*y + c (分母 d) の形へ展開
+        x1, y1, z1 = p1
+        x2, y2, z2 = p2
+        zero = x1.zero()
+        slope_numerator = y2 * z1 - y1 * z2
+        slope_denominator = x2 * z1 - x1 * z2
+        if slope_denominator == zero:
+            if slope_numerator != zero:
+                return (z1, zero, -x1), z1
+            slope_numerator = x1 * x1 * 3
+            slope_denominator = y1 * z1 * 2
+        return (
+            (
+                slope_numerator * z1,
+                -(slope_denominator * z1),
+                slope_denominator * y1 - slope_numerator * x1,
+            ),
+            slope_denominator * z1,
+        )
+
+
+def _multi_miller_loop_prepared(pairs: Sequence[Tuple[_PreparedG2, object]]):
+    # 事前計算済み G2 点と G1 点の組についてミラーループをまとめて評価
+    curve, pairing = _require_bn128()
+    affine = []
+    for prepared, point in pairs:
+        x, y = curve.normalize(point)
+        affine.append((prepared, x.n, y.n))
+
+    result = pairing.FQ12.one()
+    for step_index in range(len(affine[0][0].steps)):
+        if affine[0][0].steps[step_index][0]:
+            result = result * result
+        for prepared, x, y in affine:
+            a, b, c = prepared.steps[step_index][1]
+            result = result * (a * x + b * y + c)
+    for prepared, _, _ in affine:
+        result = result * prepared.denominator_inverse
+    return result
+
+
+class PreparedVerificationKey:
+    # 検証鍵とペアリング定数 (e(alpha, beta)^-1, gamma/delta の直線係数) のキャッシュ
+
+    def __init__(self, verification_key: Dict[str, object]):
+        curve, pairing = _require_bn128()
+        if verification_key.get("protocol") != "groth16":
+            raise ProofVerificationError("verification key protocol must be groth16")
+        self.n_public = int(verification_key["nPublic"])
+        self.ic = [_parse_g1(point, "IC") for point in verification_key["IC"]]
+        if len(self.ic) != self.n_public + 1:
+            raise ProofVerificationError("verification key IC length mismatch")
+        alpha = _parse_g1(verification_key["vk_alpha_1"], "vk_alpha_1")
+        beta = _parse_g2(verification_key["vk_beta_2"], "vk_beta_2")
+        self.gamma = _PreparedG2(_parse_g2(verification_key["vk_gamma_2"], "vk_gamma_2"))
+        self.delta = _PreparedG2(_parse_g2(verification_key["vk_delta_2"], "vk_delta_2"))
+        alpha_beta = pairing.final_exponentiate(
+            pairing.miller_loop(
+                pairing.twist(beta), pairing.cast_point_to_fq12(alpha), final_exponentiate=False
+            )
+        )
+        self.alpha_beta_inverse = pairing.FQ12.one() / alpha_beta
+        self.curve_order = curve.curve_order
+
+    def _public_input_point(self, public_signals: Sequence[object]):
+        curve, _ = _require_bn128()
+        if len(public_signals) != self.n_public:
+            raise ProofVerificationError(
+                f"expected {self.n_public} public signals, got {len(public_signals)}"
+            )
+        point = self.ic[0]
+        for signal, base in zip(public_signals, self.ic[1:]):
+            value = _parse_int(signal, self.curve_order, "publicSignals")
+            if value:
+                point = curve.add(point, curve.multiply(base, value))
+        return point
+
+    def _parse_proof(self, proof: Dict[str, object]):
+        if not isinstance(proof, dict):
+            raise ProofVerificationError("proof must be an object")
+        return (
+            _parse_g1(proof.get("pi_a"), "pi_a"),
+            _parse_g2(proof.get("pi_b"), "pi_b"),
+            _parse_g1(proof.get("pi_c"), "pi_c"),
+        )
+
+    def verify(self, proof: Dict[str, object], public_signals: Sequence[object]) -> bool:
+        # e(A, B) = e(alpha, beta) * e(vk_x, gamma) * e(C, delta) を検証
+        return self.verify_batch([(proof, public_signals)], randomize=False)[0]
+
+    def verify_batch(
+        self,
+        items: Sequence[Tuple[Dict[str, object], Sequence[object]]],
+        randomize: bool = True,
+    ) -> List[bool]:
+        # ランダム線形結合で N 件をまとめて検証し、失敗時のみ個別検証で特定する
+        curve, pairing = _require_bn128()
+        results = [False] * len(items)
+        parsed = []
+        for index, (proof, public_signals) in enumerate(items):
+            try:
+                a, b, c = self._parse_proof(proof)
+                parsed.append((index, a, b, c, self._public_input_point(public_signals)))
+            except ProofVerificationError:
+                continue
+        if not parsed:
+            return results
+
+        weights = [secrets.randbits(128) | 1 if randomize else 1 for _ in parsed]
+        product = pairing.FQ12.one()
+        combined_input = None
+        combined_c = None
+        for (_, a, b, c, vk_x), weight in zip(parsed, weights):
+            product = product * pairing.miller_loop(
+                pairing.twist(b),
+                pairing.cast_point_to_fq12(curve.neg(curve.multiply(a, weight))),
+                final_exponentiate=False,
+            )
+            weighted_input = curve.multiply(vk_x, weight)
+            weighted_c = curve.multiply(c, weight)
+            combined_input = (
+                weighted_input
+                if combined_input is None
+                else curve.add(combined_input, weighted_input)
+            )
+            combined_c = weighted_c if combined_c is None else curve.add(combined_c, weighted_c)
+
+        product = product * _multi_miller_loop_prepared(
+            [(self.gamma, combined_input), (self.delta, combined_c)]
+        )
+        expected = self.alpha_beta_inverse ** (sum(weights) % self.curve_order)
+        if pairing.final_exponentiate(product) == expected:
+            for index, *_ in parsed:
+                results[index] = True
+        elif len(parsed) > 1:
+            for index, *_ in parsed:
+                results[index] = self.verify(*items[index])
+        return results
+
+
+def load_prepared_verification_key(
+    circuit_root: Path, circuit_name: str
+) -> PreparedVerificationKey:
+    # 回路ごとの事前計算済み検証鍵を取得 (成果物レジストリの内容が変わった時のみ再計算)
+    try:
+        circuit = get_artifact_registry(circuit_root).circuit(circuit_name)
+        artifact = circuit.require("verificationKey")
+    except ArtifactError as error:
+        raise ProofVerificationError(str(error)) from error
+
+    key = str(artifact.path.resolve())
+    with _PREPARED_KEYS_LOCK:
+        cached = _PREPARED_KEYS.get(key)
+        if cached is not None and cached[0] == artifact.sha256:
+            return cached[1]
+        prepared = PreparedVerificationKey(json.loads(bytes(artifact.buffer)))
+        _PREPARED_KEYS[key] = (artifact.sha256, prepared)
+        return prepared
@@ -0,0 +1,140 @@
+import struct
+from typing import NamedTuple, Optional
+
+# EBML / Matroska の要素 ID
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_TYPE = 0x83
+CLUSTER = 0x1F43B675
+CLUSTER_TIMECODE = 0xE7
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+BLOCK_DURATION = 0x9B
+SIMPLE_BLOCK = 0xA3
+
+# 子要素を読むために中へ降りるマスター要素 (それ以外は本体を読み飛ばす)
+_CONTAINERS = frozenset({SEGMENT, INFO, TRACKS, TRACK_ENTRY, CLUSTER, BLOCK_GROUP})
+_UNSIGNED = frozenset({TIMECODE_SCALE, TRACK_NUMBER, TRACK_TYPE, CLUSTER_TIMECODE, BLOCK_DURATION})
+_TRACK_TYPE_AUDIO = 2
+_DEFAULT_TIMECODE_SCALE = 1_000_000
+
+
+class MatroskaParseError(ValueError):
+    # Matroska / WebM コンテナ解析エラー
+    pass
+
+
+class WebmInfo(NamedTuple):
+    # WebM の再生時間情報 (音声はデコードしない)
+    duration: float
+    # True なら Info の Duration 要素、False なら Block のタイムスタンプからの推定値
+    from_header: bool
+
+
+def _read_vint(data, offset: int, strip_marker: bool) -> Optional[tuple]:
+    # 可変長整数を読み、(値, 次の位置, 全ビット1か) を返す (データ不足なら None)
+    if offset >= len(data):
+        return None
+    first = data[offset]
+    if first == 0:
+        raise MatroskaParseError("invalid EBML variable-length integer")
+    length = 1
+    while not first & (0x80 >> (length - 1)):
+        length += 1
+    if offset + length > len(data):
+        return None
+    value = first & (0xFF >> length) if strip_marker else first
+    for index in range(1, length):
+        value = (value << 8) | data[offset + index]
+    all_ones = strip_marker and value == (1 << (7 * length)) - 1
+    return value, offset + length, all_ones
+
+
+def parse_webm_info(data) -> WebmInfo:
+    # EBML 要素を順に走査し、Info の Duration または Cluster/Block のタイムスタンプから再生時間を求める
+    # Segment や Cluster はサイズ不明 (MediaRecorder のストリーミング出力) でも子要素として読み進める
+    if len(data) < 4 or bytes(data[:4]) != b"\x1a\x45\xdf\xa3":
+        raise MatroskaParseError("missing EBML header")
+
+    timecode_scale = _DEFAULT_TIMECODE_SCALE
+    duration: Optional[float] = None
+    audio_tracks = set()
+    track_number = track_type = None
+    cluster_timecode = 0
+    block_times = {}
+    block_end = None
+
+    offset = 0
+    while offset < len(data):
+        element_id = _read_vint(data, offset, strip_marker=False)
+        if element_id is None:
+            break
+        size = _read_vint(data, element_id[1], strip_marker=True)
+        if size is None:
+            break
+        element, body = element_id[0], size[1]
+        # Duration が分かっていれば Cluster (音声データ) は読まない
+        if element == CLUSTER and duration is not None and duration > 0:
+            break
+        if element in _CONTAINERS:
+            if element == TRACK_ENTRY:
+                track_number = track_type = None
+            offset = body
+            continue
+        if size[2]:
+            raise MatroskaParseError("unknown size is only allowed for master elements")
+        end = body + size[0]
+        # 末尾が切れた要素 (録音の途中送信など) はそこで走査を打ち切る
+        if end > len(data):
+            break
+
+        if element in _UNSIGNED:
+            value = int.from_bytes(bytes(data[body:end]), "big")
+            if element == TIMECODE_SCALE and value > 0:
+                timecode_scale = value
+            elif element == CLUSTER_TIMECODE:
+                cluster_timecode = value
+            elif element == TRACK_NUMBER:
+                track_number = value
+            elif element == TRACK_TYPE:
+                track_type = value
+            elif element == BLOCK_DURATION and block_end is not None:
+                block_end = (block_end[0], block_end[1] + value)
+            if track_type == _TRACK_TYPE_AUDIO and track_number is not None:
+                audio_tracks.add(track_number)
+        elif element == DURATION:
+            if size[0] not in (4, 8):
+                raise MatroskaParseError("invalid Duration element")
+            (duration,) = struct.unpack(">f" if size[0] == 4 else ">d", bytes(data[body:end]))
+        elif element in (SIMPLE_BLOCK, BLOCK):
+            track = _read_vint(data, body, strip_marker=True)
+            if track is None or track[1] + 2 > end:
+                raise MatroskaParseError("truncated block header")
+            (relative,) = struct.unpack_from(">h", data, track[1])
+            timestamp = cluster_timecode + relative
+            block_times.setdefault(track[0], []).append(timestamp)
+            block_end = (track[0], timestamp)
+        offset = end
+
+    if duration is not None and duration > 0:
+        seconds = duration * timecode_scale / 1e9
+        return WebmInfo(seconds, True)
+
+    # Duration が無い場合は音声トラックのブロック時刻から推定する
+    tracks = [track for track in block_times if track in audio_tracks] or list(block_times)
+    if not tracks:
+        raise MatroskaParseError("WebM contains no audio blocks")
+    times = sorted(block_times[tracks[0]])
+    span = times[-1] - times[0]
+    # 最終ブロックの長さは BlockDuration があればそれを、無ければ直前の間隔を使う
+    if block_end is not None and block_end[0] == tracks[0] and block_end[1] > times[-1]:
+        span += block_end[1] - times[-1]
+    elif len(times) > 1:
+        span += times[-1] - times[-2]
+    return WebmInfo(span * timecode_scale / 1e9, False)
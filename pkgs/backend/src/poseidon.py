@@ -0,0 +1,96 @@
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+# BN254 (alt_bn128) スカラー体の位数
+SNARK_SCALAR_FIELD = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+# circomlib の poseidon.circom と同じラウンド数 (t = 入力数 + 1)
+_N_ROUNDS_F = 8
+_N_ROUNDS_P = [56, 57, 56, 60, 60, 63, 64, 63, 60, 66, 60, 65, 70, 60, 64, 68]
+_FIELD_BITS = 254
+
+
+def _grain_bit_stream(t: int, rounds_f: int, rounds_p: int):
+    # Poseidon 参照実装 (generate_parameters_grain.sage) の Grain LFSR を再現
+    header = (
+        format(1, "02b")  # 素体
+        + format(0, "04b")  # S-box: x^alpha
+        + format(_FIELD_BITS, "012b")
+        + format(t, "012b")
+        + format(rounds_f, "010b")
+        + format(rounds_p, "010b")
+        + "1" * 30
+    )
+    state = [int(bit) for bit in header]
+
+    def step() -> int:
+        bit = state[62] ^ state[51] ^ state[38] ^ state[23] ^ state[13] ^ state[0]
+        state.pop(0)
+        state.append(bit)
+        return bit
+
+    for _ in range(160):
+        step()
+
+    while True:
+        # 2ビット単位で読み、先頭ビットが1のときだけ2ビット目を出力する
+        bit = step()
+        while bit == 0:
+            step()
+            bit = step()
+        yield step()
+
+
+@lru_cache(maxsize=None)
+def poseidon_parameters(t: int) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, ...], ...]]:
+    # 状態幅 t のラウンド定数と MDS 行列を生成 (circomlibjs の定数と一致)
+    if t < 2 or t - 2 >= len(_N_ROUNDS_P):
+        raise ValueError(f"unsupported Poseidon width: {t}")
+    rounds_p = _N_ROUNDS_P[t - 2]
+    bits = _grain_bit_stream(t, _N_ROUNDS_F, rounds_p)
+
+    def random_field_element() -> int:
+        value = 0
+        for _ in range(_FIELD_BITS):
+            value = (value << 1) | next(bits)
+        return value
+
+    constants: List[int] = []
+    for _ in range((_N_ROUNDS_F + rounds_p) * t):
+        value = random_field_element()
+        while value >= SNARK_SCALAR_FIELD:
+            value = random_field_element()
+        constants.append(value)
+
+    # Cauchy 行列 M[i][j] = 1 / (x_i + y_j)
+    while True:
+        samples = [random_field_element() % SNARK_SCALAR_FIELD for _ in range(2 * t)]
+        if len(set(samples)) == 2 * t:
+            break
+    xs, ys = samples[:t], samples[t:]
+    matrix = tuple(
+        tuple(pow((x + y) % SNARK_SCALAR_FIELD, -1, SNARK_SCALAR_FIELD) for y in ys) for x in xs
+    )
+    return tuple(constants), matrix
+
+
+def poseidon(inputs: Sequence[int]) -> int:
+    # circomlib 互換の Poseidon ハッシュを計算
+    if not inputs:
+        raise ValueError("Poseidon requires at least one input")
+    t = len(inputs) + 1
+    constants, matrix = poseidon_parameters(t)
+    rounds_p = _N_ROUNDS_P[t - 2]
+    half_f = _N_ROUNDS_F // 2
+    p = SNARK_SCALAR_FIELD
+
+    state = [0] + [int(value) % p for value in inputs]
+    for round_index in range(_N_ROUNDS_F + rounds_p):
+        offset = round_index * t
+        state = [(value + constants[offset + i]) % p for i, value in enumerate(state)]
+        if round_index < half_f or round_index >= half_f + rounds_p:
+            state = [pow(value, 5, p) for value in state]
+        else:
+            state[0] = pow(state[0], 5, p)
+        state = [sum(m * value for m, value in zip(row, state)) % p for row in matrix]
+    return state[0]
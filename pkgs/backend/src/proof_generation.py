@@ -1,8 +1,27 @@
+import hashlib
+import hmac
 import json
-import subprocess
-import tempfile
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from src.poseidon import poseidon
+from src.prover_backends import (
+    ProverBackend,
+    ProverBackendError,
+    SnarkjsCliBackend,
+    get_prover_backend,
+)
+from src.prover_pool import ProverPoolError, SnarkjsWorkerPool, get_prover_pool
+from src.witness import WitnessError, calculate_witness_cli, in_process_calculator
+
+COMMITMENT_ENGINES = ("native", "witness")
 
 
 class ProofGenerationError(ValueError):
@@ -31,6 +50,38 @@ def hamming_distance_from_packed(reference_features: List[int], current_features
     return distance
 
 
+@lru_cache(maxsize=None)
+def _optional_numpy():
+    # numpy を遅延ロード (利用できない場合は None。結果はキャッシュする)
+    try:
+        import numpy as np
+    except Exception:
+        return None
+    return np
+
+
+def hamming_distances_batch(
+    reference_matrix: List[List[int]], current_matrix: List[List[int]]
+) -> List[int]:
+    # 複数組のハミング距離を1回のベクトル演算でまとめて計算
+    if not reference_matrix:
+        return []
+    np = _optional_numpy()
+    if np is None:
+        return [
+            hamming_distance_from_packed(ref, cur)
+            for ref, cur in zip(reference_matrix, current_matrix)
+        ]
+
+    diff = np.bitwise_xor(
+        np.asarray(reference_matrix, dtype=np.uint64),
+        np.asarray(current_matrix, dtype=np.uint64),
+    )
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(diff).sum(axis=1).astype(int).tolist()
+    return np.unpackbits(diff.view(np.uint8), axis=1).sum(axis=1).astype(int).tolist()
+
+
 def ensure_hamming_threshold(reference_features: List[int], current_features: List[int], threshold: int = 128) -> int:
     # ハミング距離がしきい値を超えていないか確認
     distance = hamming_distance_from_packed(reference_features, current_features)
@@ -41,72 +92,263 @@ def ensure_hamming_threshold(reference_features: List[int], current_features: Li
     return distance
 
 
-def compute_poseidon_commitment(features: List[int], salt: str, circuit_root: Path) -> str:
-    # Poseidonハッシュを使用してコミットメントを計算
-    _validate_packed_features(features, "features")
+def commitment_engine() -> str:
+    # BACKEND_COMMITMENT_ENGINE からコミットメント計算エンジンを取得
+    engine = os.getenv("BACKEND_COMMITMENT_ENGINE", "native").strip().lower()
+    if engine not in COMMITMENT_ENGINES:
+        raise ProofGenerationError(f"unsupported commitment engine: {engine}")
+    return engine
+
+
+def _parse_salt(salt: str) -> int:
+    # ソルト文字列を非負整数へ変換
     try:
         salt_int = int(salt)
     except ValueError as error:
         raise ProofGenerationError("salt must be an integer string") from error
     if salt_int < 0:
         raise ProofGenerationError("salt must be non-negative")
+    return salt_int
 
-    prover_result = run_snarkjs_groth16(
-        input_payload={
-            "voiceFeatures": [str(value) for value in features],
-            "salt": str(salt_int),
-        },
-        circuit_name="VoiceCommitment",
-        circuit_root=circuit_root,
-    )
-    public_signals = prover_result.get("publicSignals", [])
-    if not public_signals:
-        raise ProofGenerationError("failed to derive commitment from VoiceCommitment circuit")
-    return str(public_signals[0])
 
+class CommitmentCache:
+    # (packedFeatures, salt) の鍵付きハッシュをキーとするコミットメントの LRU/TTL キャッシュ
+    # 生の特徴量は保持せず、HMAC-SHA256 のダイジェストとコミットメントのみを保存する
 
-def run_snarkjs_groth16(input_payload: Dict[str, object], circuit_name: str, circuit_root: Path) -> Dict[str, object]:
-    # snarkjsを使用してGroth16証明を生成
-    wasm_path = circuit_root / f"{circuit_name}_js" / f"{circuit_name}.wasm"
-    zkey_path = circuit_root / "zkey" / f"{circuit_name}_final.zkey"
-    if not wasm_path.exists() or not zkey_path.exists():
-        raise ProofGenerationError(
-            f"missing zk artifacts: {wasm_path} or {zkey_path}"
-        )
+    _PRUNE_INTERVAL = 256
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        input_path = temp_path / "input.json"
-        proof_path = temp_path / "proof.json"
-        public_path = temp_path / "public.json"
-        input_path.write_text(json.dumps(input_payload), encoding="utf-8")
-
-        command = [
-            "snarkjs",
-            "groth16",
-            "fullprove",
-            str(input_path),
-            str(wasm_path),
-            str(zkey_path),
-            str(proof_path),
-            str(public_path),
-        ]
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        secret: Optional[bytes] = None,
+        db_path: Optional[Path] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._secret = secret or secrets.token_bytes(32)
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[str, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "diskHits": 0, "misses": 0}
+        self._writes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS commitments ("
+                "key BLOB PRIMARY KEY, commitment TEXT NOT NULL, "
+                "engine TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
 
-        process = subprocess.run(
-            command,
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-        if process.returncode != 0:
-            raise ProofGenerationError(
-                f"snarkjs fullprove failed: {process.stderr.strip() or process.stdout.strip()}"
+    def key_for(self, features: List[int], salt: int) -> bytes:
+        # 特徴量とソルトから鍵付きハッシュを計算
+        message = ",".join(str(value) for value in features) + "|" + str(salt)
+        return hmac.new(self._secret, message.encode("ascii"), hashlib.sha256).digest()
+
+    def get(self, key: bytes) -> Optional[Tuple[str, str]]:
+        # キャッシュからコミットメントとエンジン名を取得
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0], entry[1]
+            if entry is not None:
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT commitment, engine, expires_at FROM commitments WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and row[2] > now:
+                    self._remember(key, (row[0], row[1], row[2]))
+                    self._stats["diskHits"] += 1
+                    return row[0], row[1]
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: bytes, commitment: str, engine: str) -> None:
+        # コミットメントをキャッシュへ保存
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, (commitment, engine, expires_at))
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO commitments (key, commitment, engine, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, commitment, engine, expires_at),
             )
+            self._writes += 1
+            if self._writes % self._PRUNE_INTERVAL == 0:
+                self._db.execute("DELETE FROM commitments WHERE expires_at <= ?", (self._clock(),))
+            self._db.commit()
 
-        return {
-            "proof": json.loads(proof_path.read_text(encoding="utf-8")),
-            "publicSignals": json.loads(public_path.read_text(encoding="utf-8")),
-        }
+    def _remember(self, key: bytes, entry: Tuple[str, str, float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_COMMITMENT_CACHE: Optional[CommitmentCache] = None
+_COMMITMENT_CACHE_LOCK = threading.Lock()
+
+
+def get_commitment_cache() -> Optional[CommitmentCache]:
+    # 環境変数からコミットメントキャッシュを遅延生成 (BACKEND_COMMITMENT_CACHE_SIZE=0 で無効)
+    global _COMMITMENT_CACHE
+    with _COMMITMENT_CACHE_LOCK:
+        if _COMMITMENT_CACHE is not None:
+            return _COMMITMENT_CACHE
+        try:
+            max_entries = int(os.getenv("BACKEND_COMMITMENT_CACHE_SIZE", "1024"))
+            ttl_seconds = float(os.getenv("BACKEND_COMMITMENT_CACHE_TTL_SECONDS", "3600"))
+        except ValueError as error:
+            raise ProofGenerationError("invalid commitment cache configuration") from error
+        if max_entries <= 0:
+            return None
+
+        # 永続化には再起動後も同じキーが必要なため、鍵が設定されている場合のみディスクを使う
+        secret = os.getenv("BACKEND_COMMITMENT_CACHE_KEY", "").encode("utf-8") or None
+        db_path = os.getenv("BACKEND_COMMITMENT_CACHE_PATH", "").strip()
+        _COMMITMENT_CACHE = CommitmentCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            secret=secret,
+            db_path=Path(db_path) if db_path and secret else None,
+        )
+        return _COMMITMENT_CACHE
+
+
+def compute_commitment(
+    features: List[int], salt: str, circuit_root: Path, engine: str = ""
+) -> Dict[str, object]:
+    # 選択されたエンジンでコミットメントを計算し、使用したエンジン名とともに返す
+    _validate_packed_features(features, "features")
+    salt_int = _parse_salt(salt)
+    engine = engine or commitment_engine()
+
+    cache = get_commitment_cache()
+    cache_key = cache.key_for(features, salt_int) if cache is not None else b""
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return {"commitment": cached[0], "engine": cached[1], "cached": True}
+
+    if engine == "native":
+        commitment = poseidon([*features, salt_int])
+    elif engine == "witness":
+        commitment = calculate_commitment_witness(features, salt_int, circuit_root)
+    else:
+        raise ProofGenerationError(f"unsupported commitment engine: {engine}")
+
+    if cache is not None:
+        cache.put(cache_key, str(commitment), engine)
+    return {"commitment": str(commitment), "engine": engine, "cached": False}
+
+
+def compute_poseidon_commitment(features: List[int], salt: str, circuit_root: Path) -> str:
+    # Poseidonハッシュを使用してコミットメントを計算 (VoiceCommitment回路と同一の値)
+    return compute_commitment(features, salt, circuit_root)["commitment"]
+
+
+def calculate_commitment_witness(features: List[int], salt: int, circuit_root: Path) -> int:
+    # VoiceCommitment回路のwasmでウィットネスのみを評価し、出力シグナルを取得 (zkey・証明生成は行わない)
+    input_payload = {
+        "voiceFeatures": [str(value) for value in features],
+        "salt": str(salt),
+    }
+    try:
+        # プロセス内の wasm 計算器を優先し、使えなければ常駐ワーカー、最後に snarkjs CLI を使う
+        calculator = in_process_calculator(circuit_root, "VoiceCommitment")
+        pool = _started_prover_pool(circuit_root, "VoiceCommitment") if calculator is None else None
+        if calculator is not None:
+            outputs = calculator.calculate(input_payload, outputs=1)[1:2]
+        elif pool is not None:
+            outputs = pool.witness("VoiceCommitment", input_payload, outputs=1)
+        else:
+            outputs = calculate_witness_cli(input_payload, "VoiceCommitment", circuit_root)[1:2]
+    except (ProverPoolError, WitnessError) as error:
+        raise ProofGenerationError(str(error)) from error
+    if not outputs:
+        raise ProofGenerationError("failed to derive commitment from VoiceCommitment witness")
+    return int(outputs[0])
+
+
+def run_snarkjs_groth16(
+    input_payload: Dict[str, object],
+    circuit_name: str,
+    circuit_root: Path,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, object]:
+    # snarkjsを使用してGroth16証明を生成 (ウィットネスはプロセス内で計算し groth16 prove へ渡す)
+    try:
+        return SnarkjsCliBackend(circuit_root).prove(input_payload, circuit_name, progress)
+    except ProverBackendError as error:
+        raise ProofGenerationError(str(error)) from error
+
+
+def _prover_backend(circuit_root: Path, circuit_name: str) -> ProverBackend:
+    # BACKEND_PROVER で選択された証明器バックエンドを取得
+    try:
+        return get_prover_backend(circuit_root, circuit_name)
+    except ProverBackendError as error:
+        raise ProofGenerationError(str(error)) from error
+
+
+def _started_prover_pool(circuit_root: Path, circuit_name: str) -> Optional[SnarkjsWorkerPool]:
+    # 回路の起動済みの常駐ワーカープールを取得 (無効・起動不可なら None)
+    pool = get_prover_pool(circuit_root, circuit_name)
+    if pool is None:
+        return None
+    try:
+        pool.start()
+    except ProverPoolError:
+        return None
+    return pool
+
+
+def run_groth16_prover_batch(
+    inputs: List[Dict[str, object]], circuit_name: str, circuit_root: Path
+) -> List[Union[Dict[str, object], ProofGenerationError]]:
+    # 複数入力の証明をまとめて生成し、項目ごとの結果または例外を返す
+    return [
+        ProofGenerationError(str(result)) if isinstance(result, ProverBackendError) else result
+        for result in _prover_backend(circuit_root, circuit_name).prove_many(inputs, circuit_name)
+    ]
+
+
+def run_groth16_prover(
+    input_payload: Dict[str, object],
+    circuit_name: str,
+    circuit_root: Path,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, object]:
+    # BACKEND_PROVER で選択されたバックエンドで証明を生成
+    backend = _prover_backend(circuit_root, circuit_name)
+    try:
+        return backend.prove(input_payload, circuit_name, progress)
+    except ProverBackendError as error:
+        raise ProofGenerationError(str(error)) from error
 
 
 def build_generate_proof_response(
@@ -116,11 +358,14 @@ def build_generate_proof_response(
     circuit_name: str,
     circuit_root: Path,
     hamming_threshold: int = 128,
+    progress: Optional[Callable[[str], None]] = None,
+    commitment_index: int = 0,
 ) -> Dict[str, object]:
-    # 証明生成レスポンスを構築
+    # 証明生成レスポンスを構築 (progress には witness / prove フェーズが通知される)
+    # commitment_index は公開シグナル中の publicCommitment の位置 (回路定義の publicSignals から求める)
     distance = ensure_hamming_threshold(reference_features, current_features, hamming_threshold)
     commitment = compute_poseidon_commitment(reference_features, salt, circuit_root)
-    prover_result = run_snarkjs_groth16(
+    prover_result = run_groth16_prover(
         input_payload={
             "referenceFeatures": [str(value) for value in reference_features],
             "currentFeatures": [str(value) for value in current_features],
@@ -129,10 +374,11 @@ def build_generate_proof_response(
         },
         circuit_name=circuit_name,
         circuit_root=circuit_root,
+        progress=progress,
     )
 
-    if prover_result["publicSignals"]:
-        commitment = str(prover_result["publicSignals"][0])
+    if len(prover_result["publicSignals"]) > commitment_index:
+        commitment = str(prover_result["publicSignals"][commitment_index])
 
     return {
         "proof": prover_result["proof"],
@@ -140,3 +386,77 @@ def build_generate_proof_response(
         "commitment": commitment,
         "hammingDistance": distance,
     }
+
+
+def build_generate_proofs_response(
+    items: List[Dict[str, object]],
+    circuit_name: str,
+    circuit_root: Path,
+    hamming_threshold: int = 128,
+    commitment_index: int = 0,
+) -> List[Dict[str, object]]:
+    # 複数の証明リクエストを処理し、項目ごとの結果またはエラーを返す
+    results: List[Dict[str, object]] = [{} for _ in items]
+    parsed: List[Tuple[int, List[int], List[int], str]] = []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ProofGenerationError("each item must be an object")
+            reference_features = [int(value) for value in item.get("referenceFeatures") or []]
+            current_features = [int(value) for value in item.get("currentFeatures") or []]
+            salt = str(item.get("salt", ""))
+            _validate_packed_features(reference_features, "referenceFeatures")
+            _validate_packed_features(current_features, "currentFeatures")
+            _parse_salt(salt)
+            parsed.append((index, reference_features, current_features, salt))
+        except (TypeError, ValueError) as error:
+            results[index] = {"error": {"code": "BAD_REQUEST", "message": str(error)}}
+
+    # ハミング距離の事前チェックを全件まとめて実行
+    distances = hamming_distances_batch(
+        [entry[1] for entry in parsed], [entry[2] for entry in parsed]
+    )
+    survivors: List[Tuple[int, str, int]] = []
+    inputs: List[Dict[str, object]] = []
+    for (index, reference_features, current_features, salt), distance in zip(parsed, distances):
+        if distance > hamming_threshold:
+            results[index] = {
+                "error": {
+                    "code": "PROOF_GENERATION_ERROR",
+                    "message": f"hamming distance {distance} exceeds threshold {hamming_threshold}",
+                }
+            }
+            continue
+        try:
+            commitment = compute_poseidon_commitment(reference_features, salt, circuit_root)
+        except ProofGenerationError as error:
+            results[index] = {"error": {"code": "PROOF_GENERATION_ERROR", "message": str(error)}}
+            continue
+        survivors.append((index, commitment, distance))
+        inputs.append(
+            {
+                "referenceFeatures": [str(value) for value in reference_features],
+                "currentFeatures": [str(value) for value in current_features],
+                "salt": salt,
+                "publicCommitment": commitment,
+            }
+        )
+
+    # 事前チェックを通過した入力を1バッチで証明
+    for (index, commitment, distance), prover_result in zip(
+        survivors, run_groth16_prover_batch(inputs, circuit_name, circuit_root)
+    ):
+        if isinstance(prover_result, ProofGenerationError):
+            results[index] = {
+                "error": {"code": "PROOF_GENERATION_ERROR", "message": str(prover_result)}
+            }
+            continue
+        if len(prover_result["publicSignals"]) > commitment_index:
+            commitment = str(prover_result["publicSignals"][commitment_index])
+        results[index] = {
+            "proof": prover_result["proof"],
+            "publicSignals": prover_result["publicSignals"],
+            "commitment": commitment,
+            "hammingDistance": distance,
+        }
+    return results
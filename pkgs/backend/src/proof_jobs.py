@@ -0,0 +1,166 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional
+
+# ジョブのフェーズ (queued -> witness -> prove -> done / failed)
+TERMINAL_PHASES = ("done", "failed")
+
+
+class JobQueueFullError(RuntimeError):
+    # ジョブキュー満杯エラー
+    pass
+
+
+class _ProofJob:
+    # 非同期証明ジョブ1件分の状態
+
+    def __init__(self, job_id: str, task: Callable[[Callable[[str], None]], Dict[str, object]]):
+        self.job_id = job_id
+        self.task = task
+        self.phase = "queued"
+        self.result: Optional[Dict[str, object]] = None
+        self.error: Optional[Dict[str, str]] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.events: List[Dict[str, object]] = [{"phase": "queued", "at": self.created_at}]
+
+    def snapshot(self) -> Dict[str, object]:
+        data: Dict[str, object] = {
+            "jobId": self.job_id,
+            "phase": self.phase,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+        }
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class ProofJobQueue:
+    # 有界キューとワーカースレッドで証明をバックグラウンド実行する
+
+    def __init__(
+        self,
+        max_queued: int = 64,
+        workers: int = 1,
+        retention_seconds: float = 600.0,
+        error_mapper: Optional[Callable[[Exception], Dict[str, str]]] = None,
+    ):
+        if max_queued < 1 or workers < 1:
+            raise ValueError("max_queued and workers must be >= 1")
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self._error_mapper = error_mapper or (
+            lambda error: {"code": "INTERNAL_SERVER_ERROR", "message": str(error)}
+        )
+        self._queue: "queue.Queue[_ProofJob]" = queue.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, _ProofJob]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def _ensure_workers(self) -> None:
+        with self._condition:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"proof-job-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, task: Callable[[Callable[[str], None]], Dict[str, object]]) -> str:
+        # ジョブを登録しIDを返す (task は進捗通知関数を受け取り結果を返す)
+        self._ensure_workers()
+        job = _ProofJob(uuid.uuid4().hex, task)
+        with self._condition:
+            self._prune()
+            self._jobs[job.job_id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full as error:
+            with self._condition:
+                self._jobs.pop(job.job_id, None)
+            raise JobQueueFullError("proof job queue is full") from error
+        return job.job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, object]]:
+        # ジョブ状態のスナップショットを取得
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job is not None else None
+
+    def events(self, job_id: str, timeout: float = 300.0) -> Iterator[Dict[str, object]]:
+        # フェーズ変化を順に返す (終了フェーズに達するかタイムアウトで停止)
+        deadline = time.monotonic() + timeout
+        sent = 0
+        while True:
+            with self._condition:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                while sent >= len(job.events):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    self._condition.wait(remaining)
+                pending = job.events[sent:]
+                sent = len(job.events)
+                finished = job.phase in TERMINAL_PHASES
+                snapshot = job.snapshot() if finished else None
+            for event in pending:
+                if event["phase"] in TERMINAL_PHASES and snapshot is not None:
+                    yield {**event, **snapshot}
+                else:
+                    yield event
+            if finished:
+                return
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            active = sum(1 for job in self._jobs.values() if job.phase not in TERMINAL_PHASES)
+            return {"queued": self._queue.qsize(), "active": active, "tracked": len(self._jobs)}
+
+    def _set_phase(self, job: _ProofJob, phase: str) -> None:
+        with self._condition:
+            if job.phase == phase:
+                return
+            job.phase = phase
+            job.updated_at = time.time()
+            job.events.append({"phase": phase, "at": job.updated_at})
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                result = job.task(lambda phase: self._set_phase(job, phase))
+                with self._condition:
+                    job.result = result
+                self._set_phase(job, "done")
+            except Exception as error:
+                with self._condition:
+                    job.error = self._error_mapper(error)
+                self._set_phase(job, "failed")
+            finally:
+                self._queue.task_done()
+
+    def _prune(self) -> None:
+        # 保持期間を過ぎた完了済みジョブを破棄
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.phase in TERMINAL_PHASES and job.updated_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def format_sse(event: Dict[str, object]) -> str:
+    # Server-Sent Events 形式へ整形
+    return f"event: {event['phase']}\ndata: {json.dumps(event)}\n\n"
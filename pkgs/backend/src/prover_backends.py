@@ -0,0 +1,331 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from src.artifacts import Artifact, ArtifactError, get_artifact_registry
+from src.prover_pool import ProverPoolError, SnarkjsWorkerPool, get_prover_pool
+from src.scratch_ring import get_scratch_ring
+from src.witness import WitnessError, calculate_wtns, in_process_calculator
+
+PROVER_BACKENDS = ("auto", "snarkjs-cli", "snarkjs-worker", "rapidsnark")
+
+# rapidsnark の groth16_prover の戻り値
+_RAPIDSNARK_OK = 0
+_RAPIDSNARK_SHORT_BUFFER = 2
+# 証明 / 公開シグナル JSON の初期バッファ長と上限 (不足時は拡張して再実行)
+_RAPIDSNARK_BUFFER_SIZE = 16 * 1024
+_RAPIDSNARK_MAX_BUFFER_SIZE = 4 * 1024 * 1024
+
+ProveResult = Union[Dict[str, object], "ProverBackendError"]
+
+
+class ProverBackendError(ValueError):
+    # 証明器バックエンドのエラー
+    pass
+
+
+class ProverBackendUnavailableError(ProverBackendError):
+    # 選択された証明器バックエンドが利用できない
+    pass
+
+
+def prover_backend_name() -> str:
+    # BACKEND_PROVER から証明器バックエンド名を取得 (auto: 常駐ワーカー、無ければ CLI)
+    name = os.getenv("BACKEND_PROVER", "auto").strip().lower()
+    if name not in PROVER_BACKENDS:
+        raise ProverBackendError(f"unsupported prover backend: {name}")
+    return name
+
+
+def circuit_artifact(circuit_root: Path, circuit_name: str, kind: str) -> Artifact:
+    # 成果物レジストリから回路の wasm / zkey を取得 (リクエストごとの stat は行わない)
+    # mmap した内容を使うのは rapidsnark のみで、snarkjs CLI には path を渡してファイルを読ませる
+    try:
+        return get_artifact_registry(circuit_root).circuit(circuit_name).require(kind)
+    except ArtifactError as error:
+        raise ProverBackendError(str(error)) from error
+
+
+class ProverBackend:
+    # Groth16 証明器バックエンドの共通インターフェース
+    # progress には witness / prove のフェーズが通知される
+
+    name = ""
+
+    def __init__(self, circuit_root: Path):
+        self.circuit_root = Path(circuit_root)
+
+    def warm(self, circuits: List[str]) -> Optional[Dict[str, object]]:
+        # 起動時に回路ごとの準備を済ませる (既定では何もしない)
+        return None
+
+    def prove(
+        self,
+        input_payload: Dict[str, object],
+        circuit_name: str,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, object]:
+        raise NotImplementedError
+
+    def prove_many(self, inputs: List[Dict[str, object]], circuit_name: str) -> List[ProveResult]:
+        # 複数入力を順に証明し、項目ごとの結果または例外を返す
+        results: List[ProveResult] = []
+        for input_payload in inputs:
+            try:
+                results.append(self.prove(input_payload, circuit_name))
+            except ProverBackendError as error:
+                results.append(error)
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": self.name}
+
+
+class SnarkjsCliBackend(ProverBackend):
+    # snarkjs CLI を1証明ごとに起動する (ウィットネスはプロセス内で計算し groth16 prove へ渡す)
+
+    name = "snarkjs-cli"
+
+    def prove(
+        self,
+        input_payload: Dict[str, object],
+        circuit_name: str,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, object]:
+        wasm_path = circuit_artifact(self.circuit_root, circuit_name, "wasm").path
+        zkey_path = circuit_artifact(self.circuit_root, circuit_name, "zkey").path
+
+        if progress is not None:
+            progress("witness")
+        wtns = None
+        try:
+            calculator = in_process_calculator(self.circuit_root, circuit_name)
+            if calculator is not None:
+                wtns = calculator.calculate_wtns(input_payload)
+        except WitnessError as error:
+            raise ProverBackendError(str(error)) from error
+        if wtns is not None and progress is not None:
+            progress("prove")
+
+        # CLI はファイルパスしか受け取らないため、tmpfs 上の使い回しのスロットで受け渡す
+        with get_scratch_ring().slot() as slot:
+            proof_path = slot.file("proof.json")
+            public_path = slot.file("public.json")
+            if wtns is not None:
+                witness_path = slot.file("witness.wtns")
+                witness_path.write_bytes(wtns)
+                command = ["snarkjs", "groth16", "prove", str(zkey_path), str(witness_path)]
+            else:
+                # CLI の fullprove はウィットネス計算と証明を分けられないため witness のみ通知する
+                input_path = slot.file("input.json")
+                input_path.write_text(json.dumps(input_payload), encoding="utf-8")
+                command = [
+                    "snarkjs",
+                    "groth16",
+                    "fullprove",
+                    str(input_path),
+                    str(wasm_path),
+                    str(zkey_path),
+                ]
+            command += [str(proof_path), str(public_path)]
+
+            try:
+                process = subprocess.run(command, check=False, capture_output=True, text=True)
+            except FileNotFoundError as error:
+                raise ProverBackendUnavailableError("snarkjs is not installed") from error
+            if process.returncode != 0:
+                raise ProverBackendError(
+                    f"snarkjs {command[2]} failed: "
+                    f"{process.stderr.strip() or process.stdout.strip()}"
+                )
+
+            return {
+                "proof": json.loads(proof_path.read_bytes()),
+                "publicSignals": json.loads(public_path.read_bytes()),
+            }
+
+
+class SnarkjsWorkerBackend(ProverBackend):
+    # 常駐 snarkjs ワーカープール (zkey / wasm を読み込んだままのプロセス) で証明する
+
+    name = "snarkjs-worker"
+
+    def __init__(self, circuit_root: Path, pool: SnarkjsWorkerPool):
+        super().__init__(circuit_root)
+        self.pool = pool
+
+    def warm(self, circuits: List[str]) -> Optional[Dict[str, object]]:
+        self.pool.start()
+        return self.pool.stats()
+
+    def prove(
+        self,
+        input_payload: Dict[str, object],
+        circuit_name: str,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, object]:
+        try:
+            return self.pool.prove(circuit_name, input_payload, on_event=progress)
+        except ProverPoolError as error:
+            raise ProverBackendError(str(error)) from error
+
+    def prove_many(self, inputs: List[Dict[str, object]], circuit_name: str) -> List[ProveResult]:
+        return [
+            ProverBackendError(str(result)) if isinstance(result, ProverPoolError) else result
+            for result in self.pool.prove_many(circuit_name, inputs)
+        ]
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": self.name, **self.pool.stats()}
+
+
+def _load_rapidsnark(library_path: Optional[str] = None):
+    # rapidsnark の共有ライブラリを読み込み、groth16_prover の引数型を設定する
+    path = (
+        library_path
+        or os.getenv("BACKEND_RAPIDSNARK_LIB", "").strip()
+        or ctypes.util.find_library("rapidsnark")
+    )
+    if not path:
+        raise ProverBackendUnavailableError("librapidsnark is not installed")
+    try:
+        library = ctypes.CDLL(path)
+    except OSError as error:
+        raise ProverBackendUnavailableError(f"failed to load {path}: {error}") from error
+
+    size_pointer = ctypes.POINTER(ctypes.c_ulonglong)
+    library.groth16_prover.restype = ctypes.c_int
+    library.groth16_prover.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_ulonglong,
+        ctypes.c_void_p,
+        ctypes.c_ulonglong,
+        ctypes.c_char_p,
+        size_pointer,
+        ctypes.c_char_p,
+        size_pointer,
+        ctypes.c_char_p,
+        ctypes.c_ulonglong,
+    ]
+    return library
+
+
+class RapidsnarkBackend(ProverBackend):
+    # rapidsnark (C++ ネイティブ証明器) を ctypes でプロセス内から呼び出す
+    # zkey は成果物レジストリの mmap をコピーせずに渡し、ウィットネスはメモリ上の .wtns を渡す
+
+    name = "rapidsnark"
+
+    def __init__(self, circuit_root: Path, library_path: Optional[str] = None):
+        super().__init__(circuit_root)
+        self._library = _load_rapidsnark(library_path)
+        # rapidsnark は1証明で全コアを使うため、同時に実行する証明は1つに限る
+        self._lock = threading.Lock()
+        self._proofs = 0
+
+    def warm(self, circuits: List[str]) -> Optional[Dict[str, object]]:
+        return {name: circuit_artifact(self.circuit_root, name, "zkey").size for name in circuits}
+
+    def _prove_wtns(self, zkey: Artifact, wtns: bytes) -> Dict[str, object]:
+        # 証明 / 公開シグナルの JSON を受け取るバッファを確保して groth16_prover を呼ぶ
+        buffer_size = _RAPIDSNARK_BUFFER_SIZE
+        while True:
+            proof_buffer = ctypes.create_string_buffer(buffer_size)
+            public_buffer = ctypes.create_string_buffer(buffer_size)
+            proof_size = ctypes.c_ulonglong(buffer_size)
+            public_size = ctypes.c_ulonglong(buffer_size)
+            error_buffer = ctypes.create_string_buffer(256)
+            code = self._library.groth16_prover(
+                zkey.c_buffer(),
+                zkey.size,
+                wtns,
+                len(wtns),
+                proof_buffer,
+                ctypes.byref(proof_size),
+                public_buffer,
+                ctypes.byref(public_size),
+                error_buffer,
+                len(error_buffer),
+            )
+            if code == _RAPIDSNARK_OK:
+                return {
+                    "proof": json.loads(proof_buffer.value.decode("utf-8")),
+                    "publicSignals": json.loads(public_buffer.value.decode("utf-8")),
+                }
+            if code == _RAPIDSNARK_SHORT_BUFFER and buffer_size < _RAPIDSNARK_MAX_BUFFER_SIZE:
+                buffer_size *= 4
+                continue
+            message = error_buffer.value.decode("utf-8", errors="replace")
+            raise ProverBackendError(f"rapidsnark failed: {message or f'code {code}'}")
+
+    def prove(
+        self,
+        input_payload: Dict[str, object],
+        circuit_name: str,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, object]:
+        if progress is not None:
+            progress("witness")
+        try:
+            wtns = calculate_wtns(input_payload, circuit_name, self.circuit_root)
+        except WitnessError as error:
+            raise ProverBackendError(str(error)) from error
+        if progress is not None:
+            progress("prove")
+        zkey = circuit_artifact(self.circuit_root, circuit_name, "zkey")
+        with self._lock:
+            result = self._prove_wtns(zkey, wtns)
+            self._proofs += 1
+        return result
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"backend": self.name, "proofs": self._proofs}
+
+
+_BACKENDS: Dict[str, ProverBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def get_prover_backend(circuit_root: Path, circuit_name: str) -> ProverBackend:
+    # 回路の証明に使う、BACKEND_PROVER で選択された証明器バックエンドを取得
+    # auto は回路の常駐ワーカーが起動できればそれを使い、無効・起動不可なら snarkjs CLI を使う
+    name = prover_backend_name()
+    if name == "rapidsnark":
+        key = str(Path(circuit_root).resolve())
+        with _BACKENDS_LOCK:
+            backend = _BACKENDS.get(key)
+            if backend is None:
+                backend = RapidsnarkBackend(circuit_root)
+                _BACKENDS[key] = backend
+            return backend
+
+    if name in ("auto", "snarkjs-worker"):
+        pool = get_prover_pool(circuit_root, circuit_name)
+        if pool is None and name == "snarkjs-worker":
+            raise ProverBackendUnavailableError(
+                "snarkjs-worker requires BACKEND_PROVER_POOL_SIZE > 0"
+            )
+        if pool is not None:
+            try:
+                pool.start()
+                return SnarkjsWorkerBackend(circuit_root, pool)
+            except ProverPoolError as error:
+                if name == "snarkjs-worker":
+                    raise ProverBackendUnavailableError(str(error)) from error
+    return SnarkjsCliBackend(circuit_root)
+
+
+def prover_backend_stats(circuit_root: Path) -> Dict[str, object]:
+    # /ready 用の統計 (バックエンドの生成やワーカーの起動は行わない)
+    name = prover_backend_name()
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(str(Path(circuit_root).resolve()))
+    if name == "rapidsnark" and backend is not None:
+        return backend.stats()
+    return {"backend": name}
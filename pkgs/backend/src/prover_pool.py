@@ -0,0 +1,505 @@
+import json
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from src.artifacts import ArtifactError, get_artifact_registry
+
+
+class ProverPoolError(RuntimeError):
+    # 証明ワーカープールエラー
+    pass
+
+
+_WORKER_SCRIPT = Path(__file__).resolve().parent / "prover_worker.js"
+_POOLS: Dict[Tuple[str, str], "SnarkjsWorkerPool"] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    # 整数の環境変数を読み込む
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    # 浮動小数点の環境変数を読み込む
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+class _ProverWorker:
+    # 常駐 snarkjs プロセス1つ分のラッパー
+
+    def __init__(self, command: List[str], start_timeout: float):
+        self.command = command
+        self.start_timeout = start_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._buffer = b""
+        self._next_id = 0
+        # 起動時に読み込んだ成果物の世代 (プールの世代と異なれば再起動が必要)
+        self.generation = 0
+
+    def start(self) -> None:
+        # ワーカープロセスを起動し ready メッセージを待つ
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as error:
+            raise ProverPoolError(f"prover worker command not found: {self.command[0]}") from error
+        self._buffer = b""
+        try:
+            ready = self._read_message(self.start_timeout)
+        except ProverPoolError:
+            self.stop()
+            raise
+        if not ready.get("ok"):
+            self.stop()
+            raise ProverPoolError("prover worker failed to start")
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self) -> None:
+        # ワーカープロセスを停止
+        process = self.process
+        self.process = None
+        if process is None:
+            return
+        try:
+            if process.stdin:
+                process.stdin.close()
+            process.wait(timeout=2)
+        except Exception:
+            process.kill()
+            process.wait()
+        finally:
+            if process.stdout:
+                process.stdout.close()
+
+    def request(
+        self,
+        message: Dict[str, object],
+        timeout: float,
+        on_event: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, object]:
+        # 1件のジョブを送信し、対応する応答を待つ (途中の進捗イベントは on_event へ渡す)
+        if not self.alive():
+            raise ProverPoolError("prover worker is not running")
+        self._next_id += 1
+        message_id = self._next_id
+        payload = json.dumps({**message, "id": message_id}).encode("utf-8") + b"\n"
+        try:
+            self.process.stdin.write(payload)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as error:
+            raise ProverPoolError("prover worker pipe is closed") from error
+
+        deadline = time.monotonic() + timeout
+        while True:
+            response = self._read_message(deadline - time.monotonic())
+            if response.get("id") != message_id:
+                continue
+            if "event" in response and "ok" not in response:
+                if on_event is not None:
+                    on_event(str(response["event"]))
+                continue
+            return response
+
+    def _read_message(self, timeout: float) -> Dict[str, object]:
+        # 改行区切りのJSONメッセージを1件読み込む
+        deadline = time.monotonic() + timeout
+        stdout = self.process.stdout
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ProverPoolError("prover worker timed out")
+            readable, _, _ = select.select([stdout], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(stdout.fileno(), 65536)
+            if not chunk:
+                raise ProverPoolError("prover worker exited unexpectedly")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        try:
+            return json.loads(line.decode("utf-8"))
+        except ValueError as error:
+            raise ProverPoolError("prover worker returned invalid JSON") from error
+
+
+class SnarkjsWorkerPool:
+    # wasm/zkey を読み込み済みの常駐 snarkjs ワーカーを束ねるプール
+
+    def __init__(
+        self,
+        circuit_root: Path,
+        size: int = 1,
+        circuits: Optional[List[str]] = None,
+        command: Optional[List[str]] = None,
+        job_timeout: float = 120.0,
+        start_timeout: float = 30.0,
+        health_interval: float = 0.0,
+        start_retry_seconds: float = 30.0,
+    ):
+        if size < 1:
+            raise ValueError("pool size must be >= 1")
+        self.circuit_root = Path(circuit_root)
+        self.size = size
+        self.circuits = list(circuits or [])
+        self.command = command or ["node", str(_WORKER_SCRIPT), str(self.circuit_root)]
+        self.job_timeout = job_timeout
+        self.start_timeout = start_timeout
+        self.health_interval = health_interval
+        self.start_retry_seconds = start_retry_seconds
+        self._idle: "queue.Queue[_ProverWorker]" = queue.Queue()
+        self._workers: List[_ProverWorker] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._start_error: Optional[str] = None
+        # 起動に失敗した時刻 (start_retry_seconds 経過するまでは再試行せずに同じエラーを返す)
+        self._start_failed_at = 0.0
+        self._closed = False
+        self._generation = 0
+        self._health_thread: Optional[threading.Thread] = None
+        self._stats = {"jobs": 0, "failures": 0, "restarts": 0}
+        # 成功したジョブの所要時間の合計 (回路のバリアント間でレイテンシを比較するため)
+        self._job_seconds = 0.0
+        self._timed_jobs = 0
+
+    def start(self) -> None:
+        # ワーカーを起動してアーティファクトを事前ロード
+        with self._lock:
+            if self._started:
+                return
+            if self._start_error is not None:
+                if time.monotonic() - self._start_failed_at < self.start_retry_seconds:
+                    raise ProverPoolError(self._start_error)
+                self._start_error = None
+            workers: List[_ProverWorker] = []
+            try:
+                for _ in range(self.size):
+                    worker = _ProverWorker(self.command, self.start_timeout)
+                    self._boot(worker)
+                    workers.append(worker)
+            except ProverPoolError as error:
+                for worker in workers:
+                    worker.stop()
+                self._start_error = str(error)
+                self._start_failed_at = time.monotonic()
+                raise
+            self._workers = workers
+            for worker in workers:
+                self._idle.put(worker)
+            self._started = True
+        if self.health_interval > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, name="prover-pool-health", daemon=True
+            )
+            self._health_thread.start()
+
+    def _boot(self, worker: _ProverWorker) -> None:
+        # ワーカーを起動し、設定された回路を読み込ませる
+        worker.generation = self._generation
+        worker.start()
+        if not self.circuits:
+            return
+        circuits = [self._circuit_fields(name) for name in self.circuits]
+        response = worker.request({"op": "warm", "circuits": circuits}, self.start_timeout)
+        if not response.get("ok"):
+            worker.stop()
+            raise ProverPoolError(
+                f"prover worker failed to load circuits: {response.get('error', '')}"
+            )
+
+    def _circuit_fields(self, circuit_name: str) -> Dict[str, object]:
+        # ジョブで指定する回路の識別子と、成果物レジストリ上の wasm / zkey のパス
+        # (ワーカーは識別子ごとに成果物をキャッシュする。未登録の回路はワーカー側の配置規約に任せる)
+        try:
+            circuit = get_artifact_registry(self.circuit_root).circuit(circuit_name)
+        except ArtifactError:
+            return {"circuit": circuit_name}
+        paths = {
+            kind: str(artifact.path)
+            for kind, artifact in (("wasm", circuit.wasm), ("zkey", circuit.zkey))
+            if artifact is not None
+        }
+        return {"circuit": circuit.id, "artifacts": paths}
+
+    def _restart(self, worker: _ProverWorker) -> None:
+        # クラッシュしたワーカーを再起動
+        worker.stop()
+        try:
+            self._boot(worker)
+        except ProverPoolError:
+            # 再起動に失敗した場合は次回取得時に再試行する
+            return
+        with self._lock:
+            self._stats["restarts"] += 1
+
+    def _acquire(self) -> _ProverWorker:
+        if self._closed:
+            raise ProverPoolError("prover pool is closed")
+        self.start()
+        try:
+            worker = self._idle.get(timeout=self.job_timeout)
+        except queue.Empty as error:
+            raise ProverPoolError("no prover worker became available") from error
+        if not worker.alive() or worker.generation != self._generation:
+            self._restart(worker)
+            if not worker.alive():
+                self._idle.put(worker)
+                raise ProverPoolError("prover worker could not be restarted")
+        return worker
+
+    def _dispatch(
+        self,
+        message: Dict[str, object],
+        jobs: int = 1,
+        on_event: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, object]:
+        # 空いているワーカーへジョブを送り、結果を返す
+        worker = self._acquire()
+        started = time.perf_counter()
+        try:
+            response = worker.request(message, self.job_timeout * jobs, on_event)
+        except ProverPoolError:
+            with self._lock:
+                self._stats["failures"] += 1
+            self._restart(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["jobs"] += jobs
+            if response.get("ok"):
+                self._job_seconds += elapsed
+                self._timed_jobs += jobs
+        if not response.get("ok"):
+            with self._lock:
+                self._stats["failures"] += 1
+            raise ProverPoolError(f"snarkjs {message['op']} failed: {response.get('error', '')}")
+        return response.get("result") or {}
+
+    def prove(
+        self,
+        circuit_name: str,
+        input_payload: Dict[str, object],
+        on_event: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, object]:
+        # 空いているワーカーで証明を生成 (on_event には witness / prove フェーズが通知される)
+        result = self._dispatch(
+            {
+                "op": "prove",
+                **self._circuit_fields(circuit_name),
+                "input": input_payload,
+                "progress": True,
+            },
+            on_event=on_event,
+        )
+        return {
+            "proof": result.get("proof"),
+            "publicSignals": result.get("publicSignals", []),
+        }
+
+    def prove_many(
+        self, circuit_name: str, inputs: List[Dict[str, object]]
+    ) -> List[Union[Dict[str, object], ProverPoolError]]:
+        # 入力をワーカー数で分割し、各ワーカーへ1メッセージでまとめて送る
+        if not inputs:
+            return []
+        self.start()
+        circuit = self._circuit_fields(circuit_name)
+        chunk_count = min(self.size, len(inputs))
+        chunks = [list(range(index, len(inputs), chunk_count)) for index in range(chunk_count)]
+        results: List[Union[Dict[str, object], ProverPoolError]] = [
+            ProverPoolError("proof was not generated")
+        ] * len(inputs)
+
+        def run_chunk(indexes: List[int]) -> None:
+            try:
+                response = self._dispatch(
+                    {
+                        "op": "prove_batch",
+                        **circuit,
+                        "inputs": [inputs[index] for index in indexes],
+                    },
+                    jobs=len(indexes),
+                )
+            except ProverPoolError as error:
+                for index in indexes:
+                    results[index] = error
+                return
+            for index, item in zip(indexes, response.get("results", [])):
+                if item.get("ok"):
+                    result = item.get("result") or {}
+                    results[index] = {
+                        "proof": result.get("proof"),
+                        "publicSignals": result.get("publicSignals", []),
+                    }
+                else:
+                    results[index] = ProverPoolError(
+                        f"snarkjs prove failed: {item.get('error', '')}"
+                    )
+
+        threads = [threading.Thread(target=run_chunk, args=(chunk,)) for chunk in chunks[1:]]
+        for thread in threads:
+            thread.start()
+        run_chunk(chunks[0])
+        for thread in threads:
+            thread.join()
+        return results
+
+    def witness(
+        self, circuit_name: str, input_payload: Dict[str, object], outputs: int = 1
+    ) -> List[str]:
+        # zkey を使わずにウィットネスのみを計算し、出力シグナルを返す
+        result = self._dispatch(
+            {
+                "op": "witness",
+                **self._circuit_fields(circuit_name),
+                "input": input_payload,
+                "outputs": outputs,
+            }
+        )
+        return [str(value) for value in result.get("outputs", [])]
+
+    def reload(self) -> int:
+        # 成果物の差し替え後に呼ぶ。待機中のワーカーはすぐ、実行中のワーカーはジョブ完了後の次回取得時に再起動する
+        with self._lock:
+            self._generation += 1
+            # 成果物が差し替わったので、前回の起動失敗を待たずに次回の取得で起動し直す
+            self._start_error = None
+            if not self._started:
+                return 0
+        restarted = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._restart(worker)
+                restarted += 1
+            finally:
+                self._idle.put(worker)
+        return restarted
+
+    def health_check(self) -> Dict[str, int]:
+        # アイドル中のワーカーへ ping を送り、応答しないものを再起動
+        healthy = 0
+        checked = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            checked += 1
+            try:
+                response = worker.request({"op": "ping"}, self.start_timeout)
+                if response.get("ok"):
+                    healthy += 1
+                else:
+                    self._restart(worker)
+            except ProverPoolError:
+                self._restart(worker)
+            finally:
+                self._idle.put(worker)
+        return {"checked": checked, "healthy": healthy}
+
+    def _health_loop(self) -> None:
+        while not self._closed:
+            time.sleep(self.health_interval)
+            if self._closed:
+                break
+            self.health_check()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            alive = sum(1 for worker in self._workers if worker.alive())
+            mean_ms = (
+                round(self._job_seconds / self._timed_jobs * 1000.0, 1)
+                if self._timed_jobs
+                else None
+            )
+            return {**self._stats, "size": self.size, "alive": alive, "meanJobMs": mean_ms}
+
+    def close(self) -> None:
+        # 全ワーカーを停止
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers = []
+            self._started = False
+        for worker in workers:
+            worker.stop()
+
+
+def prover_pool_size() -> int:
+    # BACKEND_PROVER_POOL_SIZE からプールサイズを取得 (0 で無効)
+    return max(_env_int("BACKEND_PROVER_POOL_SIZE", 1), 0)
+
+
+def get_prover_pool(circuit_root: Path, circuit_name: str) -> Optional[SnarkjsWorkerPool]:
+    # 回路 (バージョン) ごとに共有プールを取得 (無効化されている場合は None)
+    # 回路ごとにワーカーを分けるため、並行して提供する回路のバリアントが互いの証明を待たない
+    size = prover_pool_size()
+    if size == 0:
+        return None
+    try:
+        circuit_name = get_artifact_registry(circuit_root).resolve(circuit_name)
+    except ArtifactError:
+        pass
+    key = (str(Path(circuit_root).resolve()), circuit_name)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = SnarkjsWorkerPool(
+                circuit_root=Path(circuit_root),
+                size=size,
+                circuits=[circuit_name],
+                job_timeout=_env_float("BACKEND_PROVER_TIMEOUT_SECONDS", 120.0),
+                health_interval=_env_float("BACKEND_PROVER_HEALTH_INTERVAL_SECONDS", 30.0),
+                start_retry_seconds=_env_float("BACKEND_PROVER_START_RETRY_SECONDS", 30.0),
+            )
+            _POOLS[key] = pool
+            # ワーカーは wasm / zkey を自前で読み込むため、成果物の差し替え時に再起動する
+            get_artifact_registry(circuit_root).add_listener(pool.reload)
+        return pool
+
+
+def prover_pools(circuit_root: Path) -> Dict[str, SnarkjsWorkerPool]:
+    # 回路ルートで生成済みのプール (キーは回路の識別子)
+    root = str(Path(circuit_root).resolve())
+    with _POOLS_LOCK:
+        return {circuit: pool for (key, circuit), pool in _POOLS.items() if key == root}
+
+
+def shutdown_prover_pools() -> None:
+    # 生成済みの全プールを停止
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
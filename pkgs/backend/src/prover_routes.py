@@ -0,0 +1,476 @@
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from flask import Flask, jsonify, request
+
+from src.artifacts import get_artifact_registry
+from src.circuits import (
+    COMMITMENT_SIGNAL,
+    DEFAULT_PROOF_CIRCUIT,
+    CircuitError,
+    CircuitSpec,
+    list_circuits,
+    resolve_circuit,
+    resolve_proof_circuit,
+)
+from src.groth16_verifier import (
+    ProofVerificationError,
+    VerifierUnavailableError,
+    load_prepared_verification_key,
+)
+from src.proof_generation import (
+    ProofGenerationError,
+    build_generate_proof_response,
+    build_generate_proofs_response,
+    compute_commitment,
+    get_commitment_cache,
+)
+from src.proof_jobs import JobQueueFullError, ProofJobQueue, format_sse
+from src.prover_backends import ProverBackendError, prover_backend_stats
+from src.prover_pool import prover_pool_size, prover_pools
+
+
+def _proof_job_error(error: Exception) -> Dict[str, str]:
+    # 非同期ジョブの例外を API のエラー形式へ変換
+    if isinstance(error, (ValueError, ProofGenerationError)):
+        return {"code": "PROOF_GENERATION_ERROR", "message": str(error)}
+    return {"code": "INTERNAL_SERVER_ERROR", "message": "Unexpected server error"}
+
+
+def _requested(payload: object, field: str) -> Optional[str]:
+    # リクエストで指定された回路名 / バージョン (省略時は None = 既定の回路・バージョン)
+    value = payload.get(field) if isinstance(payload, dict) else None
+    return None if value is None else str(value)
+
+
+def _circuit_fields(circuit: CircuitSpec) -> Dict[str, str]:
+    # レスポンスに含める回路名とバージョン
+    return {"circuit": circuit.name, "circuitVersion": circuit.version}
+
+
+def register_prover_routes(app: Flask, circuit_root: Path) -> Dict[str, Callable[[], object]]:
+    # 証明生成・検証のルートを登録し、/ready に載せる統計の取得関数を返す
+    # 非同期証明ジョブのキュー (ワーカースレッドは初回投入時に起動)
+    proof_jobs = ProofJobQueue(
+        max_queued=int(os.getenv("BACKEND_PROOF_JOB_QUEUE_SIZE", "64")),
+        workers=int(os.getenv("BACKEND_PROOF_JOB_WORKERS", str(max(prover_pool_size(), 1)))),
+        retention_seconds=float(os.getenv("BACKEND_PROOF_JOB_RETENTION_SECONDS", "600")),
+        error_mapper=_proof_job_error,
+    )
+
+    @app.post("/generate-proof")
+    def generate_proof():
+        # 証明生成エンドポイント
+        payload = request.get_json(silent=True) or {}
+        reference_features = payload.get("referenceFeatures")
+        current_features = payload.get("currentFeatures")
+        salt = str(payload.get("salt", ""))
+        if reference_features is None or current_features is None or salt == "":
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": "referenceFeatures, currentFeatures, salt are required",
+                        }
+                    }
+                ),
+                400,
+            )
+
+        try:
+            # リクエストで指定された回路 (省略時は既定の回路・バージョン) で証明する
+            circuit = resolve_proof_circuit(
+                circuit_root, _requested(payload, "circuit"), _requested(payload, "circuitVersion")
+            )
+        except CircuitError as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                400,
+            )
+
+        try:
+            proof_request = {
+                "reference_features": [int(value) for value in reference_features],
+                "current_features": [int(value) for value in current_features],
+                "salt": salt,
+                "circuit_name": circuit.id,
+                "circuit_root": circuit_root,
+                "hamming_threshold": circuit.threshold,
+                "commitment_index": circuit.public_signal_index(COMMITMENT_SIGNAL),
+            }
+            if request.args.get("async") == "1":
+                # ジョブとして投入し、ID を即座に返す
+                job_id = proof_jobs.submit(
+                    lambda progress: {
+                        **build_generate_proof_response(**proof_request, progress=progress),
+                        **_circuit_fields(circuit),
+                    }
+                )
+                return (
+                    jsonify(
+                        {
+                            "jobId": job_id,
+                            "phase": "queued",
+                            "statusUrl": f"/jobs/{job_id}",
+                            "eventsUrl": f"/jobs/{job_id}/events",
+                        }
+                    ),
+                    202,
+                )
+
+            # 証明を生成
+            response = build_generate_proof_response(**proof_request)
+            return jsonify({**response, **_circuit_fields(circuit)}), 200
+        except JobQueueFullError as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "QUEUE_FULL",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                503,
+            )
+        except (ValueError, ProofGenerationError) as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "PROOF_GENERATION_ERROR",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                400,
+            )
+
+    @app.get("/jobs/<job_id>")
+    def get_job(job_id: str):
+        # 非同期証明ジョブの状態取得エンドポイント
+        job = proof_jobs.get(job_id)
+        if job is None:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "JOB_NOT_FOUND",
+                            "message": f"job {job_id} was not found",
+                        }
+                    }
+                ),
+                404,
+            )
+        return jsonify(job), 200
+
+    @app.get("/jobs/<job_id>/events")
+    def job_events(job_id: str):
+        # 非同期証明ジョブの進捗を Server-Sent Events で配信
+        if proof_jobs.get(job_id) is None:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "JOB_NOT_FOUND",
+                            "message": f"job {job_id} was not found",
+                        }
+                    }
+                ),
+                404,
+            )
+        stream = (format_sse(event) for event in proof_jobs.events(job_id))
+        return app.response_class(
+            stream,
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post("/generate-proofs")
+    def generate_proofs():
+        # 複数証明の一括生成エンドポイント
+        payload = request.get_json(silent=True)
+        items = payload if isinstance(payload, list) else (payload or {}).get("items")
+        max_batch = int(os.getenv("BACKEND_MAX_PROOF_BATCH", "32"))
+        if not isinstance(items, list) or not items:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": "items must be a non-empty array",
+                        }
+                    }
+                ),
+                400,
+            )
+        if len(items) > max_batch:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": f"at most {max_batch} items are allowed per request",
+                        }
+                    }
+                ),
+                400,
+            )
+
+        try:
+            # バッチ内の全項目を同じ回路で証明する (配列形式のリクエストは既定の回路)
+            circuit = resolve_proof_circuit(
+                circuit_root, _requested(payload, "circuit"), _requested(payload, "circuitVersion")
+            )
+        except CircuitError as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                400,
+            )
+
+        try:
+            # 項目ごとの結果 (成功時は証明、失敗時は error) を入力順に返す
+            results = build_generate_proofs_response(
+                items,
+                circuit_name=circuit.id,
+                circuit_root=circuit_root,
+                hamming_threshold=circuit.threshold,
+                commitment_index=circuit.public_signal_index(COMMITMENT_SIGNAL),
+            )
+        except (ValueError, ProofGenerationError) as error:
+            # 証明器の選択失敗など、項目単位に割り当てられないエラー
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "PROOF_GENERATION_ERROR",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                400,
+            )
+        return jsonify({**_circuit_fields(circuit), "results": results}), 200
+
+    @app.post("/generate-commitment")
+    def generate_commitment():
+        # コミットメント生成エンドポイント
+        payload = request.get_json(silent=True) or {}
+        features = payload.get("features")
+        salt = str(payload.get("salt", ""))
+        if features is None or salt == "":
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": "features and salt are required",
+                        }
+                    }
+                ),
+                400,
+            )
+
+        try:
+            # コミットメントを計算
+            packed_features = [int(value) for value in features]
+            result = compute_commitment(
+                packed_features,
+                salt,
+                circuit_root,
+            )
+            return (
+                jsonify(
+                    {
+                        "commitment": result["commitment"],
+                        "packedFeatures": [str(value) for value in packed_features],
+                        "engine": result["engine"],
+                        "cached": result["cached"],
+                    }
+                ),
+                200,
+            )
+        except (ValueError, ProofGenerationError) as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "COMMITMENT_GENERATION_ERROR",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                400,
+            )
+
+    @app.post("/verify-proof")
+    def verify_proof():
+        # 証明検証エンドポイント (proofs 配列を渡すとまとめて検証)
+        payload = request.get_json(silent=True) or {}
+        circuit_name = str(payload.get("circuit", DEFAULT_PROOF_CIRCUIT))
+        proofs = payload.get("proofs")
+        if proofs is None:
+            proof = payload.get("proof")
+            public_signals = payload.get("publicSignals")
+            if proof is None or public_signals is None:
+                return (
+                    jsonify(
+                        {
+                            "error": {
+                                "code": "BAD_REQUEST",
+                                "message": "proof and publicSignals (or proofs) are required",
+                            }
+                        }
+                    ),
+                    400,
+                )
+            proofs = [{"proof": proof, "publicSignals": public_signals}]
+        elif not isinstance(proofs, list) or not proofs:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": "proofs must be a non-empty array",
+                        }
+                    }
+                ),
+                400,
+            )
+        # 不正な証明のバッチは1件ずつのペアリング検証へフォールバックするため、件数を制限する
+        max_batch = int(os.getenv("BACKEND_MAX_PROOF_BATCH", "32"))
+        if len(proofs) > max_batch:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "BAD_REQUEST",
+                            "message": f"at most {max_batch} proofs are allowed per request",
+                        }
+                    }
+                ),
+                400,
+            )
+
+        try:
+            # 指定された回路バージョンの検証鍵を取得し、証明を検証
+            circuit = resolve_circuit(
+                circuit_root, circuit_name, _requested(payload, "circuitVersion")
+            )
+            verification_key = load_prepared_verification_key(circuit_root, circuit.id)
+            results = verification_key.verify_batch(
+                [
+                    (
+                        (item.get("proof"), item.get("publicSignals") or [])
+                        if isinstance(item, dict)
+                        else (None, [])
+                    )
+                    for item in proofs
+                ]
+            )
+        except (ProofVerificationError, CircuitError) as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "PROOF_VERIFICATION_ERROR",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                400,
+            )
+        except VerifierUnavailableError as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "VERIFIER_UNAVAILABLE",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                503,
+            )
+
+        response = {**_circuit_fields(circuit), "valid": all(results)}
+        if "proofs" in payload:
+            response["results"] = results
+        return jsonify(response), 200
+
+    def commitment_cache_stats():
+        cache = get_commitment_cache()
+        return cache.stats() if cache is not None else None
+
+    @app.get("/circuits")
+    def circuits():
+        # 登録されている回路とバージョンの一覧
+        try:
+            specs = list_circuits(circuit_root)
+        except CircuitError as error:
+            return (
+                jsonify(
+                    {
+                        "error": {
+                            "code": "CIRCUIT_REGISTRY_ERROR",
+                            "message": str(error),
+                        }
+                    }
+                ),
+                500,
+            )
+        return (
+            jsonify(
+                {
+                    "circuits": [
+                        {
+                            **_circuit_fields(spec),
+                            "default": spec.default,
+                            "threshold": spec.threshold,
+                            "publicSignals": spec.public_signals,
+                        }
+                        for spec in specs
+                    ]
+                }
+            ),
+            200,
+        )
+
+    def prover_pool_stats():
+        # 回路ごとのワーカープールの統計 (起動済みのもののみ)
+        if prover_pool_size() == 0:
+            return None
+        return {circuit: pool.stats() for circuit, pool in prover_pools(circuit_root).items()}
+
+    def prover_stats():
+        try:
+            return prover_backend_stats(circuit_root)
+        except ProverBackendError as error:
+            return {"error": str(error)}
+
+    def artifact_stats():
+        return get_artifact_registry(circuit_root).stats()
+
+    return {
+        "artifacts": artifact_stats,
+        "commitmentCache": commitment_cache_stats,
+        "prover": prover_stats,
+        "proverPool": prover_pool_stats,
+        "proofJobs": proof_jobs.stats,
+    }
@@ -0,0 +1,187 @@
+// 常駐型 snarkjs 証明ワーカー
+// stdin から改行区切り JSON のジョブを受け取り、stdout へ改行区切り JSON で結果を返す。
+// 回路ごとの wasm / zkey は初回利用時に一度だけ読み込み、以降のジョブで再利用する。
+// ジョブの artifacts に wasm / zkey のパスがあればそれを使い、無ければ回路名から配置規約で探す。
+const fs = require("fs");
+const path = require("path");
+const readline = require("readline");
+const snarkjs = require("snarkjs");
+
+// snarkjs 内部のログが stdout のプロトコルを汚さないよう stderr へ退避する
+console.log = (...args) => console.error(...args);
+
+const circuitRoot = process.argv[2] || process.env.ZK_CIRCUIT_ROOT || ".";
+const artifacts = new Map();
+
+function loadWitnessCalculatorBuilder() {
+  // circom_runtime は snarkjs の依存関係から解決する
+  try {
+    const snarkjsDir = path.dirname(require.resolve("snarkjs"));
+    const runtimePath = require.resolve("circom_runtime", {
+      paths: [snarkjsDir],
+    });
+    return require(runtimePath).WitnessCalculatorBuilder;
+  } catch (_error) {
+    return null;
+  }
+}
+
+const witnessCalculatorBuilder = loadWitnessCalculatorBuilder();
+
+async function loadCircuit(circuitName, paths = {}) {
+  // 回路 wasm を読み込みキャッシュする (zkey は証明生成時に読み込む)
+  if (artifacts.has(circuitName)) {
+    return artifacts.get(circuitName);
+  }
+  const wasmPath =
+    paths.wasm ||
+    path.join(circuitRoot, `${circuitName}_js`, `${circuitName}.wasm`);
+  const wasm = fs.readFileSync(wasmPath);
+  const witnessCalculator = witnessCalculatorBuilder
+    ? await witnessCalculatorBuilder(wasm)
+    : null;
+  const zkeyPath =
+    paths.zkey || path.join(circuitRoot, "zkey", `${circuitName}_final.zkey`);
+  const entry = { wasm, zkey: null, zkeyPath, witnessCalculator };
+  artifacts.set(circuitName, entry);
+  return entry;
+}
+
+function loadZkey(entry) {
+  // zkey を読み込みキャッシュする
+  if (!entry.zkey) {
+    entry.zkey = fs.readFileSync(entry.zkeyPath);
+  }
+  return entry.zkey;
+}
+
+async function calculateWitness(circuitName, paths, input, outputs) {
+  // ウィットネスのみを計算し、先頭の出力シグナルを返す
+  const entry = await loadCircuit(circuitName, paths);
+  let witness;
+  if (entry.witnessCalculator) {
+    witness = await entry.witnessCalculator.calculateWitness(input, true);
+  } else {
+    const wtns = { type: "mem" };
+    await snarkjs.wtns.calculate(
+      input,
+      { type: "mem", data: entry.wasm },
+      wtns,
+    );
+    witness = await snarkjs.wtns.exportJson({ type: "mem", data: wtns.data });
+  }
+  return {
+    outputs: witness.slice(1, 1 + outputs).map((value) => value.toString()),
+  };
+}
+
+async function prove(circuitName, paths, input, notify = () => {}) {
+  // 読み込み済みのアーティファクトで Groth16 証明を生成する
+  const entry = await loadCircuit(circuitName, paths);
+  const zkey = loadZkey(entry);
+  notify("witness");
+  if (!entry.witnessCalculator) {
+    return snarkjs.groth16.fullProve(
+      input,
+      { type: "mem", data: entry.wasm },
+      { type: "mem", data: zkey },
+    );
+  }
+  const witness = await entry.witnessCalculator.calculateWTNSBin(input, true);
+  notify("prove");
+  return snarkjs.groth16.prove(
+    { type: "mem", data: zkey },
+    { type: "mem", data: witness },
+  );
+}
+
+async function handle(message) {
+  // ジョブ種別ごとに処理を振り分ける
+  switch (message.op) {
+    case "ping":
+      return { pid: process.pid, circuits: [...artifacts.keys()] };
+    case "warm":
+      // circuits の各要素は回路名、または {circuit, artifacts}
+      for (const circuit of message.circuits || []) {
+        const spec = typeof circuit === "string" ? { circuit } : circuit;
+        loadZkey(await loadCircuit(spec.circuit, spec.artifacts));
+      }
+      return { circuits: [...artifacts.keys()] };
+    case "prove":
+      // progress 指定時は最終応答の前に {id, event} で途中フェーズを通知する
+      return prove(
+        message.circuit,
+        message.artifacts,
+        message.input,
+        message.progress
+          ? (event) => reply({ id: message.id, event })
+          : undefined,
+      );
+    case "prove_batch": {
+      // 同じ zkey を共有して複数の入力を順に証明し、項目ごとの結果を返す
+      const results = [];
+      for (const input of message.inputs || []) {
+        try {
+          results.push({
+            ok: true,
+            result: await prove(message.circuit, message.artifacts, input),
+          });
+        } catch (error) {
+          results.push({
+            ok: false,
+            error: error && error.message ? error.message : String(error),
+          });
+        }
+      }
+      return { results };
+    }
+    case "witness":
+      return calculateWitness(
+        message.circuit,
+        message.artifacts,
+        message.input,
+        message.outputs || 1,
+      );
+    default:
+      throw new Error(`unsupported op: ${message.op}`);
+  }
+}
+
+function reply(payload) {
+  process.stdout.write(`${JSON.stringify(payload)}\n`);
+}
+
+// ジョブは受信順に 1 件ずつ処理する
+let queue = Promise.resolve();
+const lines = readline.createInterface({ input: process.stdin });
+
+lines.on("line", (line) => {
+  if (!line.trim()) {
+    return;
+  }
+  queue = queue.then(async () => {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (_error) {
+      reply({ id: null, ok: false, error: "invalid JSON message" });
+      return;
+    }
+    try {
+      const result = await handle(message);
+      reply({ id: message.id, ok: true, result });
+    } catch (error) {
+      reply({
+        id: message.id,
+        ok: false,
+        error: error && error.message ? error.message : String(error),
+      });
+    }
+  });
+});
+
+lines.on("close", () => {
+  queue.then(() => process.exit(0));
+});
+
+reply({ id: null, ok: true, result: { ready: true, pid: process.pid } });
@@ -0,0 +1,93 @@
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+
+import numpy as np
+
+# フィルタバンクを事前計算しておく代表的な入力サンプルレート
+COMMON_SOURCE_RATES = (48000, 44100, 22050, 8000)
+
+# アップサンプル係数がこれを超える比率はフィルタが大きくなりすぎるため線形補間へ退避する
+_MAX_UP_FACTOR = 1024
+# 1ブロックあたりの出力サンプル数の目安 (入力の切り出しと中間配列はこれに比例する)
+_BLOCK_OUTPUTS = 1 << 16
+
+
+def resampling_ratio(source_rate: int, target_rate: int) -> Tuple[int, int]:
+    # 変換比を既約分数 (up, down) で返す
+    divisor = gcd(source_rate, target_rate)
+    return target_rate // divisor, source_rate // divisor
+
+
+@lru_cache(maxsize=16)
+def polyphase_filter_bank(up: int, down: int) -> Tuple[np.ndarray, int]:
+    # Kaiser 窓付き sinc ローパスを設計し、位相ごとのタップ (up, taps) に分解する
+    # 戻り値の第2要素はフィルタ中心 (半分の長さ)
+    half_length = 10 * max(up, down)
+    cutoff = 1.0 / max(up, down)
+    offsets = np.arange(-half_length, half_length + 1, dtype=np.float64)
+    taps = cutoff * np.sinc(cutoff * offsets) * np.kaiser(offsets.shape[0], 5.0) * up
+
+    per_phase = -(-taps.shape[0] // up)
+    padded = np.zeros(per_phase * up, dtype=np.float64)
+    padded[: taps.shape[0]] = taps
+    bank = padded.reshape(per_phase, up).T.astype(np.float32)
+    bank.setflags(write=False)
+    return bank, half_length
+
+
+def resample_polyphase(
+    samples: np.ndarray, source_rate: int, target_rate: int = 16000
+) -> np.ndarray:
+    # 帯域制限付きポリフェーズ FIR で float32 のままリサンプリングする
+    # 出力をブロック単位で計算し、中間配列のサイズをブロック長に抑える
+    samples = np.asarray(samples, dtype=np.float32)
+    if source_rate == target_rate:
+        return samples
+    up, down = resampling_ratio(source_rate, target_rate)
+    if up > _MAX_UP_FACTOR:
+        return _resample_linear(samples, source_rate, target_rate)
+
+    bank, half_length = polyphase_filter_bank(up, down)
+    reversed_bank = bank[:, ::-1]
+    taps = bank.shape[1]
+    output_length = -(-samples.shape[0] * up // down)
+    output = np.empty(output_length, dtype=np.float32)
+    block = max(_BLOCK_OUTPUTS // up, 64) * up
+
+    for start in range(0, output_length, block):
+        stop = min(start + block, output_length)
+        # 出力 n は上位レートの位置 n*down+half に対応し、位相 r と入力位置 q を持つ
+        # y[n] = sum_k bank[r, k] * x[q - k] なので、x[q-taps+1 .. q] の窓と反転タップの内積になる
+        first = (start * down + half_length) // up - taps + 1
+        last = ((stop - 1) * down + half_length) // up + 1
+        # ブロックが参照する入力区間だけを切り出し、範囲外はゼロ埋めする
+        segment = samples[max(first, 0) : min(last, samples.shape[0])]
+        if first < 0 or last > samples.shape[0]:
+            padded = np.zeros(last - first, dtype=np.float32)
+            padded[max(-first, 0) : max(-first, 0) + segment.shape[0]] = segment
+            segment = padded
+        windows = np.lib.stride_tricks.sliding_window_view(segment, taps)
+        # 同じ位相の出力は up 個おきに並び、対応する窓は down サンプルずつ進む
+        for offset in range(min(up, stop - start)):
+            position = (start + offset) * down + half_length
+            window_start = position // up - taps + 1 - first
+            count = len(range(start + offset, stop, up))
+            output[start + offset : stop : up] = (
+                windows[window_start::down][:count] @ reversed_bank[position % up]
+            )
+    return output
+
+
+def _resample_linear(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    # 特殊な比率向けの線形補間 (float32)
+    target_length = max(int(samples.shape[0] * target_rate / source_rate), 1)
+    positions = np.arange(target_length, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(samples.shape[0]), samples).astype(np.float32)
+
+
+def warm_filter_banks(target_rate: int = 16000) -> int:
+    # 代表的なサンプルレートのフィルタバンクを事前計算し、その数を返す
+    for source_rate in COMMON_SOURCE_RATES:
+        polyphase_filter_bank(*resampling_ratio(source_rate, target_rate))
+    return len(COMMON_SOURCE_RATES)
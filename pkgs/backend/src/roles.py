@@ -0,0 +1,20 @@
+import os
+
+# BACKEND_ROLE で指定できるロール (prover: 証明のみ / embedder: 特徴量抽出のみ / all: 両方)
+ROLES = ("prover", "embedder", "all")
+
+
+def backend_role() -> str:
+    # 環境変数からインスタンスのロールを取得
+    role = os.getenv("BACKEND_ROLE", "all").strip().lower() or "all"
+    if role not in ROLES:
+        raise ValueError(f"unsupported BACKEND_ROLE: {role} (expected one of {', '.join(ROLES)})")
+    return role
+
+
+def serves_embedder(role: str) -> bool:
+    return role in ("embedder", "all")
+
+
+def serves_prover(role: str) -> bool:
+    return role in ("prover", "all")
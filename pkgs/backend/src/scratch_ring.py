@@ -0,0 +1,110 @@
+import atexit
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# tmpfs (メモリ上のファイルシステム)。ディスク I/O や fsync が発生しない
+_SHARED_MEMORY_DIR = Path("/dev/shm")
+
+
+class ScratchSlot:
+    # 1ジョブ分の作業ディレクトリ (ファイル名は固定し、解放時に中身を消す)
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._files: List[Path] = []
+
+    def file(self, name: str) -> Path:
+        path = self.path / name
+        self._files.append(path)
+        return path
+
+    def clear(self) -> None:
+        # 入力・ウィットネス (秘密情報) を残さないよう、使ったファイルを削除する
+        for path in self._files:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self._files = []
+
+
+class ScratchRing:
+    # snarkjs CLI とのファイル受け渡し用に、起動時に作成した作業ディレクトリを使い回すリング
+    # リクエストごとの mkdtemp / rmtree を無くし、tmpfs があればそこに置く
+
+    def __init__(self, root: Path, size: int = 4):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.root = Path(tempfile.mkdtemp(prefix="voice-zk-", dir=str(root)))
+        self.size = size
+        self._slots: "queue.Queue[ScratchSlot]" = queue.Queue()
+        for index in range(size):
+            path = self.root / f"slot-{index}"
+            path.mkdir(mode=0o700)
+            self._slots.put(ScratchSlot(path))
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "waited": 0}
+
+    @contextmanager
+    def slot(self) -> Iterator[ScratchSlot]:
+        # 空きスロットを借りる (全て使用中なら返却を待つ)
+        try:
+            slot = self._slots.get_nowait()
+            waited = False
+        except queue.Empty:
+            slot = self._slots.get()
+            waited = True
+        with self._lock:
+            self._stats["acquired"] += 1
+            self._stats["waited"] += int(waited)
+        try:
+            yield slot
+        finally:
+            slot.clear()
+            self._slots.put(slot)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "root": str(self.root),
+                "size": self.size,
+                "idle": self._slots.qsize(),
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def scratch_root() -> Path:
+    # BACKEND_SCRATCH_DIR、無ければ /dev/shm (書き込み可能な場合)、最後に一時ディレクトリ
+    configured = os.getenv("BACKEND_SCRATCH_DIR", "").strip()
+    if configured:
+        return Path(configured)
+    if _SHARED_MEMORY_DIR.is_dir() and os.access(_SHARED_MEMORY_DIR, os.W_OK):
+        return _SHARED_MEMORY_DIR
+    return Path(tempfile.gettempdir())
+
+
+_RING: Optional[ScratchRing] = None
+_RING_LOCK = threading.Lock()
+
+
+def get_scratch_ring() -> ScratchRing:
+    # プロセス共通のリングを遅延生成 (スロット数は BACKEND_SCRATCH_SLOTS、既定 4)
+    global _RING
+    with _RING_LOCK:
+        if _RING is None:
+            try:
+                size = int(os.getenv("BACKEND_SCRATCH_SLOTS", "4"))
+            except ValueError:
+                size = 4
+            _RING = ScratchRing(scratch_root(), max(size, 1))
+            atexit.register(_RING.close)
+        return _RING
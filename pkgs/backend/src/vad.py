@@ -0,0 +1,85 @@
+from typing import Tuple
+
+import numpy as np
+
+# 解析フレーム長 (ミリ秒)
+FRAME_MS = 20
+# 発話区間の前後に残す余白 (ミリ秒)。子音の立ち上がりや語尾の減衰を切らないようにする
+HANGOVER_MS = 100
+# 発話とみなす最小エネルギー (dBFS)。無音のみのクリップでも雑音を発話と誤判定しない
+ABSOLUTE_FLOOR_DB = -55.0
+# 雑音レベル (下位 10% フレーム) からのマージン (dB)
+NOISE_MARGIN_DB = 12.0
+# 最大フレームからの許容ダイナミックレンジ (dB)。全体が発話のクリップで閾値が上がりすぎないようにする
+DYNAMIC_RANGE_DB = 30.0
+# 無声子音 (摩擦音) とみなすゼロ交差率の下限
+UNVOICED_ZCR = 0.3
+
+
+def frame_features(samples: np.ndarray, frame_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    # フレームごとの対数エネルギー (dBFS) とゼロ交差率をまとめて計算する (端数サンプルは除外)
+    count = samples.shape[0] // frame_length
+    frames = samples[: count * frame_length].reshape(count, frame_length)
+    energy = np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame_length
+    energy_db = 10.0 * np.log10(energy + 1e-12)
+    signs = np.signbit(frames)
+    crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy_db, crossings / max(frame_length - 1, 1)
+
+
+def speech_frames(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    # エネルギーとゼロ交差率から発話フレームを判定し、前後に HANGOVER_MS の余白を付けたマスクを返す
+    frame_length = max(sample_rate * FRAME_MS // 1000, 2)
+    energy_db, zcr = frame_features(samples, frame_length)
+    if energy_db.size == 0:
+        return np.zeros(0, dtype=bool)
+
+    noise_db = float(np.percentile(energy_db, 10))
+    peak_db = float(energy_db.max())
+    threshold_db = max(
+        ABSOLUTE_FLOOR_DB, min(noise_db + NOISE_MARGIN_DB, peak_db - DYNAMIC_RANGE_DB)
+    )
+    voiced = energy_db > threshold_db
+    # 有声音より弱いが雑音より十分大きく、ゼロ交差の多いフレームは無声子音として扱う
+    unvoiced_db = max(threshold_db - NOISE_MARGIN_DB / 2, noise_db + NOISE_MARGIN_DB / 2)
+    voiced |= (energy_db > unvoiced_db) & (zcr > UNVOICED_ZCR)
+
+    hangover = HANGOVER_MS // FRAME_MS
+    if hangover > 0 and voiced.any():
+        voiced = np.convolve(voiced, np.ones(2 * hangover + 1), mode="same") > 0.5
+    return voiced
+
+
+def trim_silence(
+    samples: np.ndarray, sample_rate: int, max_pause_seconds: float = 0.3
+) -> Tuple[np.ndarray, float]:
+    # 先頭・末尾の無音を除き、max_pause_seconds を超える途中の無音をその長さまで詰める
+    # 戻り値は (発話部分の波形, その長さ[秒])。区間が1つなら元配列のスライス (コピーなし)
+    samples = np.asarray(samples, dtype=np.float32)
+    voiced = speech_frames(samples, sample_rate)
+    if not voiced.any():
+        return samples[:0], 0.0
+
+    frame_length = max(sample_rate * FRAME_MS // 1000, 2)
+    index = np.arange(voiced.shape[0])
+    # 各フレームから見た直前の発話フレーム位置 (無ければ -1)
+    last_voiced = np.maximum.accumulate(np.where(voiced, index, -1))
+    pause_frames = int(max_pause_seconds * 1000) // FRAME_MS
+    keep = voiced | ((last_voiced >= 0) & (index - last_voiced <= pause_frames))
+    keep &= index <= last_voiced[-1]
+
+    first, last = int(np.argmax(keep)), int(last_voiced[-1])
+    # 最終フレームが発話なら、フレームに満たない端数サンプルも残す
+    stop = samples.shape[0] if last == voiced.shape[0] - 1 else (last + 1) * frame_length
+    if keep[first : last + 1].all():
+        trimmed = samples[first * frame_length : stop]
+    else:
+        mask = np.repeat(keep, frame_length)
+        mask = np.concatenate([mask, np.full(samples.shape[0] - mask.shape[0], keep[-1])])
+        trimmed = samples[:stop][mask[:stop]]
+    return trimmed, trimmed.shape[0] / float(sample_rate)
+
+
+def voiced_duration(samples: np.ndarray, sample_rate: int, max_pause_seconds: float = 0.3) -> float:
+    # 長い無音を詰めた後の発話区間の長さ (秒)
+    return trim_silence(samples, sample_rate, max_pause_seconds)[1]
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.roles import serves_embedder, serves_prover
+
+# 失敗するとインスタンスを ready にしないコンポーネント (その他はフォールバックがある)
+REQUIRED_COMPONENTS = ("poseidon", "zkeys", "embeddingModel")
+# ロールごとのコンポーネント (担当外のモジュールは import しない)
+PROVER_COMPONENTS = ("poseidon", "zkeys", "witnessCalculator", "proverPool", "verifier")
+EMBEDDER_COMPONENTS = ("resampler", "embeddingModel")
+
+
+def warmup_enabled() -> bool:
+    # BACKEND_WARMUP=1 で起動時ウォームアップを有効化
+    return os.getenv("BACKEND_WARMUP", "0").strip() == "1"
+
+
+def warmup_circuits(circuit_root: Path) -> List[str]:
+    # ウォームアップ対象の回路 (BACKEND_PROVER_CIRCUITS、未設定ならマニフェストの全証明回路・全バージョン)
+    circuits = os.getenv("BACKEND_PROVER_CIRCUITS", "").strip()
+    if circuits:
+        return [name.strip() for name in circuits.split(",") if name.strip()]
+    from src.circuits import DEFAULT_PROOF_CIRCUIT, proof_circuits
+
+    try:
+        return [spec.id for spec in proof_circuits(circuit_root)]
+    except ValueError:
+        # 回路レジストリを読めない場合の失敗は各コンポーネントで報告される
+        return [DEFAULT_PROOF_CIRCUIT]
+
+
+class WarmupState:
+    # コンポーネントごとのウォームアップ状態と所要時間
+
+    def __init__(self, enabled: bool, required: Tuple[str, ...] = REQUIRED_COMPONENTS):
+        self.enabled = enabled
+        self.required = required
+        self.finished = not enabled
+        self._components: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def run(self, name: str, action: Callable[[], object]) -> None:
+        # 1コンポーネントを実行し、結果と所要時間を記録する
+        with self._lock:
+            self._components[name] = {"ready": False, "status": "warming"}
+        started = time.perf_counter()
+        try:
+            detail = action()
+            entry: Dict[str, object] = {"ready": True, "status": "ready"}
+            if detail is not None:
+                entry["detail"] = detail
+        except Exception as error:
+            entry = {
+                "ready": False,
+                "status": "failed",
+                "error": str(error) or type(error).__name__,
+            }
+        entry["seconds"] = round(time.perf_counter() - started, 3)
+        with self._lock:
+            self._components[name] = entry
+
+    def finish(self) -> None:
+        with self._lock:
+            self.finished = True
+
+    def snapshot(self) -> Dict[str, object]:
+        # 全体の ready 判定とコンポーネント別の状態を返す
+        with self._lock:
+            components = {name: dict(entry) for name, entry in self._components.items()}
+            finished = self.finished
+        ready = not self.enabled or (
+            finished and all(components.get(name, {}).get("ready", False) for name in self.required)
+        )
+        return {"ready": ready, "warmup": self.enabled, "components": components}
+
+
+def _warm_resampler() -> int:
+    # 代表的なサンプルレートのリサンプリングフィルタを事前計算する
+    from src.resampler import warm_filter_banks
+
+    return warm_filter_banks()
+
+
+def _warm_zkeys(circuit_root: Path, circuits: List[str]) -> Dict[str, int]:
+    # 回路の zkey / wasm を mmap してハッシュを検証する (snarkjs の CLI / ワーカーは証明時にパスから読み込む)
+    from src.artifacts import get_artifact_registry
+
+    registry = get_artifact_registry(circuit_root)
+    touched: Dict[str, int] = {}
+    for name in circuits:
+        circuit = registry.circuit(name)
+        for artifact in (circuit.require("zkey"), circuit.require("wasm")):
+            touched[artifact.path.name] = artifact.size
+    return touched
+
+
+def _warm_witness_calculator(circuit_root: Path, circuits: List[str]) -> Optional[Dict[str, int]]:
+    # 回路 wasm をコンパイルし、ウィットネス計算器をキャッシュする (wasm エンジン以外では何もしない)
+    from src.witness import get_witness_calculator, witness_engine
+
+    if witness_engine() != "wasm":
+        return None
+    return {name: get_witness_calculator(circuit_root, name).witness_size for name in circuits}
+
+
+def _warm_verifier(circuit_root: Path, circuits: List[str]) -> List[str]:
+    # 検証鍵のペアリング定数を事前計算する
+    from src.groth16_verifier import load_prepared_verification_key
+
+    for name in circuits:
+        load_prepared_verification_key(circuit_root, name)
+    return circuits
+
+
+def _warm_prover_pool(circuit_root: Path, circuits: List[str]) -> Dict[str, object]:
+    # 回路ごとに BACKEND_PROVER の証明器を準備する (回路別の常駐ワーカーの起動、ネイティブ証明器の zkey 読み込み)
+    from src.prover_backends import get_prover_backend
+
+    return {name: get_prover_backend(circuit_root, name).warm([name]) for name in circuits}
+
+
+def _warm_poseidon() -> str:
+    # Poseidon の定数テーブルを構築する
+    from src.poseidon import poseidon
+
+    return str(poseidon([0] * 9))[:8]
+
+
+def _warm_embedding_model() -> str:
+    from src.feature_extraction import warm_embedding_model
+
+    return warm_embedding_model()
+
+
+def role_components(role: str) -> Tuple[str, ...]:
+    # ロールが担当するコンポーネント名
+    components: Tuple[str, ...] = ()
+    if serves_prover(role):
+        components += PROVER_COMPONENTS
+    if serves_embedder(role):
+        components += EMBEDDER_COMPONENTS
+    return components
+
+
+def run_warmup(state: WarmupState, circuit_root: Path, role: str = "all") -> None:
+    # ロールが担当するコンポーネントを順にウォームアップする
+    circuits = warmup_circuits(circuit_root)
+    actions: Dict[str, Callable[[], object]] = {
+        "poseidon": _warm_poseidon,
+        "resampler": _warm_resampler,
+        "zkeys": lambda: _warm_zkeys(circuit_root, circuits),
+        "witnessCalculator": lambda: _warm_witness_calculator(circuit_root, circuits),
+        "proverPool": lambda: _warm_prover_pool(circuit_root, circuits),
+        "verifier": lambda: _warm_verifier(circuit_root, circuits),
+        "embeddingModel": _warm_embedding_model,
+    }
+    components = role_components(role)
+    try:
+        for name, action in actions.items():
+            if name in components:
+                state.run(name, action)
+    finally:
+        state.finish()
+
+
+def start_warmup(circuit_root: Path, background: bool = True, role: str = "all") -> WarmupState:
+    # BACKEND_WARMUP=1 のときウォームアップを開始する (既定はバックグラウンドスレッド)
+    components = role_components(role)
+    state = WarmupState(
+        warmup_enabled(), tuple(name for name in REQUIRED_COMPONENTS if name in components)
+    )
+    if not state.enabled:
+        return state
+    if background:
+        threading.Thread(
+            target=run_warmup,
+            args=(state, Path(circuit_root), role),
+            name="warmup",
+            daemon=True,
+        ).start()
+    else:
+        run_warmup(state, Path(circuit_root), role)
+    return state
@@ -0,0 +1,320 @@
+import json
+import os
+import struct
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from src.artifacts import Artifact, ArtifactError, get_artifact_registry
+from src.scratch_ring import get_scratch_ring
+
+WITNESS_ENGINES = ("wasm", "snarkjs")
+# BN254 のスカラー体 (circom の既定の素数)
+BN254_PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_MASK64 = (1 << 64) - 1
+
+
+class WitnessError(ValueError):
+    # ウィットネス計算エラー
+    pass
+
+
+class WitnessEngineUnavailableError(WitnessError):
+    # wasm ランタイム (wasmtime) が利用できない
+    pass
+
+
+def witness_engine() -> str:
+    # BACKEND_WITNESS_ENGINE からウィットネス計算エンジンを取得 (wasm: プロセス内, snarkjs: CLI)
+    engine = os.getenv("BACKEND_WITNESS_ENGINE", "wasm").strip().lower()
+    if engine not in WITNESS_ENGINES:
+        raise WitnessError(f"unsupported witness engine: {engine}")
+    return engine
+
+
+def circuit_wasm_path(circuit_root: Path, circuit_name: str) -> Path:
+    # 回路 wasm のパスを取得
+    return Path(circuit_root) / f"{circuit_name}_js" / f"{circuit_name}.wasm"
+
+
+def build_wtns(values: List[int], prime: int = BN254_PRIME, n8: int = 32) -> bytes:
+    # ウィットネス値から snarkjs 互換の .wtns バイナリ (version 2) をメモリ上に構築する
+    header = struct.pack("<I", n8) + prime.to_bytes(n8, "little") + struct.pack("<I", len(values))
+    body = bytearray(n8 * len(values))
+    for index, value in enumerate(values):
+        body[index * n8 : (index + 1) * n8] = value.to_bytes(n8, "little")
+    return b"".join(
+        (
+            b"wtns",
+            struct.pack("<II", 2, 2),
+            struct.pack("<IQ", 1, len(header)),
+            header,
+            struct.pack("<IQ", 2, len(body)),
+            bytes(body),
+        )
+    )
+
+
+def parse_wtns(buffer: bytes) -> List[int]:
+    # snarkjs の .wtns バイナリ (version 2) からウィットネス値を読み出す
+    view = memoryview(buffer)
+    if len(view) < 12 or bytes(view[:4]) != b"wtns":
+        raise WitnessError("invalid wtns header")
+    _, section_count = struct.unpack_from("<II", view, 4)
+
+    sections: Dict[int, memoryview] = {}
+    offset = 12
+    for _ in range(section_count):
+        if offset + 12 > len(view):
+            raise WitnessError("truncated wtns section header")
+        section_id, section_size = struct.unpack_from("<IQ", view, offset)
+        offset += 12
+        sections[section_id] = view[offset : offset + section_size]
+        offset += section_size
+
+    header = sections.get(1)
+    values = sections.get(2)
+    if header is None or values is None:
+        raise WitnessError("wtns is missing header or witness section")
+    (n8,) = struct.unpack_from("<I", header, 0)
+    (witness_size,) = struct.unpack_from("<I", header, 4 + n8)
+    if len(values) != n8 * witness_size:
+        raise WitnessError("wtns witness section size mismatch")
+    return [
+        int.from_bytes(values[index * n8 : (index + 1) * n8], "little")
+        for index in range(witness_size)
+    ]
+
+
+def calculate_witness_cli(
+    input_payload: Dict[str, object], circuit_name: str, circuit_root: Path
+) -> List[int]:
+    # snarkjs wtns calculate で回路 wasm のウィットネスのみを計算 (zkey は不要)
+    wasm_path = _wasm_artifact(circuit_root, circuit_name).path
+
+    with get_scratch_ring().slot() as slot:
+        input_path = slot.file("input.json")
+        witness_path = slot.file("witness.wtns")
+        input_path.write_text(json.dumps(input_payload), encoding="utf-8")
+
+        command = [
+            "snarkjs",
+            "wtns",
+            "calculate",
+            str(wasm_path),
+            str(input_path),
+            str(witness_path),
+        ]
+        try:
+            process = subprocess.run(command, check=False, capture_output=True, text=True)
+        except FileNotFoundError as error:
+            raise WitnessError("snarkjs is not installed") from error
+        if process.returncode != 0:
+            raise WitnessError(
+                f"snarkjs wtns calculate failed: {process.stderr.strip() or process.stdout.strip()}"
+            )
+        return parse_wtns(witness_path.read_bytes())
+
+
+def _signal_hash(name: str) -> tuple:
+    # circom の入力シグナル名の FNV-1a 64bit ハッシュを (上位32bit, 下位32bit) で返す
+    value = _FNV_OFFSET
+    for byte in name.encode("utf-8"):
+        value = ((value ^ byte) * _FNV_PRIME) & _MASK64
+    return value >> 32, value & 0xFFFFFFFF
+
+
+def _flatten_signal(value: object) -> List[int]:
+    # 入力値 (ネストした配列を含む) を行優先の整数列へ展開する
+    if isinstance(value, (list, tuple)):
+        flat: List[int] = []
+        for item in value:
+            flat.extend(_flatten_signal(item))
+        return flat
+    try:
+        return [int(value)]
+    except (TypeError, ValueError) as error:
+        raise WitnessError(f"invalid input signal value: {value!r}") from error
+
+
+class WasmWitnessCalculator:
+    # circom がコンパイルした回路 wasm を wasmtime でプロセス内実行するウィットネス計算器
+    # snarkjs の witness_calculator.js と同じ手順で入力を書き込み、共有メモリから値を読み出す
+
+    def __init__(self, wasm: Union[Path, Artifact]):
+        try:
+            import wasmtime
+        except ImportError as error:
+            raise WitnessEngineUnavailableError("wasmtime is not installed") from error
+
+        # レジストリの成果物なら検証済みの mmap からコンパイルする (ファイルは再読込せず、wasmtime へ渡す際に1回コピーする)
+        artifact = wasm if isinstance(wasm, Artifact) else None
+        self.wasm_path = artifact.path if artifact is not None else Path(wasm)
+        self.sha256 = artifact.sha256 if artifact is not None else None
+        if artifact is None and not self.wasm_path.exists():
+            raise WitnessError(f"missing zk artifact: {self.wasm_path}")
+        engine = wasmtime.Engine()
+        self._store = wasmtime.Store(engine)
+        try:
+            if artifact is not None:
+                module = wasmtime.Module(engine, bytes(artifact.buffer))
+            else:
+                module = wasmtime.Module.from_file(engine, str(self.wasm_path))
+        except wasmtime.WasmtimeError as error:
+            raise WitnessError(f"invalid circuit wasm: {self.wasm_path}") from error
+
+        self._messages: List[str] = []
+        imports = []
+        for entry in module.imports:
+            if entry.name == "exceptionHandler":
+                imports.append(
+                    wasmtime.Func(
+                        self._store,
+                        wasmtime.FuncType([wasmtime.ValType.i32()], []),
+                        self._raise_exception,
+                    )
+                )
+            elif entry.name in ("printErrorMessage", "writeBufferMessage"):
+                imports.append(
+                    wasmtime.Func(self._store, wasmtime.FuncType([], []), self._read_message)
+                )
+            else:
+                imports.append(wasmtime.Func(self._store, wasmtime.FuncType([], []), lambda: None))
+        instance = wasmtime.Instance(self._store, module, imports)
+        self._exports = instance.exports(self._store)
+        self._memory = self._exports["memory"]
+        self._shared = self._exports["getSharedRWMemoryStart"](self._store)
+        self._trap = wasmtime.Trap
+        self.n8 = self._exports["getFieldNumLen32"](self._store) * 4
+        self._exports["getRawPrime"](self._store)
+        self.prime = self._read_field()
+        self.witness_size = self._exports["getWitnessSize"](self._store)
+        self.input_size = self._exports["getInputSize"](self._store)
+        self._lock = threading.Lock()
+
+    def _raise_exception(self, code: int) -> None:
+        message = "; ".join(self._messages) or f"code {code}"
+        raise WitnessError(f"circuit assertion failed: {message}")
+
+    def _read_message(self) -> None:
+        # getMessageChar で wasm 側のエラーメッセージを1文字ずつ読み出す
+        chars = []
+        while True:
+            code = self._exports["getMessageChar"](self._store)
+            if code == 0:
+                break
+            chars.append(chr(code))
+        if chars:
+            self._messages.append("".join(chars).strip())
+
+    def _read_field(self) -> int:
+        data = self._memory.read(self._store, self._shared, self._shared + self.n8)
+        return int.from_bytes(data, "little")
+
+    def _set_inputs(self, input_payload: Dict[str, object]) -> None:
+        set_input = self._exports["setInputSignal"]
+        input_size = self._exports["getInputSignalSize"]
+        assigned = 0
+        for name, value in input_payload.items():
+            msb, lsb = _signal_hash(name)
+            values = _flatten_signal(value)
+            expected = input_size(self._store, msb, lsb)
+            if expected <= 0:
+                raise WitnessError(f"unknown input signal: {name}")
+            if expected != len(values):
+                raise WitnessError(
+                    f"input signal {name} expects {expected} values, got {len(values)}"
+                )
+            for index, item in enumerate(values):
+                self._memory.write(
+                    self._store, (item % self.prime).to_bytes(self.n8, "little"), self._shared
+                )
+                set_input(self._store, msb, lsb, index)
+            assigned += len(values)
+        # 古い circom の wasm は未設定の入力を 0 として計算してしまうため件数で検査する
+        if assigned != self.input_size:
+            raise WitnessError(f"not all input signals are set ({assigned}/{self.input_size})")
+
+    def calculate(
+        self, input_payload: Dict[str, object], outputs: Optional[int] = None
+    ) -> List[int]:
+        # ウィットネスを計算する (outputs 指定時は先頭の定数1と出力シグナルのみ読み出す)
+        count = self.witness_size if outputs is None else min(outputs + 1, self.witness_size)
+        with self._lock:
+            self._messages = []
+            try:
+                self._exports["init"](self._store, 1)
+                self._set_inputs(input_payload)
+                get_witness = self._exports["getWitness"]
+                values = []
+                for index in range(count):
+                    get_witness(self._store, index)
+                    values.append(self._read_field())
+            except self._trap as error:
+                raise WitnessError(f"circuit wasm trapped: {error.message}") from error
+        return values
+
+    def calculate_wtns(self, input_payload: Dict[str, object]) -> bytes:
+        # 証明器へそのまま渡せる .wtns バイナリを計算する
+        return build_wtns(self.calculate(input_payload), self.prime, self.n8)
+
+
+_calculators: Dict[Path, WasmWitnessCalculator] = {}
+_calculators_lock = threading.Lock()
+
+
+def _wasm_artifact(circuit_root: Path, circuit_name: str) -> Artifact:
+    # 成果物レジストリから回路 wasm を取得 (リクエストごとの stat は行わない)
+    try:
+        return get_artifact_registry(circuit_root).circuit(circuit_name).require("wasm")
+    except ArtifactError as error:
+        raise WitnessError(str(error)) from error
+
+
+def get_witness_calculator(circuit_root: Path, circuit_name: str) -> WasmWitnessCalculator:
+    # 回路ごとのウィットネス計算器を遅延生成して再利用する (wasm が差し替えられた時のみ再コンパイル)
+    wasm = _wasm_artifact(circuit_root, circuit_name)
+    with _calculators_lock:
+        calculator = _calculators.get(wasm.path)
+        if calculator is None or calculator.sha256 != wasm.sha256:
+            calculator = WasmWitnessCalculator(wasm)
+            _calculators[wasm.path] = calculator
+        return calculator
+
+
+def in_process_calculator(circuit_root: Path, circuit_name: str) -> Optional[WasmWitnessCalculator]:
+    # wasm エンジンが使えればウィットネス計算器を返す (BACKEND_WITNESS_ENGINE=snarkjs・wasmtime 未導入なら None)
+    if witness_engine() != "wasm":
+        return None
+    try:
+        return get_witness_calculator(circuit_root, circuit_name)
+    except WitnessEngineUnavailableError:
+        return None
+
+
+def calculate_witness(
+    input_payload: Dict[str, object],
+    circuit_name: str,
+    circuit_root: Path,
+    outputs: Optional[int] = None,
+) -> List[int]:
+    # 設定されたエンジンでウィットネスを計算 (wasmtime が無ければ snarkjs CLI を使用)
+    calculator = in_process_calculator(circuit_root, circuit_name)
+    if calculator is not None:
+        return calculator.calculate(input_payload, outputs)
+    witness = calculate_witness_cli(input_payload, circuit_name, circuit_root)
+    return witness if outputs is None else witness[: outputs + 1]
+
+
+def calculate_wtns(
+    input_payload: Dict[str, object], circuit_name: str, circuit_root: Path
+) -> bytes:
+    # 証明器に渡す .wtns バイナリをメモリ上で生成する
+    calculator = in_process_calculator(circuit_root, circuit_name)
+    if calculator is not None:
+        return calculator.calculate_wtns(input_payload)
+    return build_wtns(calculate_witness_cli(input_payload, circuit_name, circuit_root))
@@ -1,6 +1,11 @@
 import json
+import shutil
+import tempfile
 import unittest
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+ZK_ROOT = Path(__file__).resolve().parents[1] / "zk"
 
 class AppRouteTest(unittest.TestCase):
     def setUp(self):
@@ -9,11 +14,12 @@ class AppRouteTest(unittest.TestCase):
         except ModuleNotFoundError as error:
             self.skipTest(f"flask is not installed in this environment: {error}")
 
-        app = create_app()
+        with patch.dict("os.environ", {"ZK_CIRCUIT_ROOT": str(ZK_ROOT)}):
+            app = create_app()
         app.testing = True
         self.client = app.test_client()
 
-    @patch("src.app.extract_voice_features")
+    @patch("src.embedder_routes.extract_voice_features")
     def test_extract_features_returns_503_when_model_unavailable(self, mock_extract):
         mock_extract.side_effect = RuntimeError("mock setup error")
         # Patch side_effect with exact exception type lazily to avoid import cycles in test startup
@@ -30,6 +36,226 @@ class AppRouteTest(unittest.TestCase):
         body = response.get_json()
         self.assertEqual(body["error"]["code"], "MODEL_UNAVAILABLE")
 
+    @patch("src.embedder_routes.extract_voice_features_from_audio")
+    def test_extract_features_accepts_raw_and_multipart_uploads(self, mock_extract):
+        import io
+
+        seen = []
+
+        def fake_extract(audio, mime_type):
+            seen.append((bytes(audio), mime_type))
+            return {"format": "wav"}
+
+        mock_extract.side_effect = fake_extract
+        raw = self.client.post("/extract-features", data=b"RIFFdata", content_type="audio/wav")
+        multipart = self.client.post(
+            "/extract-features",
+            data={"audio": (io.BytesIO(b"\x1aE\xdf\xa3webm"), "clip.webm", "audio/webm")},
+            content_type="multipart/form-data",
+        )
+
+        self.assertEqual(raw.status_code, 200)
+        self.assertEqual(multipart.status_code, 200)
+        self.assertEqual(seen, [(b"RIFFdata", "audio/wav"), (b"\x1aE\xdf\xa3webm", "audio/webm")])
+
+    def test_extract_features_rejects_oversized_upload(self):
+        from src.audio_buffers import AudioBufferPool
+
+        with patch(
+            "src.embedder_routes.get_audio_buffer_pool",
+            return_value=AudioBufferPool(initial_bytes=4, max_bytes=16),
+        ):
+            response = self.client.post(
+                "/extract-features", data=b"x" * 64, content_type="audio/wav"
+            )
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.get_json()["error"]["code"], "PAYLOAD_TOO_LARGE")
+
+    def test_generate_commitment_reports_engine(self):
+        with patch.dict("os.environ", {"BACKEND_COMMITMENT_ENGINE": "native"}):
+            response = self.client.post(
+                "/generate-commitment",
+                data=json.dumps({"features": [0] * 8, "salt": "42"}),
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body["engine"], "native")
+        self.assertEqual(
+            body["commitment"],
+            "10829965834841877873089796471979282861933114119278143241217812005527531844344",
+        )
+
+    def test_generate_proofs_rejects_empty_batch(self):
+        response = self.client.post(
+            "/generate-proofs",
+            data=json.dumps({"items": []}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @patch("src.prover_routes.build_generate_proofs_response")
+    def test_generate_proofs_returns_per_item_results(self, mock_build):
+        mock_build.return_value = [{"commitment": "1"}, {"error": {"code": "BAD_REQUEST"}}]
+        response = self.client.post(
+            "/generate-proofs",
+            data=json.dumps([{"salt": "1"}, {"salt": "2"}]),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["results"]), 2)
+
+    def test_generate_proofs_reports_backend_errors_as_json(self):
+        item = {"referenceFeatures": [0] * 8, "currentFeatures": [0] * 8, "salt": "42"}
+        env = {"BACKEND_PROVER": "gnark", "BACKEND_COMMITMENT_ENGINE": "native"}
+        with patch.dict("os.environ", env):
+            response = self.client.post(
+                "/generate-proofs",
+                data=json.dumps({"items": [item]}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["error"]["code"], "PROOF_GENERATION_ERROR")
+
+    def test_ready_reports_components_and_stats(self):
+        response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertTrue(body["ready"])
+        self.assertIn("proofJobs", body["stats"])
+
+    @patch("src.embedder_routes.extract_voice_features_batch")
+    def test_extract_features_batch_returns_results(self, mock_batch):
+        mock_batch.return_value = [{"packedFeatures": ["1"]}, {"error": {"code": "INVALID_AUDIO"}}]
+        response = self.client.post(
+            "/extract-features-batch",
+            data=json.dumps({"items": [{"audio": "a"}, {"audio": "b"}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["results"]), 2)
+
+        empty = self.client.post(
+            "/extract-features-batch",
+            data=json.dumps({"items": []}),
+            content_type="application/json",
+        )
+        self.assertEqual(empty.status_code, 400)
+
+    @patch("src.prover_routes.build_generate_proof_response")
+    def test_generate_proof_async_reports_progress(self, mock_build):
+        def fake_build(progress=None, **kwargs):
+            progress("witness")
+            progress("prove")
+            return {"commitment": "999", "publicSignals": ["999"]}
+
+        mock_build.side_effect = fake_build
+        response = self.client.post(
+            "/generate-proof?async=1",
+            data=json.dumps(
+                {"referenceFeatures": [0] * 8, "currentFeatures": [0] * 8, "salt": "1"}
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()["jobId"]
+
+        events = self.client.get(f"/jobs/{job_id}/events")
+        self.assertEqual(events.mimetype, "text/event-stream")
+        body = events.get_data(as_text=True)
+        self.assertEqual(
+            [line[len("event: ") :] for line in body.splitlines() if line.startswith("event: ")],
+            ["queued", "witness", "prove", "done"],
+        )
+
+        status = self.client.get(f"/jobs/{job_id}").get_json()
+        self.assertEqual(status["phase"], "done")
+        self.assertEqual(status["result"]["commitment"], "999")
+
+    @patch("src.prover_routes.build_generate_proof_response")
+    def test_generate_proof_uses_requested_circuit_version(self, mock_build):
+        mock_build.return_value = {"commitment": "1", "publicSignals": ["1"]}
+        payload = {
+            "referenceFeatures": [0] * 8,
+            "currentFeatures": [0] * 8,
+            "salt": "1",
+            "circuit": "VoiceOwnership",
+            "circuitVersion": "1",
+        }
+        response = self.client.post(
+            "/generate-proof", data=json.dumps(payload), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["circuitVersion"], "1")
+        kwargs = mock_build.call_args.kwargs
+        self.assertEqual(kwargs["circuit_name"], "VoiceOwnership@1")
+        self.assertEqual(kwargs["hamming_threshold"], 128)
+        self.assertEqual(kwargs["commitment_index"], 0)
+
+        for circuit, version in (("VoiceOwnership", "9"), ("VoiceCommitment", None)):
+            response = self.client.post(
+                "/generate-proof",
+                data=json.dumps({**payload, "circuit": circuit, "circuitVersion": version}),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()["error"]["code"], "BAD_REQUEST")
+
+    def test_circuits_lists_registered_versions(self):
+        response = self.client.get("/circuits")
+        self.assertEqual(response.status_code, 200)
+        circuits = {entry["circuit"]: entry for entry in response.get_json()["circuits"]}
+        self.assertEqual(circuits["VoiceOwnership"]["threshold"], 128)
+        self.assertEqual(circuits["VoiceOwnership"]["publicSignals"], ["publicCommitment"])
+        self.assertTrue(circuits["VoiceOwnership"]["default"])
+
+    @patch("src.prover_backends.subprocess.run")
+    def test_generate_proof_without_manifest_uses_builtin_circuit(self, mock_run):
+        from src.app import create_app
+
+        def fake_snarkjs(command, check, capture_output, text):
+            Path(command[-2]).write_text(json.dumps({"pi_a": []}), encoding="utf-8")
+            Path(command[-1]).write_text(json.dumps(["123"]), encoding="utf-8")
+            return Mock(returncode=0, stderr="", stdout="")
+
+        mock_run.side_effect = fake_snarkjs
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            ignore = shutil.ignore_patterns("manifest.json")
+            shutil.copytree(ZK_ROOT, root, dirs_exist_ok=True, ignore=ignore)
+            env = {
+                "ZK_CIRCUIT_ROOT": str(root),
+                "BACKEND_PROVER": "snarkjs-cli",
+                "BACKEND_WITNESS_ENGINE": "snarkjs",
+                "BACKEND_COMMITMENT_ENGINE": "native",
+            }
+            with patch.dict("os.environ", env):
+                client = create_app().test_client()
+                circuits = client.get("/circuits").get_json()["circuits"]
+                response = client.post(
+                    "/generate-proof",
+                    data=json.dumps(
+                        {"referenceFeatures": [0] * 8, "currentFeatures": [0] * 8, "salt": "42"}
+                    ),
+                    content_type="application/json",
+                )
+
+        ownership = next(entry for entry in circuits if entry["circuit"] == "VoiceOwnership")
+        self.assertEqual(ownership["threshold"], 128)
+        self.assertEqual(ownership["publicSignals"], ["publicCommitment"])
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual((body["circuit"], body["circuitVersion"]), ("VoiceOwnership", "1"))
+        self.assertEqual(body["commitment"], "123")
+        self.assertIn("fullprove", mock_run.call_args[0][0])
+
+    def test_unknown_job_returns_404(self):
+        response = self.client.get("/jobs/missing")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json()["error"]["code"], "JOB_NOT_FOUND")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.artifacts import (
+    ArtifactError,
+    ArtifactRegistry,
+    load_circuit_artifacts,
+    write_manifest,
+)
+
+
+def _write(path: Path, data: bytes) -> None:
+    # 本番の配置と同様に、一時ファイルからアトミックに置き換える
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+
+
+class ArtifactRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.wasm = self.root / "Demo_js" / "Demo.wasm"
+        self.zkey = self.root / "zkey" / "Demo_final.zkey"
+        _write(self.wasm, b"\0asm-v1")
+        _write(self.zkey, b"zkey-v1")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_loads_and_verifies_manifest_hashes(self):
+        write_manifest(self.root)
+        circuit = ArtifactRegistry(self.root).circuit("Demo")
+        self.assertTrue(circuit.zkey.verified)
+        self.assertEqual(bytes(circuit.zkey.buffer), b"zkey-v1")
+        self.assertEqual(circuit.zkey.c_buffer().raw, b"zkey-v1")
+        self.assertIsNone(circuit.verification_key)
+        with self.assertRaises(ArtifactError):
+            circuit.require("verificationKey")
+
+        _write(self.zkey, b"tampered")
+        with self.assertRaises(ArtifactError):
+            load_circuit_artifacts(self.root)
+
+    def test_discovers_artifacts_without_manifest(self):
+        registry = ArtifactRegistry(self.root)
+        circuit = registry.circuit("Demo")
+        self.assertFalse(circuit.wasm.verified)
+        with self.assertRaises(ArtifactError):
+            registry.circuit("Missing")
+
+    def test_reloads_verified_replacement_and_notifies(self):
+        write_manifest(self.root)
+        registry = ArtifactRegistry(self.root)
+        calls = []
+        registry.add_listener(lambda: calls.append(True))
+        registry.circuits()
+        self.assertFalse(registry.reload_if_changed())
+
+        _write(self.zkey, b"zkey-v2")
+        write_manifest(self.root, ["Demo"])
+        self.assertTrue(registry.reload_if_changed())
+        self.assertEqual(bytes(registry.circuit("Demo").zkey.buffer), b"zkey-v2")
+        self.assertEqual(registry.stats()["generation"], 2)
+        self.assertEqual(calls, [True])
+
+    def test_keeps_previous_artifacts_when_replacement_fails_verification(self):
+        write_manifest(self.root)
+        registry = ArtifactRegistry(self.root)
+        previous = registry.circuit("Demo").zkey
+
+        _write(self.zkey, b"zkey-unlisted")
+        self.assertFalse(registry.reload_if_changed())
+        self.assertIs(registry.circuit("Demo").zkey, previous)
+        # 置き換え前の inode を mmap しているため、旧内容を読み続けられる
+        self.assertEqual(bytes(previous.buffer), b"zkey-v1")
+        stats = registry.stats()
+        self.assertEqual(stats["generation"], 1)
+        self.assertIn("sha256 mismatch", stats["lastError"])
+
+    def test_write_manifest_keeps_other_circuits_and_fields(self):
+        manifest = {"circuits": [{"name": "Other", "version": "2", "artifacts": {}}]}
+        (self.root / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        write_manifest(self.root, ["Demo"])
+
+        circuits = json.loads((self.root / "manifest.json").read_text(encoding="utf-8"))["circuits"]
+        self.assertEqual([entry["name"] for entry in circuits], ["Other", "Demo"])
+        self.assertEqual(circuits[0]["version"], "2")
+        self.assertEqual(set(circuits[1]["artifacts"]), {"wasm", "zkey"})
+
+
+if __name__ == "__main__":
+    unittest.main()
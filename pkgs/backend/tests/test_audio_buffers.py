@@ -0,0 +1,39 @@
+import io
+import unittest
+
+from src.audio_buffers import AudioBufferPool, AudioPayloadTooLargeError
+
+
+class AudioBufferPoolTest(unittest.TestCase):
+    def test_released_buffer_is_zeroed_and_reused(self):
+        pool = AudioBufferPool(initial_bytes=8, max_bytes=64)
+        with pool.acquire() as buffer:
+            buffer.write(b"secret-audio")
+            data = buffer.data
+            self.assertEqual(bytes(buffer.view()), b"secret-audio")
+
+        self.assertEqual(bytes(data), bytes(len(data)))
+        with pool.acquire() as buffer:
+            self.assertIs(buffer.data, data)
+            self.assertEqual(buffer.length, 0)
+        self.assertEqual(pool.stats(), {"acquired": 2, "reused": 1, "pooled": 1})
+
+    def test_fill_from_stream_grows_up_to_limit(self):
+        pool = AudioBufferPool(initial_bytes=4, max_bytes=32)
+        with pool.acquire() as buffer:
+            self.assertEqual(buffer.fill_from(io.BytesIO(b"a" * 32), chunk_size=5), 32)
+            self.assertEqual(bytes(buffer.view()), b"a" * 32)
+
+        with pool.acquire() as buffer:
+            with self.assertRaises(AudioPayloadTooLargeError):
+                buffer.fill_from(io.BytesIO(b"a" * 33), chunk_size=5)
+
+    def test_oversized_buffers_are_not_retained(self):
+        pool = AudioBufferPool(initial_bytes=4, max_bytes=64, max_retained_bytes=16)
+        with pool.acquire() as buffer:
+            buffer.write(b"b" * 40)
+        self.assertEqual(pool.stats()["pooled"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.artifacts import ArtifactRegistry, write_manifest
+from src.circuits import CircuitError, list_circuits, resolve_circuit, resolve_proof_circuit
+
+
+class CircuitRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        for path, data in (
+            ("Demo_js/Demo.wasm", b"\0asm-v1"),
+            ("zkey/Demo_final.zkey", b"zkey-v1"),
+            ("Demo96_js/Demo96.wasm", b"\0asm-v2"),
+            ("zkey/Demo96_final.zkey", b"zkey-v2"),
+            ("Hash_js/Hash.wasm", b"\0asm-hash"),
+            ("zkey/Hash_final.zkey", b"zkey-hash"),
+        ):
+            (self.root / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / path).write_bytes(data)
+        v2_paths = {
+            "wasm": {"path": "Demo96_js/Demo96.wasm"},
+            "zkey": {"path": "zkey/Demo96_final.zkey"},
+        }
+        manifest = {
+            "circuits": [
+                {
+                    "name": "Demo",
+                    "version": "1",
+                    "threshold": 128,
+                    "publicSignals": ["publicCommitment"],
+                },
+                {
+                    "name": "Demo",
+                    "version": "2",
+                    "threshold": 96,
+                    "publicSignals": ["publicCommitment"],
+                    "artifacts": v2_paths,
+                },
+                {"name": "Hash", "publicSignals": ["commitment"]},
+            ]
+        }
+        (self.root / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        write_manifest(self.root)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_resolves_default_and_selected_versions(self):
+        default = resolve_proof_circuit(self.root, "Demo")
+        self.assertEqual((default.id, default.threshold, default.default), ("Demo@1", 128, True))
+        selected = resolve_proof_circuit(self.root, "Demo", "2")
+        self.assertEqual((selected.id, selected.threshold, selected.default), ("Demo@2", 96, False))
+        self.assertEqual(resolve_circuit(self.root, "Demo@2"), selected)
+        self.assertEqual(selected.public_signal_index("publicCommitment"), 0)
+
+        registry = ArtifactRegistry(self.root)
+        self.assertEqual(bytes(registry.circuit("Demo", "2").zkey.buffer), b"zkey-v2")
+        self.assertEqual(
+            [spec.id for spec in list_circuits(self.root)], ["Demo@1", "Demo@2", "Hash@1"]
+        )
+
+    def test_rejects_unknown_versions_and_non_proof_circuits(self):
+        with self.assertRaises(CircuitError):
+            resolve_circuit(self.root, "Demo", "3")
+        with self.assertRaises(CircuitError):
+            resolve_proof_circuit(self.root, "Hash")
+
+    def test_default_flag_selects_version_and_manifest_keeps_definitions(self):
+        manifest = json.loads((self.root / "manifest.json").read_text(encoding="utf-8"))
+        manifest["circuits"][1]["default"] = True
+        (self.root / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        write_manifest(self.root, ["Demo"])
+
+        self.assertEqual(resolve_proof_circuit(self.root, "Demo").id, "Demo@2")
+        circuits = json.loads((self.root / "manifest.json").read_text(encoding="utf-8"))["circuits"]
+        self.assertEqual([entry["threshold"] for entry in circuits[:2]], [128, 96])
+        self.assertEqual(circuits[1]["artifacts"]["zkey"]["path"], "zkey/Demo96_final.zkey")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+
+from src.embedding_batcher import EmbeddingBatcher
+
+
+class EmbeddingBatcherTest(unittest.TestCase):
+    def test_concurrent_requests_share_one_batch(self):
+        calls = []
+
+        def run_batch(waveforms):
+            calls.append(len(waveforms))
+            return [sum(waveform) for waveform in waveforms]
+
+        batcher = EmbeddingBatcher(run_batch, max_batch=8, max_wait_seconds=0.2)
+        results = {}
+
+        def embed(index):
+            results[index] = batcher.embed([index] * 100)
+
+        threads = [threading.Thread(target=embed, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {index: index * 100 for index in range(4)})
+        self.assertLess(len(calls), 4)
+        self.assertEqual(batcher.stats()["items"], 4)
+
+    def test_embed_many_buckets_by_length_and_keeps_order(self):
+        batches = []
+
+        def run_batch(waveforms):
+            batches.append(sorted(len(waveform) for waveform in waveforms))
+            return [len(waveform) for waveform in waveforms]
+
+        batcher = EmbeddingBatcher(run_batch, max_batch=8, max_wait_seconds=0.05, bucket_ratio=1.1)
+        lengths = [16000, 48000, 16500, 47000]
+        self.assertEqual(batcher.embed_many([[0] * length for length in lengths]), lengths)
+        self.assertEqual(batches, [[16000, 16500], [47000, 48000]])
+
+    def test_batch_errors_are_returned_per_item(self):
+        def run_batch(waveforms):
+            raise RuntimeError("inference failed")
+
+        batcher = EmbeddingBatcher(run_batch, max_wait_seconds=0.0)
+        with self.assertRaises(RuntimeError):
+            batcher.embed([0.0])
+        results = batcher.embed_many([[0.0], [0.0]])
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_max_batch_limits_batch_size(self):
+        sizes = []
+
+        def run_batch(waveforms):
+            sizes.append(len(waveforms))
+            time.sleep(0.01)
+            return waveforms
+
+        batcher = EmbeddingBatcher(run_batch, max_batch=2, max_wait_seconds=0.05)
+        self.assertEqual(len(batcher.embed_many([[1]] * 5)), 5)
+        self.assertTrue(all(size <= 2 for size in sizes))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,20 +4,35 @@ import math
 import struct
 import unittest
 import wave
+from pathlib import Path
 from unittest.mock import patch
 
 from src.feature_extraction import (
+    AudioDecodeError,
     AudioFormatError,
     AudioQualityError,
     EmbeddingModelUnavailableError,
+    _load_waveform_16k,
+    _wav_bytes_to_mono_float32,
+    binarize_embedding,
     decode_audio_base64,
+    decode_audio_base64_into,
     extract_voice_features,
+    extract_voice_features_batch,
+    extract_voice_features_from_audio,
     pack_binary_features,
+    parse_wav_header,
+    validate_audio_quality,
 )
 
+SAMPLES = Path(__file__).resolve().parents[1] / "samples"
 
-def generate_wav_base64(seconds: float, sample_rate: int = 16000) -> str:
+
+def generate_wav_base64(
+    seconds: float, sample_rate: int = 16000, silence_seconds: float = 0.0
+) -> str:
     total_samples = int(sample_rate * seconds)
+    silence = bytes(int(sample_rate * silence_seconds) * 2)
     buffer = io.BytesIO()
 
     with wave.open(buffer, "wb") as writer:
@@ -29,7 +44,7 @@ def generate_wav_base64(seconds: float, sample_rate: int = 16000) -> str:
         for i in range(total_samples):
             value = int(32767 * math.sin(2 * math.pi * 440 * i / sample_rate))
             frames.extend(struct.pack("<h", value))
-        writer.writeframes(bytes(frames))
+        writer.writeframes(silence + bytes(frames) + silence)
 
     return base64.b64encode(buffer.getvalue()).decode("ascii")
 
@@ -39,6 +54,45 @@ class FeatureExtractionTest(unittest.TestCase):
         with self.assertRaises(AudioFormatError):
             decode_audio_base64("not-base64!")
 
+    def test_streamed_base64_decode_matches_and_buffer_is_zeroed(self):
+        from src.audio_buffers import AudioBufferPool
+
+        audio_b64 = generate_wav_base64(3.0)
+        pool = AudioBufferPool(initial_bytes=1024)
+        with pool.acquire() as buffer:
+            decoded = decode_audio_base64_into(audio_b64, buffer)
+            self.assertEqual(bytes(decoded), base64.b64decode(audio_b64))
+            data = buffer.data
+        self.assertFalse(any(data))
+
+        for invalid in ("not-base64!", "YQ==YQ==", "YW Jj", "YWJ"):
+            with self.subTest(invalid=invalid):
+                with pool.acquire() as buffer, self.assertRaises(AudioFormatError):
+                    decode_audio_base64_into(invalid, buffer)
+
+    def test_raw_and_base64_inputs_produce_identical_features(self):
+        audio_b64 = generate_wav_base64(1.2)
+        with patch.dict("os.environ", {"BACKEND_EMBEDDING_PROVIDER": "deterministic"}):
+            from_base64 = extract_voice_features(audio_b64)
+            from_raw = extract_voice_features_from_audio(
+                memoryview(base64.b64decode(audio_b64)), "audio/wav"
+            )
+        self.assertEqual(from_base64, from_raw)
+
+    def test_deterministic_features_keep_float64_values(self):
+        import hashlib
+
+        audio_bytes = base64.b64decode(generate_wav_base64(1.2))
+        expected = []
+        for counter in range(64):
+            digest = hashlib.sha256(audio_bytes + counter.to_bytes(4, "big")).digest()
+            for index in range(0, len(digest), 4):
+                number = int.from_bytes(digest[index : index + 4], "big")
+                expected.append((number / 0xFFFFFFFF) * 2.0 - 1.0)
+        with patch.dict("os.environ", {"BACKEND_EMBEDDING_PROVIDER": "deterministic"}):
+            result = extract_voice_features_from_audio(audio_bytes, "audio/wav")
+        self.assertEqual(result["features"], expected)
+
     @patch("src.feature_extraction._extract_embedding_with_model")
     def test_extract_voice_features_returns_expected_shapes(self, mock_extract):
         audio_b64 = generate_wav_base64(1.2)
@@ -60,6 +114,28 @@ class FeatureExtractionTest(unittest.TestCase):
     def test_pack_binary_features_requires_exact_512_bits(self):
         with self.assertRaises(ValueError):
             pack_binary_features([0, 1, 1])
+        with self.assertRaises(ValueError):
+            pack_binary_features([2] * 512)
+
+    def test_binarize_and_pack_match_bitwise_reference(self):
+        import random
+
+        generator = random.Random(1234)
+        for _ in range(20):
+            embedding = [generator.uniform(-1.0, 1.0) for _ in range(512)]
+            bits = [1 if value >= 0.0 else 0 for value in embedding]
+            expected = []
+            for block_start in range(0, 512, 64):
+                value = 0
+                for bit_index, bit in enumerate(bits[block_start : block_start + 64]):
+                    value |= bit << bit_index
+                expected.append(value)
+
+            binary = binarize_embedding(embedding)
+            self.assertEqual(binary.tolist(), bits)
+            self.assertEqual(pack_binary_features(binary).tolist(), expected)
+
+        self.assertEqual(pack_binary_features([1] * 512).tolist(), [(1 << 64) - 1] * 8)
 
     @patch("src.feature_extraction._extract_embedding_with_model")
     def test_extract_voice_features_raises_when_model_unavailable(self, mock_extract):
@@ -68,6 +144,240 @@ class FeatureExtractionTest(unittest.TestCase):
         with self.assertRaises(EmbeddingModelUnavailableError):
             extract_voice_features(audio_b64)
 
+    def test_extract_voice_features_batch_reports_per_item_errors(self):
+        with patch.dict("os.environ", {"BACKEND_EMBEDDING_PROVIDER": "deterministic"}):
+            results = extract_voice_features_batch(
+                [{"audio": generate_wav_base64(1.2)}, {"audio": generate_wav_base64(0.5)}, {}]
+            )
+        self.assertEqual(len(results[0]["packedFeatures"]), 8)
+        self.assertEqual(results[0]["modelUsed"], "deterministic:pyannote/embedding")
+        self.assertEqual(results[1]["error"]["code"], "INVALID_AUDIO")
+        self.assertEqual(results[2]["error"]["code"], "INVALID_AUDIO")
+
+    def test_extract_voice_features_batch_reports_oversized_item(self):
+        from src.audio_buffers import AudioBufferPool
+
+        pool = AudioBufferPool(initial_bytes=1024, max_bytes=64 * 1024)
+        with patch.dict("os.environ", {"BACKEND_EMBEDDING_PROVIDER": "deterministic"}):
+            with patch("src.feature_extraction.get_audio_buffer_pool", return_value=pool):
+                results = extract_voice_features_batch(
+                    [{"audio": generate_wav_base64(3.0)}, {"audio": generate_wav_base64(1.2)}]
+                )
+        self.assertEqual(results[0]["error"]["code"], "PAYLOAD_TOO_LARGE")
+        self.assertEqual(len(results[1]["packedFeatures"]), 8)
+
+    @patch("src.feature_extraction._run_pyannote_batch")
+    def test_extract_voice_features_batch_runs_one_forward_pass(self, mock_run):
+        import numpy as np
+
+        mock_run.side_effect = lambda model_name, waveforms: [
+            np.full(512, 0.5, dtype=np.float32) for _ in waveforms
+        ]
+        env = {"BACKEND_EMBEDDING_PROVIDER": "pyannote", "BACKEND_EMBEDDING_BATCH_SIZE": "8"}
+        with patch.dict("os.environ", env):
+            results = extract_voice_features_batch(
+                [{"audio": generate_wav_base64(1.2)}, {"audio": generate_wav_base64(1.25)}]
+            )
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertEqual([len(result["features"]) for result in results], [512, 512])
+        self.assertEqual(results[0]["packedFeatures"], [(1 << 64) - 1] * 8)
+
+    @patch("src.feature_extraction._run_pyannote_batch")
+    def test_silence_is_trimmed_before_inference(self, mock_run):
+        import numpy as np
+
+        lengths = []
+        mock_run.side_effect = lambda model_name, waveforms: [
+            lengths.append(len(waveform)) or np.ones(512, dtype=np.float32)
+            for waveform in waveforms
+        ]
+        env = {"BACKEND_EMBEDDING_PROVIDER": "pyannote", "BACKEND_EMBEDDING_BATCH_SIZE": "1"}
+        with patch.dict("os.environ", env):
+            results = extract_voice_features_batch(
+                [
+                    {"audio": generate_wav_base64(1.2, silence_seconds=3.0)},
+                    {"audio": generate_wav_base64(0.2, silence_seconds=3.0)},
+                ]
+            )
+
+        self.assertEqual(len(results[0]["features"]), 512)
+        self.assertEqual(len(lengths), 1)
+        self.assertAlmostEqual(lengths[0] / 16000, 1.4, delta=0.05)
+        self.assertEqual(results[1]["error"]["code"], "INVALID_AUDIO")
+
+    def test_onnx_provider_keeps_512_dim_contract(self):
+        try:
+            import onnx
+            import onnxruntime  # noqa: F401
+            from onnx import TensorProto, helper
+        except ImportError:
+            self.skipTest("onnx / onnxruntime is not installed")
+        import tempfile
+
+        import numpy as np
+
+        # 平均振幅に定数ベクトルを掛ける最小の「埋め込み」グラフ (出力 256 次元は 512 次元へゼロ埋めされる)
+        scale = helper.make_tensor("scale", TensorProto.FLOAT, [1, 256], np.linspace(-1, 1, 256))
+        graph = helper.make_graph(
+            [
+                helper.make_node("ReduceMean", ["waveform"], ["mean"], axes=[2], keepdims=0),
+                helper.make_node("Mul", ["mean", "scale"], ["embedding"]),
+            ],
+            "embedding",
+            [helper.make_tensor_value_info("waveform", TensorProto.FLOAT, ["batch", 1, "samples"])],
+            [helper.make_tensor_value_info("embedding", TensorProto.FLOAT, ["batch", 256])],
+            [scale],
+        )
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/embedding.onnx"
+            onnx.save(model, path)
+            env = {
+                "BACKEND_EMBEDDING_PROVIDER": "onnx",
+                "BACKEND_EMBEDDING_ONNX_PATH": path,
+                "BACKEND_EMBEDDING_BATCH_SIZE": "8",
+                "BACKEND_ONNX_INTRA_OP_THREADS": "1",
+            }
+            with patch.dict("os.environ", env):
+                results = extract_voice_features_batch(
+                    [{"audio": generate_wav_base64(1.2)}, {"audio": generate_wav_base64(1.5)}]
+                )
+        self.assertEqual([len(result["features"]) for result in results], [512, 512])
+        self.assertEqual(results[0]["features"][256:], [0.0] * 256)
+        self.assertEqual(results[0]["modelUsed"], "onnx:pyannote/embedding")
+
+        env = {"BACKEND_EMBEDDING_PROVIDER": "onnx", "BACKEND_EMBEDDING_ONNX_PATH": ""}
+        with patch.dict("os.environ", env):
+            failed = extract_voice_features_batch([{"audio": generate_wav_base64(1.2)}])
+        self.assertEqual(failed[0]["error"]["code"], "MODEL_UNAVAILABLE")
+
+    def test_int8_quantized_onnx_model_stays_within_bit_budget(self):
+        try:
+            import onnx
+            import onnxruntime  # noqa: F401
+            from onnx import TensorProto, helper
+        except ImportError:
+            self.skipTest("onnx / onnxruntime is not installed")
+        import os
+        import tempfile
+
+        import numpy as np
+
+        # 25ms フレームへの線形射影を平均する最小モデル (MatMul が動的量子化の対象になる)
+        weights = np.random.default_rng(5).standard_normal((400, 512)).astype(np.float32)
+        graph = helper.make_graph(
+            [
+                helper.make_node("Reshape", ["waveform", "shape"], ["frames"]),
+                helper.make_node("MatMul", ["frames", "weights"], ["projected"]),
+                helper.make_node("ReduceMean", ["projected"], ["embedding"], axes=[1], keepdims=0),
+            ],
+            "embedding",
+            [helper.make_tensor_value_info("waveform", TensorProto.FLOAT, ["batch", 1, "samples"])],
+            [helper.make_tensor_value_info("embedding", TensorProto.FLOAT, ["batch", 512])],
+            [
+                helper.make_tensor("shape", TensorProto.INT64, [3], [0, -1, 400]),
+                helper.make_tensor("weights", TensorProto.FLOAT, [400, 512], weights.ravel()),
+            ],
+        )
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+        items = [{"audio": generate_wav_base64(1.2)}, {"audio": generate_wav_base64(1.5)}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/embedding.onnx"
+            onnx.save(model, path)
+            env = {
+                "BACKEND_EMBEDDING_PROVIDER": "onnx",
+                "BACKEND_EMBEDDING_ONNX_PATH": path,
+                "BACKEND_EMBEDDING_BATCH_SIZE": "1",
+            }
+            with patch.dict("os.environ", {**env, "BACKEND_EMBEDDING_QUANTIZE": "none"}):
+                reference = extract_voice_features_batch(items)
+            with patch.dict("os.environ", {**env, "BACKEND_EMBEDDING_QUANTIZE": "int8"}):
+                quantized = extract_voice_features_batch(items)
+            self.assertTrue(os.path.exists(f"{directory}/embedding.int8.onnx"))
+
+        self.assertEqual(quantized[0]["modelUsed"], "onnx:pyannote/embedding:int8")
+        for fp32, int8 in zip(reference, quantized):
+            flips = sum(a != b for a, b in zip(fp32["binaryFeatures"], int8["binaryFeatures"]))
+            self.assertLess(flips, 128)
+            self.assertGreater(np.corrcoef(fp32["features"], int8["features"])[0, 1], 0.99)
+
+    def test_webm_duration_is_checked_without_decoding(self):
+        webm = (SAMPLES / "sample_audio_1_2s.webm").read_bytes()
+        with patch("src.feature_extraction._load_waveform_16k") as mock_decode:
+            self.assertIsNone(validate_audio_quality(webm, "webm"))
+            with self.assertRaises(AudioQualityError):
+                validate_audio_quality(webm, "webm", min_seconds=2.0)
+            with self.assertRaises(AudioFormatError):
+                validate_audio_quality(b"\x1a\x45\xdf\xa3" + b"\x00" * 64, "webm")
+        mock_decode.assert_not_called()
+
+    def test_webm_is_decoded_in_process_to_16k_float32(self):
+        try:
+            import av  # noqa: F401
+        except ImportError:
+            self.skipTest("PyAV is not installed")
+
+        webm = (SAMPLES / "sample_audio_1_2s.webm").read_bytes()
+        with patch.dict("os.environ", {"BACKEND_AUDIO_DECODER": "auto"}):
+            with patch("src.feature_extraction._decode_webm_to_wav") as mock_ffmpeg:
+                samples = _load_waveform_16k(webm, "webm")
+        mock_ffmpeg.assert_not_called()
+        self.assertEqual(str(samples.dtype), "float32")
+        self.assertAlmostEqual(samples.shape[0] / 16000, 1.2, delta=0.05)
+
+        with self.assertRaises(AudioDecodeError):
+            _load_waveform_16k(b"\x1a\x45\xdf\xa3" + b"\x00" * 64, "webm")
+
+    @patch("src.feature_extraction._decode_webm_to_wav")
+    def test_ffmpeg_decoder_remains_available_as_fallback(self, mock_ffmpeg):
+        mock_ffmpeg.return_value = base64.b64decode(generate_wav_base64(1.0, sample_rate=8000))
+        with patch.dict("os.environ", {"BACKEND_AUDIO_DECODER": "ffmpeg"}):
+            samples = _load_waveform_16k(b"webm", "webm")
+        mock_ffmpeg.assert_called_once_with(b"webm")
+        self.assertEqual(samples.shape[0], 16000)
+
+    def test_wav_conversion_matches_wave_module_for_all_layouts(self):
+        import numpy as np
+
+        generator = np.random.default_rng(3)
+        for sample_width, channels in ((1, 1), (2, 1), (2, 2), (4, 2)):
+            with self.subTest(sample_width=sample_width, channels=channels):
+                if sample_width == 1:
+                    raw = generator.integers(0, 256, size=(800, channels), dtype=np.uint8)
+                else:
+                    info = np.iinfo(f"<i{sample_width}")
+                    raw = generator.integers(info.min, info.max, size=(800, channels)).astype(
+                        f"<i{sample_width}"
+                    )
+                buffer = io.BytesIO()
+                with wave.open(buffer, "wb") as writer:
+                    writer.setnchannels(channels)
+                    writer.setsampwidth(sample_width)
+                    writer.setframerate(8000)
+                    writer.writeframes(raw.tobytes())
+
+                samples, sample_rate = _wav_bytes_to_mono_float32(buffer.getvalue())
+                scale = {1: 128.0, 2: 32768.0, 4: 2147483648.0}[sample_width]
+                offset = 128.0 if sample_width == 1 else 0.0
+                expected = ((raw.astype(np.float64) - offset) / scale).mean(axis=1)
+                self.assertEqual(sample_rate, 8000)
+                self.assertEqual(samples.dtype, np.float32)
+                np.testing.assert_allclose(samples, expected, atol=1e-6)
+
+    def test_wav_header_is_parsed_once_and_tolerates_streamed_sizes(self):
+        wav = bytearray(base64.b64decode(generate_wav_base64(1.2)))
+        header = validate_audio_quality(bytes(wav), "wav")
+        self.assertEqual((header.sample_rate, header.channels, header.sample_width), (16000, 1, 2))
+        self.assertAlmostEqual(header.duration, 1.2)
+
+        # ffmpeg のパイプ出力のように RIFF / data のサイズが不定でも末尾までを読む
+        wav[4:8] = b"\xff\xff\xff\xff"
+        wav[header.data_offset - 4 : header.data_offset] = b"\xff\xff\xff\xff"
+        self.assertEqual(parse_wav_header(bytes(wav) + b"\x00").frame_count, 19200)
+
+        with self.assertRaises(AudioDecodeError):
+            validate_audio_quality(b"RIFF\x00\x00\x00\x00WAVEjunk", "wav")
+
 
 if __name__ == "__main__":
     unittest.main()
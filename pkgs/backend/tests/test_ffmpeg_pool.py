@@ -0,0 +1,46 @@
+import subprocess
+import sys
+import unittest
+
+from src.ffmpeg_pool import FfmpegDecodePool
+
+ECHO_REVERSED = [
+    sys.executable,
+    "-c",
+    "import sys; data = sys.stdin.buffer.read(); sys.stdout.buffer.write(data[::-1])",
+]
+FAILING = [sys.executable, "-c", "import sys; sys.stdin.buffer.read(); sys.exit(1)"]
+
+
+class FfmpegDecodePoolTest(unittest.TestCase):
+    def test_decode_uses_prespawned_processes_and_replenishes(self):
+        pool = FfmpegDecodePool(size=2, command=ECHO_REVERSED, timeout=10.0)
+        try:
+            pool.start()
+            for index in range(4):
+                self.assertEqual(pool.decode(f"job{index}".encode()), f"{index}boj".encode())
+            stats = pool.stats()
+            self.assertEqual(stats["jobs"], 4)
+            self.assertEqual(stats["failures"], 0)
+            self.assertGreaterEqual(stats["spawned"], 4)
+            self.assertEqual(sum(stats["latencyHistogram"].values()), 4)
+        finally:
+            pool.close()
+
+    def test_failed_decode_raises_called_process_error(self):
+        pool = FfmpegDecodePool(size=1, command=FAILING, timeout=10.0)
+        try:
+            with self.assertRaises(subprocess.CalledProcessError):
+                pool.decode(b"not webm")
+            self.assertEqual(pool.stats()["failures"], 1)
+        finally:
+            pool.close()
+
+    def test_missing_binary_raises_file_not_found(self):
+        pool = FfmpegDecodePool(size=1, command=["/nonexistent/ffmpeg"])
+        with self.assertRaises(FileNotFoundError):
+            pool.decode(b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
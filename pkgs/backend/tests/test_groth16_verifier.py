@@ -0,0 +1,126 @@
+import copy
+import json
+import os
+import pathlib
+import unittest
+from unittest.mock import patch
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+# pkgs/circuit/data/VoiceCommitment_proof.json (zk/zkey/VoiceCommitment_final.zkey で生成)
+VOICE_COMMITMENT_PROOF = {
+    "pi_a": [
+        "585282857968596928096896222710738160915213433575683378823447592907838227708",
+        "12035731548146983861067716424785088258630790976986351909336032042101878543765",
+        "1",
+    ],
+    "pi_b": [
+        [
+            "10686000704787348819417887202706590452612758911836502984519515274617474667789",
+            "118981553440434871111727342872828782722534609447390156450886379755494568425",
+        ],
+        [
+            "5572172028712890892544829020391263874868628849315418411962540040187671969068",
+            "7220731314671767239888328008906656800443479034311896139165055516983958632450",
+        ],
+        ["1", "0"],
+    ],
+    "pi_c": [
+        "10074097012330239670746731646588823737081441177777533247390177434723634685079",
+        "17636565254797441485315073096534376631488728426789506588688877311835604688847",
+        "1",
+    ],
+    "protocol": "groth16",
+    "curve": "bn128",
+}
+VOICE_COMMITMENT_PUBLIC = [
+    "17204041366246486412394101808417708187011595214573470694048667731783274162294"
+]
+
+
+class Groth16VerifierTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import py_ecc  # noqa: F401
+        except ModuleNotFoundError as error:
+            raise unittest.SkipTest(f"py_ecc is not installed in this environment: {error}")
+
+        from src.groth16_verifier import load_prepared_verification_key
+
+        cls.verification_key = load_prepared_verification_key(ROOT / "zk", "VoiceCommitment")
+
+    def test_prepared_key_is_cached_per_circuit(self):
+        from src.groth16_verifier import load_prepared_verification_key
+
+        self.assertIs(
+            load_prepared_verification_key(ROOT / "zk", "VoiceCommitment"),
+            self.verification_key,
+        )
+
+    def test_verify_accepts_valid_proof_and_rejects_wrong_signal(self):
+        self.assertTrue(
+            self.verification_key.verify(VOICE_COMMITMENT_PROOF, VOICE_COMMITMENT_PUBLIC)
+        )
+        tampered = [str(int(VOICE_COMMITMENT_PUBLIC[0]) + 1)]
+        self.assertFalse(self.verification_key.verify(VOICE_COMMITMENT_PROOF, tampered))
+
+    def test_verify_batch_isolates_invalid_items(self):
+        malformed = copy.deepcopy(VOICE_COMMITMENT_PROOF)
+        malformed["pi_a"][1] = "1"
+        results = self.verification_key.verify_batch(
+            [
+                (VOICE_COMMITMENT_PROOF, VOICE_COMMITMENT_PUBLIC),
+                (VOICE_COMMITMENT_PROOF, ["1"]),
+                (malformed, VOICE_COMMITMENT_PUBLIC),
+                (VOICE_COMMITMENT_PROOF, VOICE_COMMITMENT_PUBLIC),
+            ]
+        )
+        self.assertEqual(results, [True, False, False, True])
+
+    def test_verify_proof_endpoint(self):
+        try:
+            from src.app import create_app
+        except ModuleNotFoundError as error:
+            self.skipTest(f"flask is not installed in this environment: {error}")
+
+        with patch.dict(os.environ, {"ZK_CIRCUIT_ROOT": str(ROOT / "zk")}):
+            client = create_app().test_client()
+        response = client.post(
+            "/verify-proof",
+            data=json.dumps(
+                {
+                    "circuit": "VoiceCommitment",
+                    "proof": VOICE_COMMITMENT_PROOF,
+                    "publicSignals": VOICE_COMMITMENT_PUBLIC,
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json(),
+            {"circuit": "VoiceCommitment", "circuitVersion": "1", "valid": True},
+        )
+
+        response = client.post(
+            "/verify-proof",
+            data=json.dumps({"circuit": "../secrets", "proofs": [{}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        # 件数上限を超える proofs は検証せずに拒否する
+        item = {"proof": VOICE_COMMITMENT_PROOF, "publicSignals": VOICE_COMMITMENT_PUBLIC}
+        with patch.dict(os.environ, {"BACKEND_MAX_PROOF_BATCH": "2"}):
+            response = client.post(
+                "/verify-proof",
+                data=json.dumps({"circuit": "VoiceCommitment", "proofs": [item] * 3}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["error"]["code"], "BAD_REQUEST")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import struct
+import unittest
+from pathlib import Path
+
+from src.matroska import MatroskaParseError, parse_webm_info
+
+SAMPLES = Path(__file__).resolve().parents[1] / "samples"
+
+
+def _ebml(element_id: bytes, body: bytes) -> bytes:
+    # 8バイト長のサイズ表現で要素を組み立てる
+    return element_id + (0x01 << 56 | len(body)).to_bytes(8, "big") + body
+
+
+def _unknown(element_id: bytes) -> bytes:
+    return element_id + b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+def _recorder_stream(block_times, cluster_size=10, timecode_scale=1_000_000) -> bytes:
+    # MediaRecorder 風: サイズ不明の Segment/Cluster、Duration なし、SimpleBlock のみ
+    tracks = _ebml(
+        b"\x16\x54\xae\x6b", _ebml(b"\xae", _ebml(b"\xd7", b"\x01") + _ebml(b"\x83", b"\x02"))
+    )
+    data = _ebml(b"\x1a\x45\xdf\xa3", b"") + _unknown(b"\x18\x53\x80\x67")
+    data += _ebml(b"\x15\x49\xa9\x66", _ebml(b"\x2a\xd7\xb1", struct.pack(">I", timecode_scale)))
+    data += tracks
+    for start in range(0, len(block_times), cluster_size):
+        cluster_time = block_times[start]
+        data += _unknown(b"\x1f\x43\xb6\x75") + _ebml(b"\xe7", struct.pack(">I", cluster_time))
+        for timestamp in block_times[start : start + cluster_size]:
+            data += _ebml(
+                b"\xa3", b"\x81" + struct.pack(">hB", timestamp - cluster_time, 0x80) + b"opus"
+            )
+    return data
+
+
+class MatroskaDurationTest(unittest.TestCase):
+    def test_reads_duration_element_from_header(self):
+        info = parse_webm_info((SAMPLES / "sample_audio_1_2s.webm").read_bytes())
+        self.assertTrue(info.from_header)
+        self.assertAlmostEqual(info.duration, 1.2, delta=0.05)
+
+    def test_estimates_duration_from_block_timestamps(self):
+        info = parse_webm_info(_recorder_stream(list(range(0, 3000, 20))))
+        self.assertFalse(info.from_header)
+        self.assertAlmostEqual(info.duration, 3.0)
+
+        short = parse_webm_info(_recorder_stream(list(range(0, 400, 20)), timecode_scale=2_000_000))
+        self.assertAlmostEqual(short.duration, 0.8)
+
+    def test_truncated_stream_uses_complete_blocks(self):
+        data = _recorder_stream(list(range(0, 3000, 20)))
+        self.assertLess(parse_webm_info(data[: len(data) // 2]).duration, 2.0)
+
+    def test_rejects_non_matroska_and_empty_streams(self):
+        with self.assertRaises(MatroskaParseError):
+            parse_webm_info(b"RIFF\x00\x00\x00\x00WAVE")
+        with self.assertRaises(MatroskaParseError):
+            parse_webm_info(_recorder_stream([]))
+        with self.assertRaises(MatroskaParseError):
+            parse_webm_info(b"\x1a\x45\xdf\xa3" + b"\x00" * 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
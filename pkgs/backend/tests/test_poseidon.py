@@ -0,0 +1,100 @@
+import json
+import pathlib
+import unittest
+from pathlib import Path
+
+from src.poseidon import SNARK_SCALAR_FIELD, poseidon
+from src.proof_generation import ProofGenerationError, compute_poseidon_commitment
+
+CIRCUIT_DATA = pathlib.Path(__file__).resolve().parents[2] / "circuit" / "data"
+
+# VoiceCommitment 回路 (zk/VoiceCommitment_js/VoiceCommitment.wasm) の公開シグナルから採取したベクタ
+VOICE_COMMITMENT_VECTORS = [
+    (
+        [1, 2, 3, 4, 5, 6, 7, 8],
+        999,
+        "17204041366246486412394101808417708187011595214573470694048667731783274162294",
+    ),
+    (
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        42,
+        "10829965834841877873089796471979282861933114119278143241217812005527531844344",
+    ),
+    (
+        [(1 << 64) - 1] * 8,
+        0,
+        "17828788467164686926903656287447276625545304227720972567258607035813080369882",
+    ),
+    (
+        [
+            17485029721327973432,
+            7283207964119141687,
+            890727360438182992,
+            15149836622520594227,
+            1736392818365009963,
+            10750541312280087032,
+            16781078052021535861,
+            3960482443532127989,
+        ],
+        996983008988582117473941256901736561589513512020222632756804160420750905560,
+        "1442115126643418494773502268397749699927452785777276923728898953579129584153",
+    ),
+    (
+        [
+            1090396360377453094,
+            10430779633273967791,
+            17477362246067780643,
+            11632994891556335705,
+            10754394637803157173,
+            1141153371300629929,
+            10801332806156616911,
+            914761360679426580,
+        ],
+        758327904864397471413636813232567776265393044850650292169175186851691748044,
+        "11816025041428925220230497573204766498073063393184734052665443658659864006849",
+    ),
+]
+
+
+class PoseidonTest(unittest.TestCase):
+    def test_matches_circomlib_reference_for_two_inputs(self):
+        self.assertEqual(
+            poseidon([1, 2]),
+            7853200120776062878684798364095072458815029376092732009249414926327459813530,
+        )
+
+    def test_matches_voice_commitment_public_signals(self):
+        for features, salt, expected in VOICE_COMMITMENT_VECTORS:
+            with self.subTest(salt=salt):
+                self.assertEqual(str(poseidon([*features, salt])), expected)
+                self.assertEqual(
+                    compute_poseidon_commitment(features, str(salt), Path(".")), expected
+                )
+
+    def test_inputs_are_reduced_modulo_field(self):
+        features = [1, 2, 3, 4, 5, 6, 7, 8]
+        self.assertEqual(
+            poseidon([*features, 999 + SNARK_SCALAR_FIELD]),
+            poseidon([*features, 999]),
+        )
+
+    def test_matches_circuit_fixture_files(self):
+        input_path = CIRCUIT_DATA / "VoiceCommitment.json"
+        public_path = CIRCUIT_DATA / "VoiceCommitment_public.json"
+        if not input_path.exists() or not public_path.exists():
+            self.skipTest("circuit fixtures are not available")
+
+        payload = json.loads(input_path.read_text(encoding="utf-8"))
+        public_signals = json.loads(public_path.read_text(encoding="utf-8"))
+        features = [int(value) for value in payload["voiceFeatures"]]
+        self.assertEqual(str(poseidon([*features, int(payload["salt"])])), public_signals[0])
+
+    def test_compute_poseidon_commitment_rejects_invalid_salt(self):
+        with self.assertRaises(ProofGenerationError):
+            compute_poseidon_commitment([0] * 8, "abc", Path("."))
+        with self.assertRaises(ProofGenerationError):
+            compute_poseidon_commitment([0] * 8, "-1", Path("."))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,25 @@
 import json
+import os
+import shutil
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from src.proof_generation import (
+    CommitmentCache,
     ProofGenerationError,
     build_generate_proof_response,
+    build_generate_proofs_response,
+    compute_commitment,
     ensure_hamming_threshold,
     hamming_distance_from_packed,
+    hamming_distances_batch,
     run_snarkjs_groth16,
 )
+from src.witness import parse_wtns
+
+ZK_ROOT = Path(__file__).resolve().parents[1] / "zk"
 
 
 class ProofGenerationTest(unittest.TestCase):
@@ -25,7 +34,8 @@ class ProofGenerationTest(unittest.TestCase):
         with self.assertRaises(ProofGenerationError):
             ensure_hamming_threshold(reference, current, threshold=128)
 
-    @patch("src.proof_generation.subprocess.run")
+    @patch.dict(os.environ, {"BACKEND_WITNESS_ENGINE": "snarkjs"})
+    @patch("src.prover_backends.subprocess.run")
     def test_run_snarkjs_groth16_invokes_fullprove(self, mock_run):
         def _mock_subprocess(command, check, capture_output, text):
             Path(command[-2]).write_text(json.dumps({"pi_a": []}), encoding="utf-8")
@@ -58,7 +68,40 @@ class ProofGenerationTest(unittest.TestCase):
             self.assertEqual(called_cmd[:3], ["snarkjs", "groth16", "fullprove"])
             self.assertTrue(called_cmd[3].endswith("input.json"))
 
-    @patch("src.proof_generation.run_snarkjs_groth16")
+    @patch("src.prover_backends.subprocess.run")
+    def test_run_snarkjs_groth16_proves_in_process_witness(self, mock_run):
+        written = {}
+
+        def _mock_subprocess(command, check, capture_output, text):
+            written["wtns"] = parse_wtns(Path(command[4]).read_bytes())
+            Path(command[-2]).write_text(json.dumps({"pi_a": []}), encoding="utf-8")
+            Path(command[-1]).write_text(json.dumps(["123"]), encoding="utf-8")
+            return Mock(returncode=0, stderr="", stdout="")
+
+        mock_run.side_effect = _mock_subprocess
+        phases = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            shutil.copytree(ZK_ROOT / "VoiceCommitment_js", temp_path / "VoiceCommitment_js")
+            (temp_path / "zkey").mkdir()
+            (temp_path / "zkey" / "VoiceCommitment_final.zkey").write_bytes(b"zkey")
+            with patch.dict(os.environ, {"BACKEND_WITNESS_ENGINE": "wasm"}):
+                result = run_snarkjs_groth16(
+                    {"voiceFeatures": [0] * 8, "salt": "42"},
+                    "VoiceCommitment",
+                    temp_path,
+                    progress=phases.append,
+                )
+
+        self.assertEqual(result["publicSignals"], ["123"])
+        self.assertEqual(mock_run.call_args[0][0][:3], ["snarkjs", "groth16", "prove"])
+        self.assertEqual(phases, ["witness", "prove"])
+        self.assertEqual(
+            written["wtns"][1],
+            10829965834841877873089796471979282861933114119278143241217812005527531844344,
+        )
+
+    @patch("src.proof_generation.run_groth16_prover")
     @patch("src.proof_generation.compute_poseidon_commitment")
     def test_build_generate_proof_response(self, mock_commitment, mock_prover):
         mock_commitment.return_value = "999"
@@ -77,6 +120,154 @@ class ProofGenerationTest(unittest.TestCase):
         self.assertEqual(response["commitment"], "999")
         self.assertEqual(response["publicSignals"], ["999"])
 
+    def test_hamming_distances_batch_matches_scalar_distance(self):
+        reference = [[0] * 8, [(1 << 64) - 1] * 8, [123456789, 0, 0, 0, 0, 0, 0, 42]]
+        current = [[(1 << 64) - 1, 1, 0, 0, 0, 0, 0, 0], [0] * 8, [987654321, 7, 0, 0, 0, 0, 0, 42]]
+        self.assertEqual(
+            hamming_distances_batch(reference, current),
+            [hamming_distance_from_packed(ref, cur) for ref, cur in zip(reference, current)],
+        )
+        self.assertEqual(hamming_distances_batch([], []), [])
+        with patch("src.proof_generation._optional_numpy", return_value=None):
+            self.assertEqual(
+                hamming_distances_batch(reference, current),
+                [hamming_distance_from_packed(ref, cur) for ref, cur in zip(reference, current)],
+            )
+
+    @patch("src.proof_generation.run_groth16_prover_batch")
+    @patch("src.proof_generation.compute_poseidon_commitment")
+    def test_build_generate_proofs_response_batches_survivors(self, mock_commitment, mock_batch):
+        mock_commitment.return_value = "999"
+        mock_batch.return_value = [
+            {"proof": {"pi_a": ["1"]}, "publicSignals": ["999"]},
+            ProofGenerationError("snarkjs prove failed"),
+        ]
+        items = [
+            {"referenceFeatures": [0] * 8, "currentFeatures": [0] * 8, "salt": "1"},
+            {"referenceFeatures": [0] * 3, "currentFeatures": [0] * 8, "salt": "1"},
+            {"referenceFeatures": [0] * 8, "currentFeatures": [(1 << 64) - 1] * 8, "salt": "1"},
+            {"referenceFeatures": [0] * 8, "currentFeatures": [1] + [0] * 7, "salt": "2"},
+        ]
+        results = build_generate_proofs_response(items, "VoiceOwnership", Path("."), 128)
+
+        mock_batch.assert_called_once()
+        self.assertEqual(len(mock_batch.call_args[0][0]), 2)
+        self.assertEqual(results[0]["commitment"], "999")
+        self.assertEqual(results[0]["hammingDistance"], 0)
+        self.assertEqual(results[1]["error"]["code"], "BAD_REQUEST")
+        self.assertIn("exceeds threshold", results[2]["error"]["message"])
+        self.assertEqual(results[3]["error"]["code"], "PROOF_GENERATION_ERROR")
+
+    def test_compute_commitment_reports_native_engine(self):
+        with patch.dict(os.environ, {"BACKEND_COMMITMENT_ENGINE": "native"}):
+            result = compute_commitment([0] * 8, "42", Path("."))
+        self.assertEqual(result["engine"], "native")
+        self.assertEqual(
+            result["commitment"],
+            "10829965834841877873089796471979282861933114119278143241217812005527531844344",
+        )
+
+    @patch("src.proof_generation.get_commitment_cache", return_value=None)
+    @patch("src.proof_generation._started_prover_pool")
+    def test_compute_commitment_witness_engine_skips_prover(self, mock_pool, _mock_cache):
+        pool = Mock()
+        pool.witness.return_value = ["777"]
+        mock_pool.return_value = pool
+        env = {"BACKEND_COMMITMENT_ENGINE": "witness", "BACKEND_WITNESS_ENGINE": "snarkjs"}
+        with patch.dict(os.environ, env):
+            result = compute_commitment([1] * 8, "5", Path("."))
+
+        self.assertEqual(result, {"commitment": "777", "engine": "witness", "cached": False})
+        pool.witness.assert_called_once_with(
+            "VoiceCommitment",
+            {"voiceFeatures": ["1"] * 8, "salt": "5"},
+            outputs=1,
+        )
+        pool.prove.assert_not_called()
+
+    @patch("src.proof_generation.get_commitment_cache", return_value=None)
+    @patch("src.proof_generation.calculate_witness_cli")
+    @patch("src.proof_generation._started_prover_pool")
+    def test_compute_commitment_witness_engine_falls_back_to_cli(
+        self, mock_pool, mock_cli, _mock_cache
+    ):
+        mock_pool.return_value = None
+        mock_cli.return_value = [1, 888, 3]
+        with patch.dict(os.environ, {"BACKEND_WITNESS_ENGINE": "snarkjs"}):
+            result = compute_commitment([1] * 8, "5", Path("."), engine="witness")
+        self.assertEqual(result, {"commitment": "888", "engine": "witness", "cached": False})
+
+    @patch("src.proof_generation.get_commitment_cache", return_value=None)
+    @patch("src.proof_generation._started_prover_pool")
+    def test_compute_commitment_witness_engine_runs_wasm_in_process(self, mock_pool, _mock_cache):
+        with patch.dict(os.environ, {"BACKEND_WITNESS_ENGINE": "wasm"}):
+            witness = compute_commitment([7] * 8, "11", ZK_ROOT, engine="witness")
+        native = compute_commitment([7] * 8, "11", ZK_ROOT, engine="native")
+
+        self.assertEqual(witness["commitment"], native["commitment"])
+        mock_pool.assert_not_called()
+
+    def test_compute_commitment_rejects_unknown_engine(self):
+        with patch.dict(os.environ, {"BACKEND_COMMITMENT_ENGINE": "groth16"}):
+            with self.assertRaises(ProofGenerationError):
+                compute_commitment([0] * 8, "42", Path("."))
+
+
+class CommitmentCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _cache(self, **kwargs):
+        return CommitmentCache(clock=lambda: self.now, **kwargs)
+
+    @patch("src.proof_generation.poseidon")
+    def test_repeat_commitment_skips_derivation(self, mock_poseidon):
+        mock_poseidon.return_value = 4242
+        cache = self._cache(max_entries=4)
+        with patch("src.proof_generation.get_commitment_cache", return_value=cache):
+            first = compute_commitment([3] * 8, "9", Path("."), engine="native")
+            second = compute_commitment([3] * 8, "9", Path("."), engine="native")
+
+        self.assertEqual(first, {"commitment": "4242", "engine": "native", "cached": False})
+        self.assertEqual(second, {"commitment": "4242", "engine": "native", "cached": True})
+        mock_poseidon.assert_called_once()
+        self.assertEqual(cache.stats(), {"hits": 1, "diskHits": 0, "misses": 1, "entries": 1})
+
+    def test_entries_expire_and_are_evicted_lru(self):
+        cache = self._cache(max_entries=2, ttl_seconds=10)
+        keys = [cache.key_for([index] * 8, 1) for index in range(3)]
+        cache.put(keys[0], "0", "native")
+        cache.put(keys[1], "1", "native")
+        self.assertEqual(cache.get(keys[0]), ("0", "native"))
+        cache.put(keys[2], "2", "native")
+
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[0]), ("0", "native"))
+        self.now += 11
+        self.assertIsNone(cache.get(keys[0]))
+
+    def test_disk_backing_survives_restart_without_plaintext_features(self):
+        db_path = Path(self.temp_dir.name) / "commitments.sqlite3"
+        features = [123456789] * 8
+        cache = self._cache(secret=b"secret", db_path=db_path)
+        cache.put(cache.key_for(features, 77), "555", "native")
+        cache.close()
+
+        restarted = self._cache(secret=b"secret", db_path=db_path)
+        self.assertEqual(restarted.get(restarted.key_for(features, 77)), ("555", "native"))
+        self.assertEqual(restarted.stats()["diskHits"], 1)
+        restarted.close()
+        self.assertNotIn(b"123456789", db_path.read_bytes())
+
+    def test_keys_depend_on_secret(self):
+        first = self._cache(secret=b"a")
+        second = self._cache(secret=b"b")
+        self.assertNotEqual(first.key_for([0] * 8, 1), second.key_for([0] * 8, 1))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,67 @@
+import threading
+import unittest
+
+from src.proof_jobs import JobQueueFullError, ProofJobQueue, format_sse
+
+
+class ProofJobQueueTest(unittest.TestCase):
+    def test_job_reports_phases_and_result(self):
+        jobs = ProofJobQueue(max_queued=4, workers=1)
+
+        def task(progress):
+            progress("witness")
+            progress("prove")
+            return {"proof": "ok"}
+
+        job_id = jobs.submit(task)
+        phases = [event["phase"] for event in jobs.events(job_id, timeout=5.0)]
+        self.assertEqual(phases, ["queued", "witness", "prove", "done"])
+        snapshot = jobs.get(job_id)
+        self.assertEqual(snapshot["phase"], "done")
+        self.assertEqual(snapshot["result"], {"proof": "ok"})
+
+    def test_failed_job_uses_error_mapper(self):
+        jobs = ProofJobQueue(
+            error_mapper=lambda error: {"code": "PROOF_GENERATION_ERROR", "message": str(error)}
+        )
+
+        def task(progress):
+            raise ValueError("hamming distance exceeds threshold")
+
+        job_id = jobs.submit(task)
+        events = list(jobs.events(job_id, timeout=5.0))
+        self.assertEqual(events[-1]["phase"], "failed")
+        self.assertEqual(events[-1]["error"]["code"], "PROOF_GENERATION_ERROR")
+
+    def test_queue_is_bounded(self):
+        jobs = ProofJobQueue(max_queued=1, workers=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking(progress):
+            started.set()
+            release.wait(5.0)
+            return {}
+
+        first = jobs.submit(blocking)
+        self.assertTrue(started.wait(5.0))
+        jobs.submit(lambda progress: {})
+        with self.assertRaises(JobQueueFullError):
+            jobs.submit(lambda progress: {})
+        release.set()
+        self.assertEqual(list(jobs.events(first, timeout=5.0))[-1]["phase"], "done")
+
+    def test_unknown_job(self):
+        jobs = ProofJobQueue()
+        self.assertIsNone(jobs.get("missing"))
+        self.assertEqual(list(jobs.events("missing", timeout=0.1)), [])
+
+    def test_format_sse(self):
+        self.assertEqual(
+            format_sse({"phase": "prove", "at": 1}),
+            'event: prove\ndata: {"phase": "prove", "at": 1}\n\n',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
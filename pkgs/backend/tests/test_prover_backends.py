@@ -0,0 +1,128 @@
+import ctypes
+import json
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from src.proof_generation import compute_commitment
+from src.prover_backends import (
+    ProverBackend,
+    ProverBackendError,
+    ProverBackendUnavailableError,
+    RapidsnarkBackend,
+    SnarkjsCliBackend,
+    SnarkjsWorkerBackend,
+    get_prover_backend,
+)
+from src.prover_pool import ProverPoolError
+from src.witness import parse_wtns
+
+try:
+    import wasmtime  # noqa: F401
+except ImportError:
+    wasmtime = None
+
+ZK_ROOT = Path(__file__).resolve().parents[1] / "zk"
+
+
+def _write_c_string(buffer, value):
+    data = json.dumps(value).encode("utf-8")
+    ctypes.memmove(buffer, data, len(data))
+
+
+class ProverBackendSelectionTest(unittest.TestCase):
+    def test_selects_backend_from_env(self):
+        with patch.dict(os.environ, {"BACKEND_PROVER": "snarkjs-cli"}):
+            self.assertIsInstance(get_prover_backend(ZK_ROOT, "VoiceOwnership"), SnarkjsCliBackend)
+        with patch.dict(os.environ, {"BACKEND_PROVER": "auto", "BACKEND_PROVER_POOL_SIZE": "0"}):
+            self.assertIsInstance(get_prover_backend(ZK_ROOT, "VoiceOwnership"), SnarkjsCliBackend)
+
+    @patch("src.prover_backends.get_prover_pool")
+    def test_auto_prefers_started_worker_pool(self, mock_get_pool):
+        pool = Mock()
+        mock_get_pool.return_value = pool
+        with patch.dict(os.environ, {"BACKEND_PROVER": "auto"}):
+            self.assertIsInstance(
+                get_prover_backend(ZK_ROOT, "VoiceOwnership"), SnarkjsWorkerBackend
+            )
+
+        pool.start.side_effect = ProverPoolError("node is not installed")
+        with patch.dict(os.environ, {"BACKEND_PROVER": "auto"}):
+            self.assertIsInstance(get_prover_backend(ZK_ROOT, "VoiceOwnership"), SnarkjsCliBackend)
+        with patch.dict(os.environ, {"BACKEND_PROVER": "snarkjs-worker"}):
+            with self.assertRaises(ProverBackendUnavailableError):
+                get_prover_backend(ZK_ROOT, "VoiceOwnership")
+
+    def test_rejects_unknown_or_unavailable_backend(self):
+        with patch.dict(os.environ, {"BACKEND_PROVER": "gnark"}):
+            with self.assertRaises(ProverBackendError):
+                get_prover_backend(ZK_ROOT, "VoiceOwnership")
+        env = {"BACKEND_PROVER": "snarkjs-worker", "BACKEND_PROVER_POOL_SIZE": "0"}
+        with patch.dict(os.environ, env):
+            with self.assertRaises(ProverBackendUnavailableError):
+                get_prover_backend(ZK_ROOT, "VoiceOwnership")
+        with self.assertRaises(ProverBackendUnavailableError):
+            RapidsnarkBackend(ZK_ROOT, library_path="/nonexistent/librapidsnark.so")
+
+    def test_prove_many_collects_per_item_errors(self):
+        backend = ProverBackend(ZK_ROOT)
+        backend.prove = Mock(side_effect=[{"proof": {}}, ProverBackendError("bad input")])
+        results = backend.prove_many([{}, {}], "VoiceOwnership")
+        self.assertEqual(results[0], {"proof": {}})
+        self.assertIsInstance(results[1], ProverBackendError)
+
+
+@unittest.skipIf(wasmtime is None, "wasmtime is not installed")
+class RapidsnarkBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.library = Mock()
+        patcher = patch("src.prover_backends.ctypes.CDLL", return_value=self.library)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.env = patch.dict(os.environ, {"BACKEND_WITNESS_ENGINE": "wasm"})
+        self.env.start()
+        self.addCleanup(self.env.stop)
+
+    def test_passes_in_memory_witness_and_zkey(self):
+        calls = []
+
+        def groth16_prover(zkey, zkey_size, wtns, wtns_size, proof, _, public, __, *args):
+            calls.append((zkey, wtns, len(proof)))
+            if len(calls) == 1:
+                return 2
+            _write_c_string(proof, {"protocol": "groth16"})
+            _write_c_string(public, ["42"])
+            return 0
+
+        self.library.groth16_prover.side_effect = groth16_prover
+        backend = RapidsnarkBackend(ZK_ROOT, library_path="librapidsnark.so")
+        phases = []
+        result = backend.prove(
+            {"voiceFeatures": [3] * 8, "salt": "9"}, "VoiceCommitment", progress=phases.append
+        )
+
+        self.assertEqual(result, {"proof": {"protocol": "groth16"}, "publicSignals": ["42"]})
+        self.assertEqual(phases, ["witness", "prove"])
+        zkey, wtns, _ = calls[-1]
+        self.assertEqual(zkey.raw, (ZK_ROOT / "zkey" / "VoiceCommitment_final.zkey").read_bytes())
+        commitment = compute_commitment([3] * 8, "9", ZK_ROOT, engine="native")["commitment"]
+        self.assertEqual(parse_wtns(wtns)[1], int(commitment))
+        # バッファ不足の応答では拡張して再実行する
+        self.assertGreater(calls[1][2], calls[0][2])
+        self.assertEqual(backend.stats()["proofs"], 1)
+
+    def test_prover_error_is_reported(self):
+        def groth16_prover(*args):
+            ctypes.memmove(args[8], b"invalid witness length", 22)
+            return 3
+
+        self.library.groth16_prover.side_effect = groth16_prover
+        backend = RapidsnarkBackend(ZK_ROOT, library_path="librapidsnark.so")
+        with self.assertRaises(ProverBackendError) as context:
+            backend.prove({"voiceFeatures": [0] * 8, "salt": "1"}, "VoiceCommitment")
+        self.assertIn("invalid witness length", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
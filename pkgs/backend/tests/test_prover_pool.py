@@ -0,0 +1,196 @@
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.prover_pool import ProverPoolError, SnarkjsWorkerPool, get_prover_pool, prover_pools
+
+ZK_ROOT = Path(__file__).resolve().parents[1] / "zk"
+
+FAKE_WORKER = textwrap.dedent(
+    """
+    import json
+    import os
+    import sys
+
+    def reply(payload):
+        sys.stdout.write(json.dumps(payload) + "\\n")
+        sys.stdout.flush()
+
+    reply({"id": None, "ok": True, "result": {"ready": True}})
+    for line in sys.stdin:
+        message = json.loads(line)
+        op = message["op"]
+        if op == "ping":
+            reply({"id": message["id"], "ok": True, "result": {"pid": os.getpid()}})
+        elif op == "warm":
+            reply({"id": message["id"], "ok": True, "result": {"circuits": message["circuits"]}})
+        elif op == "prove_batch":
+            results = []
+            for item in message["inputs"]:
+                if item.get("fail"):
+                    results.append({"ok": False, "error": "constraint doesn't match"})
+                else:
+                    results.append(
+                        {"ok": True, "result": {"proof": {"pid": os.getpid()}, "publicSignals": [item["n"]]}}
+                    )
+            reply({"id": message["id"], "ok": True, "result": {"results": results}})
+        elif op == "prove":
+            if message["input"].get("crash"):
+                sys.exit(1)
+            if message["input"].get("fail"):
+                reply({"id": message["id"], "ok": False, "error": "constraint doesn't match"})
+                continue
+            if message.get("progress"):
+                reply({"id": message["id"], "event": "witness"})
+                reply({"id": message["id"], "event": "prove"})
+            reply(
+                {
+                    "id": message["id"],
+                    "ok": True,
+                    "result": {
+                        "proof": {"pid": os.getpid()},
+                        "publicSignals": [message["circuit"]],
+                    },
+                }
+            )
+    """
+)
+
+
+class SnarkjsWorkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        script = Path(self.temp_dir.name) / "fake_worker.py"
+        script.write_text(FAKE_WORKER, encoding="utf-8")
+        self.pool = SnarkjsWorkerPool(
+            circuit_root=Path(self.temp_dir.name),
+            size=2,
+            circuits=["VoiceOwnership"],
+            command=[sys.executable, str(script)],
+            job_timeout=5.0,
+            start_timeout=5.0,
+        )
+
+    def tearDown(self):
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def test_prove_reuses_long_lived_workers(self):
+        pids = set()
+        for _ in range(6):
+            result = self.pool.prove("VoiceOwnership", {"foo": "bar"})
+            self.assertEqual(result["publicSignals"], ["VoiceOwnership"])
+            pids.add(result["proof"]["pid"])
+
+        self.assertLessEqual(len(pids), 2)
+        stats = self.pool.stats()
+        self.assertEqual(stats["jobs"], 6)
+        self.assertEqual(stats["alive"], 2)
+        self.assertEqual(stats["restarts"], 0)
+
+    def test_prove_forwards_progress_events(self):
+        events = []
+        result = self.pool.prove("VoiceOwnership", {"foo": "bar"}, on_event=events.append)
+        self.assertEqual(result["publicSignals"], ["VoiceOwnership"])
+        self.assertEqual(events, ["witness", "prove"])
+
+    def test_prover_error_is_reported_without_restart(self):
+        with self.assertRaises(ProverPoolError):
+            self.pool.prove("VoiceOwnership", {"fail": True})
+        self.assertEqual(self.pool.stats()["restarts"], 0)
+
+    def test_crashed_worker_is_restarted(self):
+        with self.assertRaises(ProverPoolError):
+            self.pool.prove("VoiceOwnership", {"crash": True})
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["restarts"], 1)
+        self.assertEqual(stats["alive"], 2)
+        result = self.pool.prove("VoiceOwnership", {"foo": "bar"})
+        self.assertEqual(result["publicSignals"], ["VoiceOwnership"])
+
+    def test_prove_many_spreads_batch_across_workers(self):
+        inputs = [{"n": index} for index in range(5)]
+        inputs[3] = {"fail": True}
+        results = self.pool.prove_many("VoiceOwnership", inputs)
+
+        self.assertEqual(len(results), 5)
+        self.assertIsInstance(results[3], ProverPoolError)
+        for index in (0, 1, 2, 4):
+            self.assertEqual(results[index]["publicSignals"], [index])
+        self.assertEqual(self.pool.stats()["jobs"], 5)
+
+    def test_health_check_pings_idle_workers(self):
+        self.pool.start()
+        self.assertEqual(self.pool.health_check(), {"checked": 2, "healthy": 2})
+
+    def test_reload_restarts_workers_with_new_artifacts(self):
+        before = {self.pool.prove("VoiceOwnership", {})["proof"]["pid"] for _ in range(4)}
+        self.assertEqual(self.pool.reload(), 2)
+
+        after = {self.pool.prove("VoiceOwnership", {})["proof"]["pid"] for _ in range(4)}
+        self.assertFalse(before & after)
+        self.assertEqual(self.pool.stats()["alive"], 2)
+
+    def test_start_failure_is_raised(self):
+        pool = SnarkjsWorkerPool(
+            circuit_root=Path(self.temp_dir.name),
+            command=["/nonexistent/prover-worker"],
+        )
+        with self.assertRaises(ProverPoolError):
+            pool.start()
+
+    def _late_worker_pool(self, start_retry_seconds: float):
+        # 起動コマンドのスクリプトを後から用意する (最初の起動は失敗する)
+        script = Path(self.temp_dir.name) / f"late_worker_{start_retry_seconds}.py"
+        pool = SnarkjsWorkerPool(
+            circuit_root=Path(self.temp_dir.name),
+            command=[sys.executable, str(script)],
+            start_timeout=5.0,
+            start_retry_seconds=start_retry_seconds,
+        )
+        self.addCleanup(pool.close)
+        with self.assertRaises(ProverPoolError):
+            pool.start()
+        script.write_text(FAKE_WORKER)
+        return pool
+
+    def test_start_failure_is_retried_after_backoff(self):
+        pool = self._late_worker_pool(start_retry_seconds=0.0)
+        pool.start()
+        self.assertEqual(pool.stats()["alive"], 1)
+
+    def test_reload_clears_start_failure(self):
+        pool = self._late_worker_pool(start_retry_seconds=60.0)
+        with self.assertRaises(ProverPoolError):
+            pool.start()
+        pool.reload()
+        pool.start()
+        self.assertEqual(pool.stats()["alive"], 1)
+
+
+class ProverPoolRegistryTest(unittest.TestCase):
+    def test_pools_are_created_per_circuit_version(self):
+        with patch.dict(os.environ, {"BACKEND_PROVER_POOL_SIZE": "1"}):
+            ownership = get_prover_pool(ZK_ROOT, "VoiceOwnership")
+            self.assertIs(get_prover_pool(ZK_ROOT, "VoiceOwnership@1"), ownership)
+            commitment = get_prover_pool(ZK_ROOT, "VoiceCommitment")
+
+        self.assertIsNot(commitment, ownership)
+        self.assertEqual(ownership.circuits, ["VoiceOwnership@1"])
+        pools = prover_pools(ZK_ROOT)
+        self.assertIs(pools["VoiceCommitment@1"], commitment)
+        # ワーカーにはレジストリ上の成果物のパスを渡す
+        fields = ownership._circuit_fields("VoiceOwnership")
+        self.assertEqual(fields["circuit"], "VoiceOwnership@1")
+        self.assertEqual(
+            fields["artifacts"]["zkey"], str(ZK_ROOT / "zkey" / "VoiceOwnership_final.zkey")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+try:
+    import numpy as np
+
+    from src.resampler import polyphase_filter_bank, resample_polyphase, resampling_ratio
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _reference_resample(samples, source_rate, target_rate):
+    # ゼロ挿入アップサンプル -> 全長畳み込み -> 間引きによる素朴な参照実装
+    up, down = resampling_ratio(source_rate, target_rate)
+    bank, half_length = polyphase_filter_bank(up, down)
+    taps = bank.T.reshape(-1).astype(np.float64)[: 2 * half_length + 1]
+    upsampled = np.zeros(samples.shape[0] * up)
+    upsampled[::up] = samples
+    filtered = np.convolve(upsampled, taps)
+    output_length = -(-samples.shape[0] * up // down)
+    return filtered[np.arange(output_length) * down + half_length]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class PolyphaseResamplerTest(unittest.TestCase):
+    def test_matches_direct_convolution_for_common_rates(self):
+        generator = np.random.default_rng(7)
+        for source_rate in (48000, 44100, 22050, 8000):
+            for length in (1, 9, 5000):
+                with self.subTest(source_rate=source_rate, length=length):
+                    samples = generator.standard_normal(length).astype(np.float32)
+                    resampled = resample_polyphase(samples, source_rate)
+                    expected = _reference_resample(samples.astype(np.float64), source_rate, 16000)
+                    self.assertEqual(resampled.dtype, np.float32)
+                    self.assertEqual(resampled.shape, expected.shape)
+                    self.assertLess(float(np.abs(resampled - expected).max()), 1e-5)
+
+    def test_passband_is_kept_and_aliases_are_rejected(self):
+        seconds = np.arange(48000 * 2) / 48000.0
+        tone = np.sin(2 * np.pi * 1000 * seconds).astype(np.float32)
+        alias = np.sin(2 * np.pi * 10000 * seconds).astype(np.float32)
+
+        kept = resample_polyphase(tone, 48000)[1000:-1000]
+        rejected = resample_polyphase(alias, 48000)[1000:-1000]
+        self.assertAlmostEqual(float(np.sqrt(np.mean(kept**2))), 2**-0.5, places=2)
+        self.assertLess(float(np.sqrt(np.mean(rejected**2))), 0.01)
+
+    def test_same_rate_is_returned_unchanged(self):
+        samples = np.ones(10, dtype=np.float32)
+        self.assertIs(resample_polyphase(samples, 16000), samples)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 証明専用インスタンスで読み込んではならない重いモジュール
+EMBEDDER_ONLY_MODULES = (
+    "src.feature_extraction",
+    "numpy",
+    "torch",
+    "pyannote",
+    "av",
+    "onnxruntime",
+)
+# 起動 (import + create_app) の時間予算 (秒)
+STARTUP_BUDGET_SECONDS = 1.0
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from src.app import create_app
+create_app()
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _startup(role: str) -> dict:
+    env = {**os.environ, "BACKEND_ROLE": role, "BACKEND_WARMUP": "0"}
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class BackendRoleTest(unittest.TestCase):
+    def setUp(self):
+        try:
+            import flask  # noqa: F401
+        except ModuleNotFoundError as error:
+            self.skipTest(f"flask is not installed in this environment: {error}")
+
+    def test_prover_role_starts_within_budget_without_embedder_imports(self):
+        result = _startup("prover")
+        loaded = [name for name in EMBEDDER_ONLY_MODULES if name in result["modules"]]
+        self.assertEqual(loaded, [])
+        self.assertLess(result["seconds"], STARTUP_BUDGET_SECONDS)
+
+    def test_embedder_role_skips_proof_modules(self):
+        result = _startup("embedder")
+        self.assertNotIn("src.proof_generation", result["modules"])
+        self.assertNotIn("py_ecc", result["modules"])
+
+    def test_routes_follow_role(self):
+        from src.app import create_app
+
+        with patch.dict("os.environ", {"BACKEND_ROLE": "prover"}):
+            client = create_app().test_client()
+        self.assertEqual(client.post("/extract-features", json={}).status_code, 404)
+        self.assertEqual(client.post("/generate-commitment", json={}).status_code, 400)
+        ready = client.get("/ready").get_json()
+        self.assertEqual(ready["role"], "prover")
+        self.assertNotIn("embeddingBatcher", ready["stats"])
+
+        with patch.dict("os.environ", {"BACKEND_ROLE": "embedder"}):
+            client = create_app().test_client()
+        self.assertEqual(client.post("/generate-proof", json={}).status_code, 404)
+        self.assertEqual(client.post("/extract-features", json={}).status_code, 400)
+
+        with patch.dict("os.environ", {"BACKEND_ROLE": "gpu"}), self.assertRaises(ValueError):
+            create_app()
+
+
+if __name__ == "__main__":
+    unittest.main()
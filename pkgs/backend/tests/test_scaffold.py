@@ -25,7 +25,8 @@ class BackendScaffoldTest(unittest.TestCase):
         self.assertIn("FROM node:20-bookworm-slim AS node-runtime", content)
         self.assertIn("FROM python:3.11-slim", content)
         self.assertIn("COPY requirements.txt", content)
-        self.assertIn("pip install --no-cache-dir -r requirements.txt", content)
+        self.assertIn('pip install --no-cache-dir -r "${REQUIREMENTS}"', content)
+        self.assertIn("ARG REQUIREMENTS=requirements.txt", content)
         self.assertIn("COPY --from=node-runtime", content)
 
     def test_http_file_exists_with_endpoint_samples(self):
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.scratch_ring import ScratchRing, scratch_root
+
+
+class ScratchRingTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ring = ScratchRing(Path(self.temp_dir.name), size=1)
+
+    def tearDown(self):
+        self.ring.close()
+        self.temp_dir.cleanup()
+
+    def test_slots_are_reused_and_cleared(self):
+        with self.ring.slot() as slot:
+            first = slot.path
+            slot.file("witness.wtns").write_bytes(b"secret")
+        self.assertEqual(list(first.iterdir()), [])
+
+        with self.ring.slot() as slot:
+            self.assertEqual(slot.path, first)
+        self.assertEqual(self.ring.stats()["acquired"], 2)
+
+    def test_waits_for_free_slot(self):
+        acquired = threading.Event()
+        order = []
+
+        def borrow():
+            with self.ring.slot():
+                order.append("second")
+            acquired.set()
+
+        with self.ring.slot():
+            thread = threading.Thread(target=borrow)
+            thread.start()
+            self.assertFalse(acquired.wait(0.05))
+            order.append("first")
+        thread.join(timeout=2)
+
+        self.assertEqual(order, ["first", "second"])
+        self.assertEqual(self.ring.stats()["waited"], 1)
+
+    def test_close_removes_ring_directory(self):
+        root = self.ring.root
+        self.ring.close()
+        self.assertFalse(root.exists())
+
+    def test_scratch_root_prefers_configured_directory(self):
+        with patch.dict(os.environ, {"BACKEND_SCRATCH_DIR": self.temp_dir.name}):
+            self.assertEqual(scratch_root(), Path(self.temp_dir.name))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+try:
+    import numpy as np
+
+    from src.vad import speech_frames, trim_silence, voiced_duration
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _tone(seconds, sample_rate=16000, amplitude=0.3):
+    times = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * 220 * times)).astype(np.float32)
+
+
+def _noise(seconds, generator, sample_rate=16000, scale=0.001):
+    return generator.normal(0.0, scale, int(seconds * sample_rate)).astype(np.float32)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class VoiceActivityTest(unittest.TestCase):
+    def test_trims_edges_without_copying_a_single_segment(self):
+        generator = np.random.default_rng(1)
+        clip = np.concatenate([_noise(2.0, generator), _tone(1.0), _noise(3.0, generator)])
+        speech, seconds = trim_silence(clip, 16000)
+
+        self.assertTrue(np.shares_memory(speech, clip))
+        # 前後の余白 (HANGOVER_MS) の分だけ長くなる
+        self.assertAlmostEqual(seconds, 1.2, delta=0.05)
+
+    def test_shortens_long_internal_pauses(self):
+        generator = np.random.default_rng(2)
+        clip = np.concatenate([_tone(1.0), _noise(4.0, generator), _tone(1.0)])
+        speech, seconds = trim_silence(clip, 16000, max_pause_seconds=0.3)
+
+        self.assertLess(seconds, 2.8)
+        self.assertGreater(seconds, 2.0)
+        self.assertEqual(speech.shape[0], round(seconds * 16000))
+
+    def test_silence_and_noise_have_no_speech(self):
+        generator = np.random.default_rng(3)
+        self.assertEqual(voiced_duration(np.zeros(48000, dtype=np.float32), 48000), 0.0)
+        self.assertEqual(voiced_duration(_noise(5.0, generator), 16000), 0.0)
+        self.assertEqual(speech_frames(np.zeros(10, dtype=np.float32), 16000).size, 0)
+
+    def test_quiet_fricatives_count_as_speech(self):
+        generator = np.random.default_rng(4)
+        fricative = generator.normal(0.0, 0.02, 8000).astype(np.float32)
+        clip = np.concatenate([_noise(1.0, generator), fricative, _noise(1.0, generator)])
+        self.assertAlmostEqual(voiced_duration(clip, 16000), 0.7, delta=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.warmup import WarmupState, run_warmup, start_warmup
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class WarmupTest(unittest.TestCase):
+    def test_disabled_warmup_is_ready_immediately(self):
+        with patch.dict("os.environ", {"BACKEND_WARMUP": "0"}):
+            state = start_warmup(ROOT / "zk")
+        self.assertEqual(state.snapshot(), {"ready": True, "warmup": False, "components": {}})
+
+    def test_failed_required_component_blocks_readiness(self):
+        state = WarmupState(enabled=True)
+        state.run("poseidon", lambda: None)
+        state.run("zkeys", lambda: None)
+        state.run("embeddingModel", lambda: (_ for _ in ()).throw(RuntimeError("no model")))
+        state.run("proverPool", lambda: None)
+        state.finish()
+
+        snapshot = state.snapshot()
+        self.assertFalse(snapshot["ready"])
+        self.assertEqual(snapshot["components"]["embeddingModel"]["status"], "failed")
+        self.assertEqual(snapshot["components"]["embeddingModel"]["error"], "no model")
+        self.assertIn("seconds", snapshot["components"]["poseidon"])
+
+    def test_run_warmup_touches_artifacts(self):
+        env = {
+            "BACKEND_EMBEDDING_PROVIDER": "deterministic",
+            "BACKEND_PROVER_POOL_SIZE": "0",
+            "BACKEND_PROVER_CIRCUITS": "VoiceCommitment",
+        }
+        state = WarmupState(enabled=True)
+        with patch.dict("os.environ", env), patch("src.warmup._warm_verifier") as mock_verifier:
+            mock_verifier.return_value = ["VoiceCommitment"]
+            run_warmup(state, ROOT / "zk")
+
+        snapshot = state.snapshot()
+        self.assertTrue(snapshot["ready"])
+        self.assertGreater(
+            snapshot["components"]["zkeys"]["detail"]["VoiceCommitment_final.zkey"], 0
+        )
+        self.assertEqual(
+            snapshot["components"]["embeddingModel"]["detail"], "deterministic:pyannote/embedding"
+        )
+
+    def test_prover_role_skips_embedding_components(self):
+        env = {"BACKEND_PROVER_POOL_SIZE": "0", "BACKEND_PROVER_CIRCUITS": "VoiceCommitment"}
+        state = WarmupState(enabled=True, required=("poseidon", "zkeys"))
+        with patch.dict("os.environ", env), patch("src.warmup._warm_verifier"):
+            with patch("src.warmup._warm_embedding_model") as mock_model:
+                run_warmup(state, ROOT / "zk", role="prover")
+
+        mock_model.assert_not_called()
+        snapshot = state.snapshot()
+        self.assertTrue(snapshot["ready"])
+        self.assertEqual(
+            sorted(snapshot["components"]),
+            ["poseidon", "proverPool", "verifier", "witnessCalculator", "zkeys"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.witness import (
+    WitnessEngineUnavailableError,
+    WitnessError,
+    build_wtns,
+    calculate_witness,
+    get_witness_calculator,
+    parse_wtns,
+)
+
+try:
+    import wasmtime  # noqa: F401
+except ImportError:
+    wasmtime = None
+
+ZK_ROOT = Path(__file__).resolve().parents[1] / "zk"
+# snarkjs で生成した入力と公開シグナル (pkgs/circuit/data)
+FIXTURES = Path(__file__).resolve().parents[2] / "circuit" / "data"
+CIRCUITS = ("VoiceCommitment", "VoiceOwnership")
+
+
+class WitnessTest(unittest.TestCase):
+    def test_parse_wtns_reads_witness_values(self):
+        values = [
+            1,
+            17204041366246486412394101808417708187011595214573470694048667731783274162294,
+            999,
+        ]
+        self.assertEqual(parse_wtns(build_wtns(values)), values)
+
+    def test_parse_wtns_rejects_invalid_header(self):
+        with self.assertRaises(WitnessError):
+            parse_wtns(b"not a witness file")
+
+    def test_parse_wtns_rejects_truncated_witness(self):
+        with self.assertRaises(WitnessError):
+            parse_wtns(build_wtns([1, 2, 3])[:-8])
+
+    @patch("src.witness.calculate_witness_cli", return_value=[1, 5, 6])
+    @patch("src.witness.get_witness_calculator")
+    def test_wasm_engine_falls_back_to_cli_without_wasmtime(self, mock_calculator, mock_cli):
+        mock_calculator.side_effect = WitnessEngineUnavailableError("wasmtime is not installed")
+        with patch.dict(os.environ, {"BACKEND_WITNESS_ENGINE": "wasm"}):
+            self.assertEqual(calculate_witness({}, "VoiceCommitment", ZK_ROOT, outputs=1), [1, 5])
+        mock_cli.assert_called_once()
+
+    def test_unknown_witness_engine_is_rejected(self):
+        with patch.dict(os.environ, {"BACKEND_WITNESS_ENGINE": "node"}):
+            with self.assertRaises(WitnessError):
+                calculate_witness({}, "VoiceCommitment", ZK_ROOT)
+
+
+@unittest.skipIf(wasmtime is None, "wasmtime is not installed")
+class WasmWitnessCalculatorTest(unittest.TestCase):
+    def _fixture(self, name):
+        path = FIXTURES / f"{name}.json"
+        if not path.exists():
+            self.skipTest(f"missing circuit fixture: {path}")
+        public = json.loads((FIXTURES / f"{name}_public.json").read_text(encoding="utf-8"))
+        return json.loads(path.read_text(encoding="utf-8")), [int(value) for value in public]
+
+    def test_outputs_match_snarkjs_public_signals(self):
+        for name in CIRCUITS:
+            with self.subTest(circuit=name):
+                input_payload, public = self._fixture(name)
+                calculator = get_witness_calculator(ZK_ROOT, name)
+                witness = calculator.calculate(input_payload)
+
+                self.assertEqual(len(witness), calculator.witness_size)
+                self.assertEqual(witness[0], 1)
+                self.assertEqual(witness[1 : 1 + len(public)], public)
+                self.assertEqual(calculator.calculate(input_payload, outputs=1), witness[:2])
+                self.assertEqual(parse_wtns(calculator.calculate_wtns(input_payload)), witness)
+
+    def test_failed_circuit_assertion_raises(self):
+        input_payload, _ = self._fixture("VoiceOwnership")
+        input_payload["publicCommitment"] = "1"
+        with self.assertRaises(WitnessError):
+            get_witness_calculator(ZK_ROOT, "VoiceOwnership").calculate(input_payload)
+
+    def test_rejects_missing_or_misshaped_inputs(self):
+        calculator = get_witness_calculator(ZK_ROOT, "VoiceCommitment")
+        for input_payload in (
+            {"salt": "1"},
+            {"salt": "1", "voiceFeatures": [1, 2]},
+            {"salt": "1", "voiceFeatures": [0] * 8, "extra": "2"},
+        ):
+            with self.subTest(input=input_payload):
+                with self.assertRaises(WitnessError):
+                    calculator.calculate(input_payload)
+
+    @unittest.skipIf(shutil.which("snarkjs") is None, "snarkjs is not installed")
+    def test_wtns_matches_snarkjs_wtns_calculate(self):
+        for name in CIRCUITS:
+            with self.subTest(circuit=name):
+                input_payload, _ = self._fixture(name)
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    input_path = Path(temp_dir) / "input.json"
+                    witness_path = Path(temp_dir) / "witness.wtns"
+                    input_path.write_text(json.dumps(input_payload), encoding="utf-8")
+                    wasm_path = ZK_ROOT / f"{name}_js" / f"{name}.wasm"
+                    command = ["snarkjs", "wtns", "calculate", wasm_path, input_path, witness_path]
+                    subprocess.run([str(part) for part in command], check=True, capture_output=True)
+                    expected = witness_path.read_bytes()
+
+                calculator = get_witness_calculator(ZK_ROOT, name)
+                self.assertEqual(calculator.calculate_wtns(input_payload), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()